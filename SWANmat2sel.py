@@ -23,6 +23,10 @@
 # For now, it only works for stationary SWAN simulations.
 # TODO: update for non-stationary output as well
 #
+# Revised: Oct 18, 2026
+# The boundary of the mesh (and the *.cli file) is now found with numpy
+# in getIPOBO_IKLE(), rather than by the bnd_extr_stbtel binary.
+#
 # Uses: Python 2 or 3, Numpy, Scipy
 #
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -105,12 +109,13 @@ for i in range(num_pts):
 #n,e,x,y,z,ikle = readAdcirc(adcirc_file)
 
 # use getIPOBO_IKLE() to get IPOBO and IKLE arrays
-# this method also writes a 'temp.cli' file as well
-n,e,x,y,z,IKLE,IPOBO = getIPOBO_IKLE(adcirc_file)
+# this method also returns the contents of the *.cli file
+n,e,x,y,z,IKLE,IPOBO,cli = getIPOBO_IKLE(adcirc_file)
 
-# rename temp.cli to proper name
+# write the *.cli file
 cli_file = output_file.split('.',1)[0] + '.cli'
-os.rename('temp.cli',cli_file)
+with open(cli_file, 'w') as fout:
+  fout.write(cli)
 
 # make it a double precision *.slf file
 ftype = 'd'
@@ -10,6 +10,12 @@
 # 
 # Date: June 29, 2015
 #
+# Revised: Oct 18, 2026
+# The grid is interpolated in tiles of rows, which are written to the
+# output file as they are made, so that the memory used does not depend
+# on the size of the grid. Added the optional -n argument to interpolate
+# the tiles with a number of processes.
+#
 # Purpose: Script takes in a tin in ADCIRC format, and generates an ESRI *.asc 
 # file for easy visualization by a GIS.
 #
@@ -22,14 +28,15 @@
 # -i input adcirc mesh file
 # -s spacing (in m) of the *.asc grid file
 # -o generated *.asc grid file
+# -n (optional) number of processes used to interpolate the grid
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
-import matplotlib.tri    as mtri           # matplotlib triangulations
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
+from ppmodules.raster import *             # to get the tiled rasterizer
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -37,10 +44,12 @@ from ppmodules.readMesh import *           # to get all readMesh functions
 curdir = os.getcwd()
 #
 # I/O
-if len(sys.argv) != 7 :
+if len(sys.argv) != 7 and len(sys.argv) != 9:
   print('Wrong number of Arguments, stopping now...')
   print('Usage:')
   print('python adcirc2asc.py -i tin.14 -s 10 -o tin.asc')
+  print('or')
+  print('python adcirc2asc.py -i tin.14 -s 10 -o tin.asc -n 4')
   sys.exit()
 dummy1 =  sys.argv[1]
 adcirc_file = sys.argv[2]
@@ -50,55 +59,36 @@ spacing = float(spacing)
 dummy3 =  sys.argv[5]
 output_file = sys.argv[6] # output *.asc grid
 
+# number of processes used to interpolate the grid
+processes = 1
+if len(sys.argv) == 9:
+  processes = int(sys.argv[8])
+
 # to create the output file
 fout = open(output_file,"w")
 
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(adcirc_file)
 
-# create tin triangulation object using matplotlib
-tin = mtri.Triangulation(x, y, ikle)
-
 # determine the spacing of the regular grid
-range_in_x = x.max() - x.min()
-range_in_y = y.max() - y.min()
-
-max_range = max(range_in_x, range_in_y)
-
-# first index is integer divider, second is remainder
-num_x_pts = divmod(range_in_x, spacing)
-num_y_pts = divmod(range_in_y, spacing)
+x_regs, y_regs = gridAxes(x.min(), x.max(), y.min(), y.max(), spacing)
 
-print("Size of output matrix is : " + str(int(num_x_pts[0])) + " x " + str(int(num_y_pts[0])))
+print("Size of output matrix is : " + str(len(x_regs)) + " x " + str(len(y_regs)))
 print("Grid resolution is : " + str(spacing) + " m")
 
-# creates the regular grid
-xreg, yreg = np.meshgrid(np.linspace(x.min(), x.max(), int(num_x_pts[0])),
-  np.linspace(y.min(), y.max(), int(num_y_pts[0])))
-x_regs = xreg[1,:]
-y_regs = yreg[:,1]
-
-# perform the triangulation
-interpolator = mtri.LinearTriInterpolator(tin, z)
-interp_zz = interpolator(xreg, yreg)
-
-# print "Shape of array z: " + str(interp_zz.shape[0])
-
-# print "Shape of arrays xreg and yreg: " + str(x_regs.shape) + " " + str(y_regs.shape) 
-
-where_are_NaNs = np.isnan(interp_zz)
-interp_zz[where_are_NaNs] = -999.0
-
 # write the header string
-header_str = "NCOLS " + str(interp_zz.shape[1]) + "\n"
-header_str = header_str + "NROWS " + str(interp_zz.shape[0]) + "\n"
+header_str = "NCOLS " + str(len(x_regs)) + "\n"
+header_str = header_str + "NROWS " + str(len(y_regs)) + "\n"
 header_str = header_str + "XLLCORNER " + str(x_regs[0]) + "\n"
 header_str = header_str + "YLLCORNER " + str(y_regs[0]) + "\n"
 header_str = header_str + "CELLSIZE " + str(spacing) + "\n"
 header_str = header_str + "NODATA_VALUE " + str(-999.00)
+fout.write(header_str + "\n")
 
-#np.savetxt("temp.out", z, fmt='%.2f', delimiter='') # this has no max spaces
-np.savetxt(output_file, np.flipud(interp_zz), fmt='%10.3f', header = header_str, 
-  comments = '', delimiter='') # this has 10 char spaces, 2 after decimal
+# interpolate the grid one tile at a time, and write each tile as soon as
+# it is made (10 char spaces, 3 after decimal)
+for interp_zz in rasterTiles(x,y,z,ikle,x_regs,y_regs,processes=processes):
+  writeRows(fout, '%10.3f' * len(x_regs), interp_zz)
+fout.close()
 
 print("All done!")
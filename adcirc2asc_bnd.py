@@ -10,6 +10,14 @@
 # 
 # Date: Dec 1, 2016
 #
+# Revised: Oct 18, 2026
+# The grid is interpolated and clipped to the boundary in tiles of rows,
+# which are written to the output file as they are made, so that the 
+# memory used does not depend on the size of the grid. The grid cells are
+# clipped with a scanline fill of the boundary, rather than one cell at a
+# time. Added the optional -n argument to interpolate the tiles with a
+# number of processes.
+#
 # Purpose: Script takes in a tin in ADCIRC format, and generates an ESRI *.asc 
 # file for easy visualization by a GIS. This is the same as my adcirc2asc.py
 # script, except that this one generates the grid for the region within the 
@@ -28,15 +36,15 @@
 # -b boundary where the grid is to be generated
 # -s spacing (in m) of the *.asc grid file
 # -o generated *.asc grid file
+# -n (optional) number of processes used to interpolate the grid
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
-import matplotlib.tri    as mtri           # matplotlib triangulations
-import matplotlib.path as mplPath          # matplotlib path object
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
+from ppmodules.raster import *             # to get the tiled rasterizer
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -44,10 +52,12 @@ from ppmodules.readMesh import *           # to get all readMesh functions
 curdir = os.getcwd()
 #
 # I/O
-if len(sys.argv) != 9:
+if len(sys.argv) != 9 and len(sys.argv) != 11:
   print('Wrong number of Arguments, stopping now...')
   print('Usage:')
   print('python adcirc2asc_bnd.py -i tin.grd -p poly.csv -s 10 -o tin.asc')
+  print('or')
+  print('python adcirc2asc_bnd.py -i tin.grd -p poly.csv -s 10 -o tin.asc -n 4')
   sys.exit()
 adcirc_file = sys.argv[2]
 boundary_file = sys.argv[4]
@@ -55,6 +65,11 @@ spacing = sys.argv[6]
 spacing = float(spacing)
 output_file = sys.argv[8] # output *.asc grid
 
+# number of processes used to interpolate the grid
+processes = 1
+if len(sys.argv) == 11:
+  processes = int(sys.argv[10])
+
 # to create the output file
 fout = open(output_file,'w')
 
@@ -85,81 +100,31 @@ if (n_polygons > 1):
   print('Number of polygons in input file greater than 1. Exiting.')
   sys.exit()
   
-# construct a polygon as mpl object
-poly = list()
-for i in range(len(shapeid_poly)):
-  poly.append( (x_poly[i], y_poly[i]) )
-  
-# convert poly list to a numpy array
-poly_array = np.asarray(poly)
-
-# create a mathplotlib path object
-path = mplPath.Path(poly_array)
-
-# create tin triangulation object using matplotlib
-print('Creating Matplotlib triangulation ...')
-tin = mtri.Triangulation(x, y, ikle)
+# the boundary polygon
+poly = (x_poly, y_poly)
 
 # determine the spacing of the regular grid
-range_in_x = x_poly.max() - x_poly.min()
-range_in_y = y_poly.max() - y_poly.min()
-
-max_range = max(range_in_x, range_in_y)
+x_regs, y_regs = gridAxes(x_poly.min(), x_poly.max(), y_poly.min(), 
+  y_poly.max(), spacing)
 
-# first index is integer divider, second is remainder
-num_x_pts = divmod(range_in_x, spacing)
-num_y_pts = divmod(range_in_y, spacing)
-
-print("Size of output matrix is : " + str(int(num_x_pts[0])) + " x " + str(int(num_y_pts[0])))
+print("Size of output matrix is : " + str(len(x_regs)) + " x " + str(len(y_regs)))
 print("Grid resolution is : " + str(spacing) + " m")
 
-# creates the regular grid
-print('Creating the grid ...')
-xreg, yreg = np.meshgrid(np.linspace(x_poly.min(), x_poly.max(), int(num_x_pts[0])),
-  np.linspace(y_poly.min(), y_poly.max(), int(num_y_pts[0])))
-x_regs = xreg[1,:]
-y_regs = yreg[:,1]
-
-# perform the triangulation
-print('Performing interpolations ...')
-interpolator = mtri.LinearTriInterpolator(tin, z)
-interp_zz = interpolator(xreg, yreg)
-
-where_are_NaNs = np.isnan(interp_zz)
-interp_zz[where_are_NaNs] = -999.0
-
-# ravel interp_zz (i.e., create a 1d array out of the interpolated z)
-interp_zz_ravel = np.ravel(interp_zz)
-
-# to assign -999.0 to all mesh nodes outside of the poly boundary
-# to make the gridded 2d points arrays into 1d arrays (i.e., unravel the
-# 2d points into 1d grids
-x_grid_pts = np.ravel(xreg)
-y_grid_pts = np.ravel(yreg)
-
-# loop through each point of the raveled arrays, and assign a NaN to
-# one that lies outside of the boundary; this is the longest execution task
-# of this script!
-print('Clipping results to boundary ...')
-for i in range(len(x_grid_pts)):
-  poly_test = path.contains_point( (x_grid_pts[i], y_grid_pts[i]) )
-  if (poly_test == False):
-    interp_zz_ravel[i] = -999.00
-
-# now, turn interp_zz_ravel back into a 2d array
-interp_zz = np.reshape(interp_zz_ravel, xreg.shape)
-
 # write the header string
-print('Writing the output to file ...')
-header_str = "NCOLS " + str(interp_zz.shape[1]) + "\n"
-header_str = header_str + "NROWS " + str(interp_zz.shape[0]) + "\n"
+header_str = "NCOLS " + str(len(x_regs)) + "\n"
+header_str = header_str + "NROWS " + str(len(y_regs)) + "\n"
 header_str = header_str + "XLLCORNER " + str(x_regs[0]) + "\n"
 header_str = header_str + "YLLCORNER " + str(y_regs[0]) + "\n"
 header_str = header_str + "CELLSIZE " + str(spacing) + "\n"
 header_str = header_str + "NODATA_VALUE " + str(-999.00)
-
-#np.savetxt("temp.out", z, fmt='%.2f', delimiter='') # this has no max spaces
-np.savetxt(output_file, np.flipud(interp_zz), fmt='%10.3f', header = header_str, 
-  comments = '', delimiter='') # this has 10 char spaces, 3 after decimal
+fout.write(header_str + "\n")
+
+# interpolate the grid and clip it to the boundary one tile at a time, and
+# write each tile as soon as it is made (10 char spaces, 3 after decimal)
+print('Interpolating and writing the output to file ...')
+for interp_zz in rasterTiles(x,y,z,ikle,x_regs,y_regs,poly=poly,
+  processes=processes):
+  writeRows(fout, '%10.3f' * len(x_regs), interp_zz)
+fout.close()
 
 print("All done!")
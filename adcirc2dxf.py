@@ -13,6 +13,11 @@
 # Purpose: Script takes in a mesh in ADCIRC format, and generates a dxf
 # file of the mesh. Nodes and elements are both written in 3d format.
 #
+# Revised: Oct 18, 2026
+# The nodes and elements are streamed to the dxf file from the mesh arrays
+# (see dxfwrite/stream.py), rather than first made into dxfwrite entity
+# objects; this way, meshes of any size can be written.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -29,9 +34,6 @@ import os,sys,time                         # system parameters
 import numpy             as np             # numpy
 from dxfwrite import DXFEngine as dxf      # for dxf export
 from ppmodules.readMesh import *           # to get all readMesh functions
-# uses Rick van Hattem's progressbar 
-# https://github.com/WoLpH/python-progressbar
-from progressbar import ProgressBar, Bar, Percentage, ETA
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -51,45 +53,25 @@ output_file = sys.argv[4]
 
 # to create the output file
 drawing = dxf.drawing(output_file)
-#fout = open(output_file,"w")
 
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(adcirc_file)
 
+# the header, tables and blocks of the drawing are written now, and the
+# entities are written as they are added
+stream = drawing.stream()
+
 ############################################################
 # writing nodes
-w = [Percentage(), Bar(), ETA()]
-
-pbar = ProgressBar(widgets=w, max_value=n).start()
 print('processing nodes')
-
-# create nodes in the dxf file
-for i in range(n):
-  drawing.add(dxf.point(point=(x[i],y[i],z[i])))
-  pbar.update(i+1)
-  
-pbar.finish()
+stream.add_points(x, y, z)
 
 ############################################################
-# writing elements
-
-pbar = ProgressBar(widgets=w, max_value=e).start()
+# writing elements (each element is a 3d polyline, that is closed by
+# repeating its first node)
 print('processing elements')
-# to create elements
-for i in range(e):
-  poly = dxf.polyline()
-  #pface = dxf.polyface()
-  # create tupples for each vertex
-  v0 = (x[ikle[i,0]],y[ikle[i,0]],z[ikle[i,0]])
-  v1 = (x[ikle[i,1]],y[ikle[i,1]],z[ikle[i,1]])
-  v2 = (x[ikle[i,2]],y[ikle[i,2]],z[ikle[i,2]])
-  #pface.add_face([v0, v1, v2], color=256)
-  poly.add_vertices( [ v0, v1, v2, v0 ])
-  drawing.add(poly)
-  #drawing.add(pface)
-  pbar.update(i+1)
-pbar.finish()
+stream.add_polylines(x, y, z, connectivity=ikle[:,[0,1,2,0]])
 
 ############################################################
 print('Writing to file ...')
-drawing.save()
+stream.close()
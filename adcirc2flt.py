@@ -10,6 +10,12 @@
 # 
 # Date: Feb 16, 2016
 #
+# Revised: Oct 18, 2026
+# The grid is interpolated in tiles of rows, which are written to the
+# output file as they are made, so that the memory used does not depend
+# on the size of the grid. Added the optional -n argument to interpolate
+# the tiles with a number of processes.
+#
 # Purpose: Script takes in a tin in ADCIRC format, and generates an ESRI *.flt 
 # file for easy visualization by a GIS. It works exactly as my adcirc2asc.py
 # script, except that it produces binary files instead of ascii files.
@@ -23,15 +29,15 @@
 # -i input adcirc mesh file
 # -s spacing (in m) of the *.flt grid file
 # -o generated *.flt grid file
+# -n (optional) number of processes used to interpolate the grid
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
-import matplotlib.tri    as mtri           # matplotlib triangulations
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
-import struct                              # to write binary data to file
+from ppmodules.raster import *             # to get the tiled rasterizer
 # uses Rick van Hattem's progressbar 
 # https://github.com/WoLpH/python-progressbar
 from progressbar import ProgressBar, Bar, Percentage, ETA
@@ -42,10 +48,12 @@ from progressbar import ProgressBar, Bar, Percentage, ETA
 curdir = os.getcwd()
 #
 # I/O
-if len(sys.argv) != 7 :
+if len(sys.argv) != 7 and len(sys.argv) != 9:
   print('Wrong number of Arguments, stopping now...')
   print('Usage:')
   print('python adcirc2flt.py -i tin.grd -s 10 -o tin.flt')
+  print('or')
+  print('python adcirc2flt.py -i tin.grd -s 10 -o tin.flt -n 4')
   sys.exit()
 dummy1 =  sys.argv[1]
 adcirc_file = sys.argv[2]
@@ -55,6 +63,11 @@ spacing = float(spacing)
 dummy3 =  sys.argv[5]
 output_file = sys.argv[6] # output *.flt grid
 
+# number of processes used to interpolate the grid
+processes = 1
+if len(sys.argv) == 9:
+  processes = int(sys.argv[8])
+
 # to create the output *.flt file
 fout = open(output_file,"wb")
 
@@ -66,71 +79,34 @@ fhdr = open(header_file,"w")
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(adcirc_file)
 
-# create tin triangulation object using matplotlib
-tin = mtri.Triangulation(x, y, ikle)
-
 # determine the spacing of the regular grid
-range_in_x = x.max() - x.min()
-range_in_y = y.max() - y.min()
-
-max_range = max(range_in_x, range_in_y)
+x_regs, y_regs = gridAxes(x.min(), x.max(), y.min(), y.max(), spacing)
 
-# first index is integer divider, second is remainder
-num_x_pts = divmod(range_in_x, spacing)
-num_y_pts = divmod(range_in_y, spacing)
-
-print("Size of output matrix is : " + str(int(num_x_pts[0])) + " x " + str(int(num_y_pts[0])))
+print("Size of output matrix is : " + str(len(x_regs)) + " x " + str(len(y_regs)))
 print("Grid resolution is : " + str(spacing) + " m")
 
-# creates the regular grid
-xreg, yreg = np.meshgrid(np.linspace(x.min(), x.max(), int(num_x_pts[0])),
-  np.linspace(y.min(), y.max(), int(num_y_pts[0])))
-x_regs = xreg[1,:]
-y_regs = yreg[:,1]
-
-# perform the triangulation
-print('Interpolating ...')
-interpolator = mtri.LinearTriInterpolator(tin, z)
-interp_zz = interpolator(xreg, yreg)
-
-#print "Shape of array z: " + str(interp_zz.shape[0])
-
-#print "Shape of arrays xreg and yreg: " + str(x_regs.shape) + " " + str(y_regs.shape) 
-
-where_are_NaNs = np.isnan(interp_zz)
-interp_zz[where_are_NaNs] = -999.0
-
-#np.savetxt("temp.out", z, fmt='%.2f', delimiter='') # this has no max spaces
-#np.savetxt('temp.out', np.flipud(interp_zz), fmt='%10.3f', delimiter='') # this has 10 char spaces, 2 after decimal
-
 # open the output *.hdr file, and write the header info
-fhdr.write("NCOLS " + str(interp_zz.shape[1]) + "\n")
-fhdr.write("NROWS " + str(interp_zz.shape[0]) + "\n")
+fhdr.write("NCOLS " + str(len(x_regs)) + "\n")
+fhdr.write("NROWS " + str(len(y_regs)) + "\n")
 fhdr.write("XLLCORNER " + str(x_regs[0]) + "\n")
 fhdr.write("YLLCORNER " + str(y_regs[0]) + "\n")
 fhdr.write("CELLSIZE " + str(spacing) + "\n")
 fhdr.write("NODATA_VALUE " + str(-999.00) + "\n")
 fhdr.write("BYTEORDER LSBFIRST " + "\n")
+fhdr.close()
 
-print('Writing binary data file ...')
-
-'''
-# this also works too, but can't use progress bar
-num_pts = int(num_x_pts[0]) * int(num_y_pts[0])
-interp_zz_reshaped = np.reshape(np.flipud(interp_zz),num_pts)
-s = struct.pack('f'*num_pts,*interp_zz_reshaped)
-fout.write(s)
-fout.close()
-'''
+# interpolate the grid one tile at a time, and write each tile as soon as
+# it is made (as little endian 4 byte floats)
+print('Interpolating and writing binary data file ...')
 
 w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=interp_zz.shape[0]).start()
-for i in range(interp_zz.shape[0]):
-  s = struct.pack('f'*interp_zz.shape[1], *np.flipud(interp_zz)[i,:])
-  fout.write(s)
-  pbar.update(i+1)
+pbar = ProgressBar(widgets=w, maxval=len(y_regs)).start()
+nrows = 0
+for interp_zz in rasterTiles(x,y,z,ikle,x_regs,y_regs,processes=processes):
+  fout.write(np.asarray(interp_zz, dtype='<f4').tobytes())
+  nrows = nrows + interp_zz.shape[0]
+  pbar.update(nrows)
 fout.close()
 pbar.finish()
 
 print('All done!')
-
@@ -29,6 +29,10 @@
 # bnd_extr_stbtel.f90 (pre-compiled binaries are available for
 # Linux 32, Linux 64, and Windows).
 #
+# Revised: Oct 18, 2026
+# The boundary of the mesh (and the *.cli file) is now found with numpy
+# in getIPOBO_IKLE(), rather than by the bnd_extr_stbtel binary.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -71,11 +75,12 @@ output_file = sys.argv[6]
 
 # reads mesh data using the get IPOBO_IKLE() method from utilities.py
 # the ikle and the ppIPOB are one-based
-n,e,x,y,z,ikle,ppIPOB = getIPOBO_IKLE(adcirc_file)
+n,e,x,y,z,ikle,ppIPOB,cli = getIPOBO_IKLE(adcirc_file)
 
-# the above method generates a file called temp.cli, which we rename here
+# the above method also returns the contents of the *.cli file
 cli_file = output_file.split('.',1)[0] + '.cli'
-os.rename('temp.cli',cli_file)
+with open(cli_file, 'w') as fout:
+  fout.write(cli)
 
 # now we can write the *.slf file
 #######################################################################
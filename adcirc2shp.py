@@ -22,6 +22,11 @@
 # Updated so that writing works for updated version of pyshp. It was the
 # same update that was made for breaklines2shp.py earlier.
 #
+# Revised: Oct 18, 2026
+# The nodes and the elements are written with the array based writer of
+# pyshp (shapeArrays() and recordArrays()), rather than one shape and one
+# record at a time. The output files are the same as before.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -69,38 +74,15 @@ n,e,x,y,z,ikle = readAdcirc(adcirc_file)
 # write the nodes shapefile
 out_n.field('id','C', 10, 0 )
 out_n.field('z', 'N', 12, 3)
-for i in range(n):
-	out_n.point(x[i],y[i])
-	out_n.record(id=i+1, z=z[i])
-
-#out_n.save(output_file_n)	
+out_n.shapeArrays(x, y)
+out_n.recordArrays(np.arange(1,n+1), z)
+out_n.close()
 
-# write the polygon shapefile
+# write the polygon shapefile (each element is a 3d polygon, with the m
+# value of its vertices set to zero)
 out_e.field('id', 'C', 10, 0)
-for i in range(e):
-	# this is how it is covered in:
-	# Learning Geospatial Analysis with Python, J Lawhead (2013), p.261.
-	part=[]
-	x0 = x[ikle[i,0]]
-	y0 = y[ikle[i,0]]
-	z0 = z[ikle[i,0]]
-	
-	x1 = x[ikle[i,1]]
-	y1 = y[ikle[i,1]]
-	z1 = z[ikle[i,1]]
-	
-	x2 = x[ikle[i,2]]
-	y2 = y[ikle[i,2]]
-	z2 = z[ikle[i,2]]
-	
-	part.append([x0,y0,z0,0])
-	part.append([x1,y1,z1,0])
-	part.append([x2,y2,z2,0])
-	
-	#out_e.linez(lines=[part]) # if we were to do 3d lines
-	out_e.polyz(polys=[part]) # 3d polygons
-		
-	out_e.record(id=i+1)
+out_e.shapeArrays(x, y, z, np.zeros(n), connectivity=ikle)
+out_e.recordArrays(np.arange(1,e+1))
+out_e.close()
 
-#out_e.save(output_file_e)
 print('All done!')
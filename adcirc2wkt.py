@@ -21,6 +21,10 @@
 # line. The script now automatically writes the nodes and elements WKT file
 # separately.
 #
+# Revised: Oct 18, 2026
+# The files are written by writeWKT() from writeMesh.py, which formats
+# the rows a chunk at a time.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -36,6 +40,7 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
+from ppmodules.writeMesh import *          # for writeWKT()
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -53,46 +58,8 @@ adcirc_file = sys.argv[2]
 dummy2 =  sys.argv[3]
 output_file = sys.argv[4] # output *.csv WKT file
 
-# create the element and node output files
-output_file_e = output_file.rsplit('.',1)[0] + '_e.csv'
-output_file_n = output_file.rsplit('.',1)[0] + '_n.csv'
-
-# to create the output file
-fout = open(output_file_e,"w")
-
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(adcirc_file)
 
-# write the header of the WKT file\
-fout.write('WKT,element' + '\n')
-
-for i in range(e):
-	fout.write('"POLYGON ((')
-	fout.write(str('{:.3f}'.format(x[ikle[i,0]] )) + ' ' + 
-	  str('{:.3f}'.format(y[ikle[i,0]] )) + ' ' + 
-	  str('{:.3f}'.format(z[ikle[i,0]] )) + ', ' +
-	  
-	  str('{:.3f}'.format(x[ikle[i,1]] )) + ' ' + 
-	  str('{:.3f}'.format(y[ikle[i,1]] )) + ' ' + 
-	  str('{:.3f}'.format(z[ikle[i,1]] )) + ',' +
-	  
-	  str('{:.3f}'.format(x[ikle[i,2]] )) + ' ' + 
-	  str('{:.3f}'.format(y[ikle[i,2]] )) + ' ' + 
-	  str('{:.3f}'.format(z[ikle[i,2]] )) + ', ' +
-	  
-	  str('{:.3f}'.format(x[ikle[i,0]] )) + ' ' + 
-	  str('{:.3f}'.format(y[ikle[i,0]] )) + ' ' + 
-	  str('{:.3f}'.format(z[ikle[i,0]] )) + '))",' + str(i+1) + '\n')
-	
-# to generate the node file
-fout_n = open(output_file_n,"w")
-
-# write the header of the WKT file\
-fout_n.write('WKT,node' + '\n')
-
-for i in range(n):
-	fout_n.write('"POINT (')
-	fout_n.write(str('{:.3f}'.format(x[i] )) + ' ' + 
-	  str('{:.3f}'.format(y[i] )) + ' ' + 
-	  str('{:.3f}'.format(z[i] )) + ')",' + 
-	  str(i+1) + '\n')
+# write the element and node output files
+writeWKT(n,e,x,y,z,ikle,output_file)
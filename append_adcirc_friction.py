@@ -17,6 +17,10 @@
 # Revised: Feb 18, 2017
 # Added precision (single or double) as a command line input.
 #
+# Revised: Oct 18, 2026
+# The boundary of the mesh (and the *.cli file) is now found with numpy
+# in getIPOBO_IKLE(), rather than by the bnd_extr_stbtel binary.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -70,13 +74,14 @@ if (n1 != n2) or (e1 != e2):
   sys.exit()
 
 # use getIPOBO_IKLE() to get the geometry from the bathy file
-# this method also writes a 'temp.cli' file as well
+# this method also returns the contents of the *.cli file
 # note indices in ikle and ipobo are one based
-n,e,x,y,z,IKLE,IPOBO = getIPOBO_IKLE(bathy_file)
+n,e,x,y,z,IKLE,IPOBO,cli = getIPOBO_IKLE(bathy_file)
 
-# rename temp.cli to proper name
+# write the *.cli file
 cli_file = output_file.split('.',1)[0] + '.cli'
-os.rename('temp.cli',cli_file)
+with open(cli_file, 'w') as fout:
+  fout.write(cli)
 
 # It needs these to write the *.slf file
 NELEM = e
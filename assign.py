@@ -33,6 +33,12 @@
 # got to the second polygon, it didn't remember the updates made in the
 # first polygon). This is now fixed.
 #
+# Modified: Oct 18, 2026
+# The nodes in each polygon are now found with getZones() from the
+# ppmodules/polygons.py, which only tests the nodes inside the bounding
+# box of each polygon, and tests them all at once. The results are the
+# same as with point_in_poly() (including nodes on the polygon edges).
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -51,8 +57,9 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
+from ppmodules.writeMesh import *          # to get all writeMesh functions
 from ppmodules.utilities import *          # to get the general utilities
-from progressbar import ProgressBar, Bar, Percentage, ETA
+from ppmodules.polygons import *           # to get the polygon zones
 import timeit
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -74,9 +81,6 @@ boundary_file = sys.argv[4]
 dummy3 = sys.argv[5]
 output_file = sys.argv[6]
 
-# to create the output file
-fout = open(output_file,"w")
-
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(input_file)
 
@@ -124,39 +128,15 @@ default = 0.0
 # define the mesh attribute as the value read from the file
 f = z
 
-# for the progress bar
-w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=n_polygons*n).start()
-count_bar = 0
-
-# loop over all polygons
-for i in range(n_polygons):
-  # construct each polygon
-  poly = []
-  for j in range(nodes):
-    if (shapeid_poly[j] == polygon_ids[i]):
-      poly.append( (x_poly[j], y_poly[j]) )
-  #print(poly)
-  
-  # to loop over all nodes in the mesh (inneficient)
-  # TODO remove the brute force component of this code!!!
-  for k in range(n):
-    count_bar = count_bar + 1
-    pbar.update(count_bar)
-    poly_test = point_in_poly(x[k], y[k], poly)
-    if (poly_test == 'IN'):
-      f[k] = attribute_data[i]
-    elif (poly_test == 'OUT'):
-      f[k] = f[k]
-    else:
-      f[k] = -999
-  
-  # delete all elements in the poly list
-  del poly[:]    
-  #print '###########'
-
-# finish the bar
-pbar.finish()
+# construct each polygon
+polys = getPolygons(shapeid_poly, x_poly, y_poly)
+
+# index of the polygon each node is in (-1 if not in any polygon); if a
+# node is in many polygons, the last one is used
+zone = getZones(x, y, polys)
+
+# nodes outside of all polygons keep their original value
+f[zone >= 0] = attribute_data[zone[zone >= 0]]
 
 # if a particular node of the mesh was not within any polygon
 # extract all values that were less then the condition f-default < 0.001
@@ -167,19 +147,7 @@ pbar.finish()
 #  print('Assigning default value of ' + str(default) + ' as attribute')
 
 # now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(e) + " " + str(n) + "\n")
-
-# writes the nodes
-for i in range(n):
-  fout.write(str(i+1) + " " + str("{:.3f}".format(x[i])) + " " + 
-    str("{:.3f}".format(y[i])) + " " + str("{:.3f}".format(f[i])) + "\n")
-#
-# writes the elements
-for i in range(e):
-  fout.write(str(i+1) + " 3 " + str(ikle[i,0]+1) + " " + str(ikle[i,1]+1) + " " + 
-    str(ikle[i,2]+1) + "\n")  
+writeAdcirc(n,e,x,y,f,ikle,output_file)
 #
 end_time = timeit.default_timer()
 #print('execution time is ' + str(end_time - start_time))
@@ -31,6 +31,11 @@
 # or
 # shapeid,x,y,bc_code [if the user doesn't need the description]
 #
+# Revised: Oct 18, 2026
+# The nodes in each polygon are now found with getZones() from the
+# ppmodules/polygons.py, which gives the same results as point_in_poly(),
+# but only tests the nodes inside the bounding box of each polygon.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -51,6 +56,7 @@ import os,sys                              # system parameters
 import numpy             as np             # numpy
 from ppmodules.selafin_io_pp import *      # to get SELAFIN I/O 
 from ppmodules.utilities import *          # to get the utilities
+from ppmodules.polygons import *           # to get the polygon zones
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -173,7 +179,7 @@ polygon_ids = np.unique(shapeid_poly)
 n_polygons = len(polygon_ids)
 
 # to get the attribute data for each polygon
-attribute_data = np.zeros(n_polygons, dtype=np.int)
+attribute_data = np.zeros(n_polygons, dtype=int)
 desc_data = list()
 attr_count = -1
 
@@ -197,30 +203,21 @@ else:
   desc_data.append('')
 
 # define the default *.cli file attribute for columns 1,2,3,8
-f = np.zeros(n_cli, dtype=np.int)
+f = np.zeros(n_cli, dtype=int)
 
 # creates an numpy array of string, with n_cli elements, with each
 # element being 80 characters
 fdesc = np.chararray(n_cli, itemsize=80)
 
-# loop over all polygons
-for i in range(n_polygons):
-  # construct each polygon
-  poly = []
-  for j in range(nodes):
-    if (shapeid_poly[j] == polygon_ids[i]):
-      poly.append( (x_poly[j], y_poly[j]) )
-  #print poly
-  
-  # to loop over all nodes in the *.cli file
-  for k in range(n_cli):
-    poly_test = point_in_poly(cli_x[k], cli_y[k], poly)
-    if (poly_test == 'IN'):
-      f[k] = attribute_data[i]
-      fdesc[k] = desc_data[i]
-  
-  # delete all elements in the poly list
-  del poly[:]    
+# construct each polygon
+polys = getPolygons(shapeid_poly, x_poly, y_poly)
+
+# index of the polygon each *.cli node is in (-1 if not in any polygon)
+zone = getZones(cli_x, cli_y, polys)
+
+for k in np.nonzero(zone >= 0)[0]:
+  f[k] = attribute_data[zone[k]]
+  fdesc[k] = desc_data[zone[k]]
 
 # now we are ready to write the new *.cli file
 for i in range(n_cli):
@@ -17,6 +17,11 @@
 # input must be closed, each with an attribute (i.e., water depth) that
 # get assigned to a file.
 #
+# Revised: Oct 18, 2026
+# The nodes in each polygon are now found with getZones() from the
+# ppmodules/polygons.py, which gives the same results as point_in_poly(),
+# but only tests the nodes inside the bounding box of each polygon.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -35,7 +40,7 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from ppmodules.selafin_io_pp import *      # to get SELAFIN I/O 
-from ppmodules.utilities import *          # to get the utilities (point_in_poly)
+from ppmodules.polygons import *           # to get the polygon zones
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -129,23 +134,12 @@ attribute_data[n_polygons-1] = attr_poly[nodes-1]
 # define the default attribute (i.e., water depth)
 h = np.zeros(NPOIN)
 
-# loop over all polygons
-for i in range(n_polygons):
-  # construct each polygon
-  poly = []
-  for j in range(nodes):
-    if (shapeid_poly[j] == polygon_ids[i]):
-      poly.append( (x_poly[j], y_poly[j]) )
-  #print (poly)
-  
-  # to loop over all nodes in the *.slf file
-  for k in range(NPOIN):
-    poly_test = point_in_poly(x[k], y[k], poly)
-    if (poly_test == 'IN'):
-      h[k] = attribute_data[i]
-  
-  # delete all elements in the poly list
-  del poly[:]    
+# construct each polygon
+polys = getPolygons(shapeid_poly, x_poly, y_poly)
+
+# index of the polygon each node is in (-1 if not in any polygon)
+zone = getZones(x, y, polys)
+h[zone >= 0] = attribute_data[zone[zone >= 0]]
   
 # now we are ready to write the new *.slf warm start (ws) file
 slf_ws = ppSELAFIN(output_file)
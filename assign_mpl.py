@@ -32,6 +32,14 @@
 # value that was hard coded. This version retains the original values
 # for nodes outside of the polygons.
 #
+# Modified: Oct 18, 2026
+# The nodes in each polygon are now found with getZones() from the
+# ppmodules/polygons.py (only the nodes inside the bounding box of each
+# polygon are tested, with a single contains_points() call). Also fixed
+# the same bug fixed in assign.py on Nov 1, 2020: nodes outside of a 
+# polygon were given z[i] (i being the polygon), which erased the
+# updates made by the previous polygons.
+#
 # Uses: Python 2 or 3, Matplotlib, Numpy
 #
 # Example:
@@ -50,9 +58,10 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
+from ppmodules.writeMesh import *          # to get all writeMesh functions
 import matplotlib.path as mplPath          # for point in poly test
 import timeit
-from progressbar import ProgressBar, Bar, Percentage, ETA
+from ppmodules.polygons import *           # to get the polygon zones
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -75,9 +84,6 @@ boundary_file = sys.argv[4]
 dummy3 = sys.argv[5]
 output_file = sys.argv[6]
 
-# to create the output file
-fout = open(output_file,"w")
-
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(input_file)
 
@@ -122,48 +128,23 @@ attribute_data[n_polygons-1] = attr_poly[nodes-1]
 # default attribute
 default = 0.0
 
-# define the mesh attribute
-f = np.zeros(n) * default # n is number of mesh nodes
-
-# for the progress bar
-w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=n_polygons*n).start()
-count_bar = 0
-
-# loop over all polygons
-for i in range(n_polygons):
-  # construct each polygon
-  poly = []
-  for j in range(nodes):
-    if (shapeid_poly[j] == polygon_ids[i]):
-      poly.append( (x_poly[j], y_poly[j]) )
-
-  # convert poly list to a numpy array
-  poly_array = np.asarray(poly)
-  #print poly_array
-  #print poly_array.shape
-  #print '################'
-
-  # create a mathplotlib path object
-  path = mplPath.Path(poly_array)
-  
-  # to loop over all nodes in the mesh (inneficient)
-  # TODO remove the brute force component of this code!!!
-  for k in range(n):
-    count_bar = count_bar + 1
-    pbar.update(count_bar)
-    poly_test = path.contains_point( (x[k], y[k]) )
-    if (poly_test == True):
-      f[k] = attribute_data[i]
-    else:
-      f[k] = z[i]
-  
-  # delete all elements in the poly list
-  del poly[:]    
-  #print '###########'
-
-# finish the bar
-pbar.finish()
+# define the mesh attribute as the value read from the file
+f = z
+
+# construct each polygon
+polys = getPolygons(shapeid_poly, x_poly, y_poly)
+
+# the point in poly test using a mathplotlib path object
+def inside_mpl(x, y, px, py):
+  path = mplPath.Path(np.column_stack((px,py)))
+  return path.contains_points(np.column_stack((x,y)))
+
+# index of the polygon each node is in (-1 if not in any polygon); if a
+# node is in many polygons, the last one is used
+zone = getZones(x, y, polys, inside_mpl)
+
+# nodes outside of all polygons keep their original value
+f[zone >= 0] = attribute_data[zone[zone >= 0]]
 
 # if a particular node of the mesh was not within any polygon
 # extract all values that were less then the condition f-default < 0.001
@@ -174,19 +155,7 @@ pbar.finish()
 #  print('Assigning default value of ' + str(default) + ' as attribute')
 
 # now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(e) + " " + str(n) + "\n")
-
-# writes the nodes
-for i in range(n):
-  fout.write(str(i+1) + " " + str("{:.3f}".format(x[i])) + " " + 
-    str("{:.3f}".format(y[i])) + " " + str("{:.3f}".format(f[i])) + "\n")
-#
-# writes the elements
-for i in range(e):
-  fout.write(str(i+1) + " 3 " + str(ikle[i,0]+1) + " " + str(ikle[i,1]+1) + " " + 
-    str(ikle[i,2]+1) + "\n")  
+writeAdcirc(n,e,x,y,f,ikle,output_file)
 #
 end_time = timeit.default_timer()
 
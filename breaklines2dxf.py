@@ -16,6 +16,11 @@
 # Purpose: Takes a pputils 3d breakline and exports it to dxf format. 
 # To create the 3d breakline from xyz and lines.csv, run mkbreakline.py
 # 
+# Revised: Oct 18, 2026
+# The breaklines are streamed to the dxf file from the arrays of the lines
+# file (see dxfwrite/stream.py), rather than first made into dxfwrite
+# entity objects. Lines that have only one node are not written.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -28,7 +33,6 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from dxfwrite import DXFEngine as dxf      # for dxf export
-from progressbar import ProgressBar, Bar, Percentage, ETA
 curdir = os.getcwd()
 #
 # I/O
@@ -67,32 +71,18 @@ n_unique_lns = np.unique(shapeid_lns)
 # number of nodes in the lines file
 n_lns = len(x_lns)
 
-w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=n_lns).start()
-
-# write the breaklines
-poly = dxf.polyline()
+# the segments of the breaklines (a node and the next node of the same
+# line); as before, each segment is written as a pair of vertices
+same = (shapeid_lns[1:] - shapeid_lns[:-1] < 0.001)
+seg = np.nonzero(same)[0]
+idx = np.column_stack((seg, seg+1)).ravel()
 
-for i in range(0,n_lns):
-	pbar.update(i+1)
-	if (i>0):
-		cur_lns_shapeid = shapeid_lns[i]
-		prev_lns_shapeid = shapeid_lns[i-1]
-		
-		if (cur_lns_shapeid - prev_lns_shapeid < 0.001):
-			# create tupples for vertexes to add
-			v0 = (x_lns[i-1], y_lns[i-1], z_lns[i-1])
-			v1 = (x_lns[i], y_lns[i], z_lns[i])
-			poly.add_vertices( [v0, v1] )
-			
-			# this is needed, as the else below is never executed
-			# for the last line in the lines file!
-			if (i == n_lns-1):
-				drawing.add(poly)
-		else:
-			drawing.add(poly)
-			poly = dxf.polyline()
+# each line starts with a new polyline
+line = np.concatenate(([0], np.cumsum(~same)))[seg]
+starts = np.nonzero(np.diff(np.concatenate(([-1], line))))[0]
+offsets = 2 * np.append(starts, len(seg))
 
-############################################################################
-drawing.save()
-pbar.finish()	
+# write the breaklines
+stream = drawing.stream()
+stream.add_polylines(x_lns[idx], y_lns[idx], z_lns[idx], offsets=offsets)
+stream.close()
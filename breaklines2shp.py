@@ -26,6 +26,11 @@
 # Incorporated changes suggested by user nstrahl, that make the script
 # work in the latest version of pyshp package.
 #
+# Revised: Oct 18, 2026
+# The breaklines are written with the array based writer of pyshp
+# (shapeArrays() and recordArrays()), rather than one line and one record
+# at a time.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -43,7 +48,6 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from pyshp.shapefile import *              # pyshp class
-from progressbar import ProgressBar, Bar, Percentage, ETA
 #
 # I/O
 if len(sys.argv) == 7 :
@@ -81,14 +85,18 @@ x_lns = np.around(x_lns,decimals=3)
 y_lns = np.around(y_lns,decimals=3)
 z_lns = np.around(z_lns,decimals=3)
 
-# finds out how many unique breaklines there are
-n_unique_lns = np.unique(shapeid_lns)
-
 # number of nodes in the lines file
 n_lns = len(x_lns)
 
-w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=n_lns).start()
+# a new line starts where the shapeid changes
+breaks = np.nonzero(shapeid_lns[1:] - shapeid_lns[:-1] >= 0.001)[0] + 1
+offsets = np.concatenate(([0], breaks, [n_lns]))
+
+# the id of each line is the same as in earlier versions of this script
+# (one more than the index of the first node of the next line, and the
+# number of nodes for the last line)
+ids = offsets[1:] + 1
+ids[-1] = n_lns
 
 # to create the output file
 if (shptype == '2d'):
@@ -97,47 +105,13 @@ elif (shptype == '3d'):
   out = Writer(target=output_file, shapeType=13) # this is POLYLINEZ, or 3d shapefile
 else:
   print('Invalid type specified in the -t argument. Exiting!')
+  sys.exit()
 
 # create the field 'id'
 out.field('id', 'C', 10, 0)
 
-# now we can write the breaklines
-
-part=[]
-
-for i in range(0,n_lns):
-  pbar.update(i+1)
-
-  if (i>0):
-    cur_lns_shapeid = shapeid_lns[i]
-    prev_lns_shapeid = shapeid_lns[i-1]
-
-    if (cur_lns_shapeid - prev_lns_shapeid < 0.001):
-      # create tupples for vertexes to add
-      
-      part.append([x_lns[i-1], y_lns[i-1], z_lns[i-1], 0.0])
-      
-      # this is needed, as the else below is never executed
-      # for the last line in the lines file!
-      if (i == n_lns-1):
-        part.append([x_lns[i], y_lns[i], z_lns[i], 0.0])
-        if (shptype == '2d'):
-          out.line(lines=[part])
-        else:
-          out.linez(lines=[part])
-          
-        out.record(id=i+1)
-      
-    else:
-      part.append([x_lns[i-1], y_lns[i-1], z_lns[i-1], 0.0])
-      if (shptype == '2d'):
-        out.line(lines=[part])
-      else:
-        out.linez(lines=[part])
-          
-      out.record(id=i+1)
-      
-      part=[]
+# now we can write the breaklines (the m value of the nodes is zero)
+out.shapeArrays(x_lns, y_lns, z_lns, np.zeros(n_lns), offsets=offsets)
+out.recordArrays(ids)
 
 out.close()
-pbar.finish()  
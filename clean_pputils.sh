@@ -27,3 +27,12 @@ find . -iname "__pycache__" -type d -exec rm -rf {} \;
 
 ############################
 
+echo "Deleting the following *.ppcache.npz mesh cache files recursively ... "
+
+# to list all cache files written by readAdcirc() and transp.py
+find . -iname "*.ppcache.npz" -type f
+
+# to delete them all
+find . -iname "*.ppcache.npz" -type f -exec rm -rf {} \;
+
+############################
@@ -10,33 +10,43 @@
 # 
 # Date: Apr 5, 2018
 #
+# Revised: Oct 18, 2026
+# The interpolation and integration weights of the sections are computed
+# once (see ppmodules/sections.py), and Q is computed for many time steps
+# at once from the memory mapped results. Added the optional -m argument
+# to integrate exactly between the crossings of the sections with the
+# edges of the mesh.
+#
 # Purpose: Script takes in a *.slf file (2d for now), and computes the
 # discharge through sections (which have to be re-sampled and be 
 # provided in PPUTILS line format). The cross sections have to be
 # defined such that they are perpedicular to the flow. If the sections
 # are not perpedicular to the flow, garbage results may be reported.
 #
-# Uses: Python 2 or 3, Numpy
+# Uses: Python 2 or 3, Numpy, Scipy
 #
 # Example:
 #
-# python computeQ.py -i result.slf -l line.csv -o line_Q.csv
+# python computeQ.py -i result.slf -l line.csv -o line_Q.csv -m simpson
 # where:
 #
 # -i ==> 2d *.slf result file, containing variables depth and velocity
 # -l ==> PPUTILS formatted line fine, resampled (shapeid,x,y columns) 
 # -o ==> output *.csv file, which prints a time series of Q for each 
 #        section in the -l file
+# -m ==> (optional) integration method; simpson (the default) uses
+#        simpson's rule on the nodes of the resampled sections, while
+#        exact also splits the sections where they cross the mesh edges,
+#        and integrates the unit discharge exactly on each piece
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
 import numpy             as np             # numpy
-import matplotlib.tri    as mtri           # matplotlib triangulations
 from ppmodules.selafin_io_pp import *      # to get SELAFIN I/O 
 from ppmodules.utilities import *          # to get the utilities
-from scipy.integrate import simps          # simpson's rule integration 
+from ppmodules.sections import *           # to get the section fluxes
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -44,16 +54,26 @@ from scipy.integrate import simps          # simpson's rule integration
 curdir = os.getcwd()
 #
 # I/O
-if len(sys.argv) != 7:
+if len(sys.argv) != 7 and len(sys.argv) != 9:
   print('Wrong number of Arguments, stopping now...')
   print('Usage:')
   print('python computeQ.py -i result.slf -l line.csv -o line_Q.csv')
+  print('or')
+  print('python computeQ.py -i result.slf -l line.csv -o line_Q.csv -m exact')
   sys.exit()
 
 input_file = sys.argv[2]
 lines_file = sys.argv[4]
 output_file = sys.argv[6]
 
+method = 'simpson'
+if len(sys.argv) == 9:
+  method = sys.argv[8]
+
+if (method != 'simpson' and method != 'exact'):
+  print('Integration method must be simpson or exact. Exiting!')
+  sys.exit()
+
 # now read the input *.slf geometry file
 slf = ppSELAFIN(input_file)
 slf.readHeader()
@@ -89,30 +109,18 @@ y_lns = lines_data[2,:]
 x_lns = np.around(x_lns,decimals=3)
 y_lns = np.around(y_lns,decimals=3)
 
-# need to compute chainage for each line
-dist = np.zeros(len(shapeid_lns))
-sta = np.zeros(len(shapeid_lns))
-
-for i in range(1, len(shapeid_lns)):
-  if (shapeid_lns[i] - shapeid_lns[i-1] < 0.001):
-    xdist = x_lns[i] - x_lns[i-1]
-    ydist = y_lns[i] - y_lns[i-1]
-    dist[i] = np.sqrt(xdist*xdist + ydist*ydist)
-    sta[i] = sta[i-1] + dist[i]
+# the IKLE array starts at element 1, but matplotlib needs it to start
+# at zero
+IKLE = IKLE - 1
 
-# get the unique line ids
-unique_lines = np.unique(shapeid_lns)
+# the interpolation weights of the integration points of the sections,
+# and the integration weights of each section are computed only once
+unique_lines, P, W, undefined = sectionOperators(x, y, IKLE, 
+  shapeid_lns, x_lns, y_lns, exact=(method == 'exact'))
 
 # find out how many different lines there are
 n_lns = len(unique_lines)
 
-# the IKLE array starts at element 1, but matplotlib needs it to start
-# at zero
-IKLE[:,:] = IKLE[:,:] - 1
-
-# create triangulation object using matplotlib
-triang = mtri.Triangulation(x, y, IKLE)
-
 # now we need to find if the result file has these variables:
 # DEPTH, VELOCITY U, VELOCITY V
 
@@ -138,45 +146,33 @@ if ((depth_idx < 0) or (velu_idx < 0) or (velv_idx < 0) ):
 # the final results variable where the results will be saved
 Q = np.zeros( (len(times), n_lns) )
 
+# the results are read from the memory map of the *.slf file, and Q is 
+# computed for many time steps at once
+slf.mapResults()
+res = slf.getResults()
+nmapped = min(ntimes, res.shape[0])
+
+# number of time steps in each chunk
+chunk = 100
+
 # this is the start of the main loop
-for t in range(len(times)):
+for t0 in range(0, nmapped, chunk):
+  t1 = min(t0 + chunk, nmapped)
   
   # print time step to the user
-  print('Computing Q at time step index :' + str(t))
+  print('Computing Q at time step indices :' + str(t0) + ' to ' + str(t1-1))
   
-  # read the snapshot for time t from the *.slf file
+  Q[t0:t1,:] = sectionFlux(P, W, undefined, res[t0:t1,depth_idx,:],
+    res[t0:t1,velu_idx,:], res[t0:t1,velv_idx,:])
+
+# a truncated last time step is not in the memory map
+for t in range(nmapped, ntimes):
+  print('Computing Q at time step index :' + str(t))
   slf.readVariables(t)
   master_results = slf.getVarValues()
   
-  # store depths, velu and velv from the input file
-  depths = master_results[depth_idx, :]
-  velu = master_results[velu_idx, :]
-  velv = master_results[velv_idx, :]
-  
-  # to perform the interpolations at the nodes of the resampled lines
-  # for depth, velu, and velv
-  interpolator_depths = mtri.LinearTriInterpolator(triang, depths)
-  depths_lns = interpolator_depths(x_lns, y_lns)
-
-  interpolator_velu = mtri.LinearTriInterpolator(triang, velu)
-  velu_lns = interpolator_velu(x_lns, y_lns)
-  
-  interpolator_velv = mtri.LinearTriInterpolator(triang, velv)
-  velv_lns = interpolator_velv(x_lns, y_lns)
-  
-  uh = velu_lns[:] * depths_lns[:]
-  vh =  velv_lns[:] * depths_lns[:]
-  mag = np.sqrt( uh*uh + vh*vh)
-
-  # now go through each line, and integrate
-  for j in range(n_lns):
-    cursta = list()
-    curmag = list()
-    for i in range(len(mag)):
-      if (abs(unique_lines[j] - shapeid_lns[i]) < 0.01):
-        cursta.append(sta[i])
-        curmag.append(mag[i])
-    Q[t,j] = simps(curmag,cursta)
+  Q[t,:] = sectionFlux(P, W, undefined, master_results[[depth_idx],:],
+    master_results[[velu_idx],:], master_results[[velv_idx],:])[0,:]
 
 # prints the final result to the file    
 # write the header string
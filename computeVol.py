@@ -14,19 +14,34 @@
 # elevation to computes the volume of the surface between the reference
 # elevation and the surface.
 #
-# Note: This script does not know how to calculate volume in the case
-# when the reference plane and a particular element intersect. An error
-# is thrown in this case, and the script terminates!
+# Revised: Oct 18, 2026
+# The elements are oriented, and their areas computed, with the Mesh class
+# from ppmodules/mesh.py, for all elements at once.
+#
+# Revised: Oct 18, 2026
+# The reference level can now intersect the elements (the elements are
+# clipped exactly by the reference plane). The script can also compute
+# the stage-storage and stage-area curves of the surface (the volume and
+# the wetted area below each level) for a range of levels in one run, and
+# write them to a *.csv file; an optional polygon file limits the curves
+# to the elements whose centroids are inside the polygons.
 #
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
 #
 # python computeVol.py -i tin.grd -r 100
+# or
+# python computeVol.py -i tin.grd -l 90 110 0.5 -o curve.csv
+# or
+# python computeVol.py -i tin.grd -l 90 110 0.5 -o curve.csv -p poly.csv
 # where:
 #
 # -i ==> digital surface in a *.grd file (i.e., an ADCIRC mesh or tin)
 # -r ==> reference elevation above which the volume is to be computed
+# -l ==> first level, last level and level increment of the curves
+# -o ==> output *.csv file with the stage, wetted area and volume
+# -p ==> (optional) polygon file in pputils format (shapeid,x,y)
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
@@ -35,82 +50,101 @@ import os,sys                              # system parameters
 import numpy             as np             # numpy 
 from ppmodules.utilities import *          # to get the utilities
 from ppmodules.readMesh import *           # to get the readAdcirc fun
+from ppmodules.mesh import *               # for the Mesh class
+from ppmodules.polygons import *           # for the polygon mask
+from ppmodules.writeMesh import *          # for writeRows()
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~  
 #
-def element_area(x1,y1,x2,y2,x3,y3):
-	# signs in eqs work when the elements are CCW
-	twoA = (x2*y3 - x3*y2) - (x1*y3-x3*y1) + (x1*y2 - x2*y1)
-	area = twoA / 2.0
-	return area
-  
-# this works for python 2 and 3
-def CCW(x1,y1,x2,y2,x3,y3):
-   return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)
-#
 def computeVolume(input_file, ref_level):
   # now read the input mesh file (ikle are zero based)
   n,e,x,y,z,ikle = readAdcirc(input_file)
   
-  # find the min of z
-  minz = np.min(z)
-
-  # The reference level could be intersecting an element,
-  # which means the element volume would not be a truncated
-  # right triangular prism. This script doesn't deal with this. As a
-  # workaround, grid the TIN, and compute the volume using SAGA GIS.
-  if (ref_level >= minz):
-    print('Reference level too high. Reduce it, and try again. Exiting.')
-    sys.exit()
-  
   # make sure the elements are oriented in CCW fashion
-  # go through each element, and make sure it is oriented in CCW fashion
-  for i in range(len(ikle)):
-    
-    # if the element is not CCW then must change its orientation
-    if not CCW( x[ikle[i,0]], y[ikle[i,0]], x[ikle[i,1]], y[ikle[i,1]], 
-      x[ikle[i,2]], y[ikle[i,2]] ):
-    
-      t0 = ikle[i,0]
-      t1 = ikle[i,1]
-      t2 = ikle[i,2]
-      
-      # switch orientation
-      ikle[i,0] = t2
-      ikle[i,2] = t0
+  mesh = Mesh(x,y,ikle,z).getOriented()
+  ikle = mesh.ikle
   
   # compute the area and volume of each element in the mesh (or tin) file
-  area = np.zeros(e)
-  vol = np.zeros(e)
+  area = mesh.getAreas()
   
-  for i in range(e):
-    area[i] = element_area(x[ikle[i,0]], y[ikle[i,0]], 
-      x[ikle[i,1]], y[ikle[i,1]], x[ikle[i,2]], y[ikle[i,2]])
-      
-    # the volume between the reference level and the surface in a tin model
-    # is the same as the volume of truncated right triangular prism
-    vol[i] = (area[i] / 3.0) * ( (z[ikle[i,0]] - ref_level) +
-      (z[ikle[i,1]] - ref_level) + (z[ikle[i,2]] - ref_level) )
+  # the volume between the reference level and the surface in a tin model
+  # is the same as the volume of truncated right triangular prism (this
+  # is negative where the surface is below the reference level)
+  vol = (area / 3.0) * ( (z[ikle[:,0]] - ref_level) +
+    (z[ikle[:,1]] - ref_level) + (z[ikle[:,2]] - ref_level) )
     
-  # the total volume is the sum of the the individual vol[i]
-  volTotal = np.sum(vol)
+  # the total volume is the sum of the the individual vol[i], plus the 
+  # volume between the reference level and the surface where the surface
+  # is below the reference level (zero if the whole surface is above it)
+  wet_area, below = stageStorage(mesh, [ref_level])
+  volTotal = np.sum(vol) + below[0]
   
   return volTotal
 
+# computes the stage-storage and stage-area curves of the surface in the
+# input_file for the levels, and writes them to the output_file; if the
+# poly_file is given, only the elements with centroids inside its polygons
+# are used
+def computeCurves(input_file, levels, output_file, poly_file=None):
+  # now read the input mesh file (ikle are zero based)
+  n,e,x,y,z,ikle = readAdcirc(input_file)
+  
+  mesh = Mesh(x,y,ikle,z)
+  
+  mask = None
+  if poly_file is not None:
+    # use numpy to read the polygon file in pputils format
+    poly_data = np.loadtxt(poly_file, delimiter=',',skiprows=0,unpack=True)
+    polys = getPolygons(poly_data[0,:], poly_data[1,:], poly_data[2,:])
+    
+    xc, yc = mesh.getCentroids()
+    mask = (getZones(xc, yc, polys) >= 0)
+  
+  wet_area, volume = stageStorage(mesh, levels, mask)
+  
+  fout = open(output_file, 'w')
+  fout.write('stage,area,volume' + '\n')
+  writeRows(fout, '%.3f,%.3f,%.3f', np.column_stack((levels, wet_area, volume)))
+  fout.close()
+
 # main starts here
-if len(sys.argv) != 5:
+if len(sys.argv) == 5:
+  input_file = sys.argv[2]
+  ref_level = float(sys.argv[4])
+  
+  # the call to the function above
+  input_file_volume = computeVolume(input_file, ref_level)
+  
+  # print the computed mesh volume (truncate the result to three decimals)
+  print('Volume is: ' + str('{:.3f}'.format(input_file_volume)))
+elif len(sys.argv) == 9 or len(sys.argv) == 11:
+  input_file = sys.argv[2]
+  first_level = float(sys.argv[4])
+  last_level = float(sys.argv[5])
+  increment = float(sys.argv[6])
+  output_file = sys.argv[8]
+  poly_file = None
+  if len(sys.argv) == 11:
+    poly_file = sys.argv[10]
+  
+  if (increment <= 0.0 or last_level < first_level):
+    print('The levels must be increasing. Exiting.')
+    sys.exit()
+  
+  # the levels from the first to the last level (the last level is
+  # included if it is a whole number of increments from the first one)
+  num_levels = int(np.floor((last_level - first_level) / increment + 1.0E-9)) + 1
+  levels = first_level + increment * np.arange(num_levels)
+  
+  computeCurves(input_file, levels, output_file, poly_file)
+else:
   print('Wrong number of Arguments, stopping now...')
   print('Usage:')
   print('python computeVol.py -i tin.grd -r 100.0')
+  print('or')
+  print('python computeVol.py -i tin.grd -l 90 110 0.5 -o curve.csv')
+  print('or')
+  print('python computeVol.py -i tin.grd -l 90 110 0.5 -o curve.csv -p poly.csv')
   sys.exit()
-
-input_file = sys.argv[2]
-ref_level = float(sys.argv[4])
-
-# the call to the function above
-input_file_volume = computeVolume(input_file, ref_level)
-
-# print the computed mesh volume (truncate the result to three decimals)
-print('Volume is: ' + str('{:.3f}'.format(input_file_volume)))
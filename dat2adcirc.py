@@ -13,6 +13,10 @@
 # Purpose: Script takes files of type *.dat and converts it to the
 # ADCIRC mesh file format.
 #
+# Revised: Oct 18, 2026
+# The elements are oriented with the Mesh class from ppmodules/mesh.py,
+# for all elements at once.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -30,10 +34,7 @@ import numpy as np
 
 from ppmodules.readMesh import *
 from ppmodules.writeMesh import *
-
-# this works for python 2 and 3
-def CCW(x1,y1,x2,y2,x3,y3):
-  return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)	
+from ppmodules.mesh import *
 
 # I/O
 if len(sys.argv) != 5 :
@@ -51,20 +52,8 @@ n,e,x,y,z,ikle = readDat(dat_file)
 
 # #######################
 # make sure the elements are oriented in CCW fashion
-# go through each element, and make sure it is oriented in CCW fashion
-for i in range(len(ikle)):
-  
-  # if the element is not CCW then must change its orientation
-  if not CCW( x[ikle[i,0]], y[ikle[i,0]], x[ikle[i,1]], y[ikle[i,1]], 
-    x[ikle[i,2]], y[ikle[i,2]] ):
-    
-    t0 = ikle[i,0]
-    t1 = ikle[i,1]
-    t2 = ikle[i,2]
-    
-    # switch orientation
-    ikle[i,0] = t2
-    ikle[i,2] = t0
+# the elements that are not CCW have their first and last nodes switched
+ikle = Mesh(x,y,ikle).getOriented().ikle
 # #######################
 
 # writes the mesh file
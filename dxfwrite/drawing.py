@@ -136,6 +136,15 @@ class Drawing(object):
         """
         writetags(fileobj, self.__dxftags__(), self.ENCODING)
 
+    def stream(self, chunk=10000):
+        """ Write the drawing to file-system (Drawing.filename), with entities
+        streamed from arrays, see :class:`~dxfwrite.stream.EntityStream`.
+
+        Returns the EntityStream, which has to be closed.
+        """
+        from dxfwrite.stream import EntityStream
+        return EntityStream(self, chunk)
+
     def saveas(self, name):
         """ Set new filename and write DXF data to file-system.
         """
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+#coding:utf-8
+# Purpose: streaming entity writer
+# module belongs to package: dxfwrite
+# Created: 18.10.2026
+# License: MIT License
+"""
+Provides the EntityStream, which writes a drawing to its file with the
+entities of the ENTITIES section given as arrays.
+
+The HEADER, TABLES and BLOCKS sections, and the entities already added to
+the drawing, are written when the stream is created. POINT, 3DFACE and
+POLYLINE entities are then formatted straight from the coordinate arrays
+and written to the file a chunk at a time, so no entity objects are made,
+and the memory used does not depend on the number of entities. The tags are
+the same as those written by Drawing.save() for the same entities.
+"""
+
+import numpy as np
+
+from dxfwrite.base import iterdxftags
+from dxfwrite.util import PYTHON3, to_string
+
+class EntityStream(object):
+    """ Writes a drawing, with the entities given as arrays.
+
+    Entities added to the drawing after the stream was created are not
+    written; the stream has to be closed to finish the file.
+    """
+    def __init__(self, drawing, chunk=10000):
+        """ EntityStream constructor.
+
+        :param drawing: the drawing, its filename is the output file
+        :param int chunk: number of entities formatted and written at once
+        """
+        self.chunk = chunk
+        if PYTHON3:
+            self.fileobj = open(drawing.filename, 'w', encoding=drawing.ENCODING,
+                                errors="replace")
+        else:
+            self.fileobj = open(drawing.filename, 'w')
+        for section in (drawing.header, drawing.tables, drawing.blocks):
+            self._writetags(section)
+        self.fileobj.write("  0\nSECTION\n  2\nENTITIES\n")
+        self._writetags(drawing.entities.entities)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _writetags(self, dxfobj):
+        for dxftag in iterdxftags(dxfobj):
+            self.fileobj.write(dxftag.__dxf__())
+
+    def _write(self, template, xyz, index=None):
+        """ Write one entity for each row of index (the indices of the points
+        of each entity), or for each point if index is None, formatted by
+        template, which has a '%s' for each coordinate of an entity. """
+        rows = len(xyz) if index is None else len(index)
+        for start in range(0, rows, self.chunk):
+            if index is None:
+                block = xyz[start:start+self.chunk]
+            else:
+                block = xyz[index[start:start+self.chunk]]
+            # str() of the python floats, as in DXFAtom.__dxf__()
+            self.fileobj.write((template * len(block)) % tuple(block.ravel().tolist()))
+
+    def _layer(self, layer):
+        # the layer name is part of the templates, so '%' has to be escaped
+        return to_string(layer).replace('%', '%%')
+
+    def _coords(self, x, y, z):
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if z is None:
+            z = np.zeros(len(x))
+        z = np.asarray(z, dtype=np.float64).ravel()
+        return np.column_stack((x, y, z))
+
+    def add_points(self, x, y, z=None, layer='0'):
+        """ Add a POINT entity for each point (x, y, z), z-value is 0 if z is
+        None.
+        """
+        template = "  0\nPOINT\n  8\n" + self._layer(layer) + "\n 10\n%s\n 20\n%s\n 30\n%s\n"
+        self._write(template, self._coords(x, y, z))
+
+    def add_faces(self, x, y, z, faces, layer='0'):
+        """ Add a 3DFACE entity for each row of faces, which are the indices of
+        the 3 or 4 points of each face in the coordinate arrays (the fourth
+        point of a triangle is the same as the third).
+        """
+        xyz = self._coords(x, y, z)
+        faces = np.asarray(faces)
+        if faces.shape[1] == 3:
+            faces = faces[:, [0, 1, 2, 2]]
+        template = "  0\n3DFACE\n  8\n" + self._layer(layer) + "\n"
+        for i in range(4):
+            template += " 1%d\n%%s\n 2%d\n%%s\n 3%d\n%%s\n" % (i, i, i)
+        self._write(template, xyz, faces)
+
+    def add_polylines(self, x, y, z=None, connectivity=None, offsets=None,
+                      layer='0'):
+        """ Add 3D POLYLINE entities. The vertices of polyline i are either the
+        points in row i of connectivity (indices into the coordinate arrays,
+        one row per polyline, such as the closed rings of the elements of a
+        mesh), or the points offsets[i] to offsets[i+1]-1. If neither is
+        given, all of the points are a single polyline. z-value is 0 if z is
+        None.
+        """
+        xyz = self._coords(x, y, z)
+        layer = self._layer(layer)
+        head = "  0\nPOLYLINE\n  8\n" + layer + "\n 66\n1\n 10\n0.0\n 20\n0.0\n 30\n0.0\n 70\n8\n"
+        vertex = "  0\nVERTEX\n  8\n" + layer + "\n 10\n%s\n 20\n%s\n 30\n%s\n"
+        tail = "  0\nSEQEND\n"
+        if connectivity is not None:
+            # all polylines have the same number of vertices
+            connectivity = np.asarray(connectivity)
+            self._write(head + vertex * connectivity.shape[1] + tail, xyz,
+                        connectivity)
+            return
+        if offsets is None:
+            offsets = [0, len(xyz)]
+        offsets = np.asarray(offsets)
+        for start in range(0, len(offsets) - 1, self.chunk):
+            stop = min(start + self.chunk, len(offsets) - 1)
+            counts = np.diff(offsets[start:stop+1]).tolist()
+            template = "".join([head + vertex * count + tail for count in counts])
+            values = xyz[offsets[start]:offsets[stop]].ravel().tolist()
+            self.fileobj.write(template % tuple(values))
+
+    def close(self):
+        """ Close the ENTITIES section and the file.
+        """
+        if not self.fileobj.closed:
+            self.fileobj.write("  0\nENDSEC\n  0\nEOF\n")
+            self.fileobj.close()
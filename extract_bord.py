@@ -28,6 +28,10 @@
 # -p PPUTILS nodes file with coordinates of extraction points
 # -o output text file
 #
+# Revised: Oct 18, 2026
+# Results for all points are now extracted with a single call to
+# readVariablesAtNodes(), instead of once per point.
+#
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -98,21 +102,16 @@ npoints = len(ox)
 source = np.column_stack((x,y))
 tree = spatial.cKDTree(source)
 
-# list of output for final results for bord.f
-all_res = np.empty([npoints,ntimes,NVAR])
-
 # for each coordinate in the points data, find the corresponding node
-# in the results file mesh
-for i in range(npoints):
-    
-  # find the node index using cKDTree        
-  d, idx = tree.query((ox[i],oy[i]), k = 1)
+# in the results file mesh using cKDTree
+d, idx = tree.query(np.column_stack((ox,oy)), k = 1)
 
-  # now that we know which node it is, use methods in ppSELAFIN_io class
-  slf.readVariablesAtNode(idx)
-  result = slf.getVarValuesAtNode()
+# now that we know which nodes they are, extract the results for all
+# of them at once using methods in ppSELAFIN_io class
+slf.readVariablesAtNodes(idx)
 
-  all_res[i,:,:] = result
+# output for final results for bord.f, of shape (npoints,ntimes,NVAR)
+all_res = slf.getVarValuesAtNodes()
   
 # to write a separate file for each variable
 for k in range(NVAR):
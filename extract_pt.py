@@ -39,6 +39,10 @@
 # for 3d files had to be adjusted, so that output remained the same as
 # before.
 #
+# Revised: Oct 18, 2026
+# Results for all planes are now extracted with a single call to
+# readVariablesAtNodes().
+#
 # Uses: Python 2 or 3, Matplotlib, Numpy
 #
 # Example:
@@ -167,9 +171,11 @@ fout.write('\n')
 
 ########################################################################
 # extract results for every plane (if there are multiple planes that is)
+slf.readVariablesAtNodes(idx_all)
+results_all = slf.getVarValuesAtNodes()
+
 for p in range(NPLAN):
-  slf.readVariablesAtNode(idx_all[p])
-  results = slf.getVarValuesAtNode()
+  results = results_all[p]
   
   # outputs the results 'd %b %Y %H:%M'
   for i in range(len(times)):
@@ -27,6 +27,12 @@
 # For some test cases cKDTree crashed, while KDTree went to completion.
 # Therefore, revert back to using KDTree.
 #
+# Revised: Oct 18, 2026
+# Duplicate nodes are now removed with unique_nodes_index() from the
+# ppmodules/utilities.py, rather than with an OrderedDict. The KDTree is
+# built from the unique nodes only (it used to also include the leftover
+# nodes past n, which crashed the script when there were duplicates).
+#
 # Uses: Python2.7.9, Numpy v1.8.2
 #
 # Example:
@@ -77,7 +83,7 @@
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
 import numpy             as np             # numpy
-from collections import OrderedDict        # for removal of duplicate nodes
+from ppmodules.utilities import *          # for removal of duplicate nodes
 from scipy import spatial                  # kd tree for searching coords
 curdir = os.getcwd()
 #
@@ -157,33 +163,23 @@ y = np.around(y,decimals=3)
 z = np.around(z,decimals=3)
 size = np.around(size,decimals=3)
 
-# this piece of code uses OrderedDict to remove duplicate nodes
-# source "http://stackoverflow.com/questions/12698987"
-# ###################################################################
-tmp = OrderedDict()
-for point in zip(x, y, z, size):
-  tmp.setdefault(point[:2], point)
-
-# in python 3 tmp.values() is a view object that needs to be 
-# converted to a list
-mypoints = list(tmp.values()) 
-# ###################################################################
-n_rev = len(mypoints)
-
+# indices of the unique nodes, in the order they first occur
+# (unique_nodes_index() is from ppmodules/utilities.py)
 # replace x,y,z,size and n with their unique equivalents
 if (duplicates_flag == 1):
-	for i in range(n_rev):
-		x[i] = mypoints[i][0]
-		y[i] = mypoints[i][1]
-		z[i] = mypoints[i][2]
-		size[i] = mypoints[i][3]
+	idx = unique_nodes_index(x,y)
+	n_rev = len(idx)
+	x[0:n_rev] = x[idx]
+	y[0:n_rev] = y[idx]
+	z[0:n_rev] = z[idx]
+	size[0:n_rev] = size[idx]
 	n = n_rev
 
 # when I made the change to python 3, had to use np.column_stack
 # http://stackoverflow.com/questions/28551279/error-running-scipy-kdtree-example
 
 # to create the tuples of the master points
-points = np.column_stack((x,y))
+points = np.column_stack((x[0:n],y[0:n]))
 tree = spatial.KDTree(points)
 
 # if node is part of boundary or lines, then it is not embedded
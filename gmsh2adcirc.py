@@ -20,6 +20,10 @@
 # Purpose: Script takes the file generated by gmsh mesh generator, and 
 # converts it to an ADCIRC mesh format
 #
+# Revised: Oct 18, 2026
+# The elements are oriented with the Mesh class from ppmodules/mesh.py,
+# for all elements at once.
+#
 # Uses: Python 2 or 3, Matplotlib v1.4.2, Numpy v1.8.2
 #
 # Example:
@@ -36,10 +40,8 @@
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys
 import numpy as np
-
-# this works for python 2 and 3
-def CCW(x1,y1,x2,y2,x3,y3):
-  return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)	
+from ppmodules.writeMesh import *          # to get all writeMesh functions
+from ppmodules.mesh import *               # for the Mesh class
 
 curdir = os.getcwd()
 #
@@ -54,9 +56,6 @@ gmsh_file = sys.argv[2]
 dummy2 =  sys.argv[3]
 adcirc_file = sys.argv[4]
 
-# to create the output file
-fout = open(adcirc_file,"w")
-
 # to read the entire *.msh file as string (and clip of the stuff that is
 # not needed
 # each line in the file is a list object
@@ -118,43 +117,19 @@ e2 = e2.astype(np.int32)
 e3 = elements_data[7,:]
 e3 = e3.astype(np.int32)
 
-# now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(len(e1)) + " " + str(len(node_id)) + "\n")
-
 # added on 2017.05.30
 # #######################
 # make sure the elements are oriented in CCW fashion
 
 ikle = np.column_stack((e1,e2,e3))
 
-# go through each element, and make sure it is oriented in CCW fashion
-
-for i in range(len(ikle)):
-  
-  # if the element is not CCW then must change its orientation
-  if not CCW( x[ikle[i,0]-1], y[ikle[i,0]-1], x[ikle[i,1]-1], y[ikle[i,1]-1], 
-    x[ikle[i,2]-1], y[ikle[i,2]-1] ):
-    
-    t0 = ikle[i,0]
-    t1 = ikle[i,1]
-    t2 = ikle[i,2]
-    
-    # switch orientation
-    ikle[i,0] = t2
-    ikle[i,2] = t0
+# the elements that are not CCW have their first and last nodes switched
+ikle = Mesh(x,y,ikle-1).getOriented().ikle + 1
 # #######################
 
-# writes the nodes
-for i in range(0,len(node_id)):
-  fout.write(str(node_id[i]) + " " + str("{:.3f}".format(x[i])) + " " + 
-    str("{:.3f}".format(y[i])) + " " + str("{:.3f}".format(z[i])) + "\n")
-
-# writes the elements
-for i in range(0,len(e1)):
-  fout.write(str(i+1) + " 3 " + str(ikle[i,0]) + " " + str(ikle[i,1]) + " " + 
-    str(ikle[i,2]) + "\n")  
+# now to write the adcirc mesh file (ikle here is one based, and the
+# node ids in the *.msh file are numbered sequentially)
+writeAdcirc(len(node_id),len(e1),x,y,z,ikle-1,adcirc_file)
 
 # now we can delete the temp file
 os.remove(temp_nodes_file)
@@ -38,6 +38,7 @@ import os,sys                              # system parameters
 import matplotlib.tri    as mtri           # matplotlib triangulations
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
+from ppmodules.writeMesh import *          # to get all writeMesh functions
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -98,20 +99,5 @@ for i in range(len(m_x)):
 		
 		m_z[i] = t_z[minidx]
 
-# to create the output file
-fout = open(output_file,"w")
-
 # now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(m_e) + " " + str(m_n) + "\n")
-
-# writes the nodes
-for i in range(0,m_n):
-	fout.write(str(i+1) + " " + str("{:.3f}".format(m_x[i])) + " " + 
-		str("{:.3f}".format(m_y[i])) + " " + str("{:.3f}".format(m_z[i])) + "\n")
-#
-# writes the elements
-for i in range(0,m_e):
-	fout.write(str(i+1) + " 3 " + str(m_ikle[i,0]+1) + " " + str(m_ikle[i,1]+1) + " " + 
-		str(m_ikle[i,2]+1) + "\n")
+writeAdcirc(m_n,m_e,m_x,m_y,m_z,m_ikle,output_file)
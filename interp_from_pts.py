@@ -27,6 +27,13 @@
 # Revised: Nov 21, 2016
 # Changed KDTree to cKDTree to improve performance.
 #
+# Revised: Oct 18, 2026
+# All nodes are now interpolated at once (a single query of the tree, and
+# vectorized weights), rather than one node at a time. Added optional
+# arguments for the power of the inverse distance weights, the search
+# radius, and the minimum number of neighbours within the radius. Nodes
+# that can't be interpolated are assigned -999.0.
+#
 # Uses: Python 2 or 3, Matplotlib, Numpy
 #
 # Example:
@@ -36,6 +43,14 @@
 # -p xyz points file, no headers, comma delimited
 # -m mesh (whose nodes are to be interpolated)
 # -o interpolated mesh
+# -n number of nearest neighbours (between 1 and 10)
+#
+# Optional arguments (appended after -n):
+# -w power of the inverse distance weights (default 2)
+# -r search radius; only points within the radius are used (default none)
+# -k minimum number of neighbours within the radius (default 1)
+#
+# python interp_from_pts.py -p points.csv -m mesh.grd -o mesh_interp.grd -n 10 -w 2 -r 50 -k 3
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
@@ -44,7 +59,8 @@ import os,sys                              # system parameters
 import numpy             as np             # numpy
 from scipy import spatial                  # scipy to get kdTree
 from ppmodules.readMesh import *           # to get all readMesh functions
-from progressbar import ProgressBar, Bar, Percentage, ETA
+from ppmodules.writeMesh import *          # to get all writeMesh functions
+from ppmodules.interpolation import *      # idw interpolation
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -52,10 +68,11 @@ from progressbar import ProgressBar, Bar, Percentage, ETA
 curdir = os.getcwd()
 #
 # I/O
-if len(sys.argv) != 9 :
+if ((len(sys.argv) < 9) or (len(sys.argv) % 2 == 0)):
 	print('Wrong number of Arguments, stopping now...')
 	print('Usage:')
 	print('python interp_from_pts.py -p points.csv -m mesh.grd -o mesh_interp.grd -n 10')
+	print('Optional: -w power -r radius -k min_neighbours')
 	sys.exit()
 
 pts_file = sys.argv[2]
@@ -63,6 +80,22 @@ mesh_file = sys.argv[4]
 output_file = sys.argv[6] # interp_mesh
 neigh = int(sys.argv[8]) # the number of nearest neighbours
 
+# optional arguments
+power = 2.0 # power of the inverse distance weights
+radius = None # search radius
+min_neigh = 1 # minimum number of neighbours within the radius
+
+for i in range(9, len(sys.argv), 2):
+	if (sys.argv[i] == '-w'):
+		power = float(sys.argv[i+1])
+	elif (sys.argv[i] == '-r'):
+		radius = float(sys.argv[i+1])
+	elif (sys.argv[i] == '-k'):
+		min_neigh = int(sys.argv[i+1])
+	else:
+		print('Unknown argument ' + sys.argv[i] + '. Exiting.')
+		sys.exit(0)
+
 # I am imposing a limit on neigh to be between 1 and 10
 if ((neigh < 1) or (neigh > 10)):
 	print('Number of neighbours must be between 1 and 10. Exiting.')
@@ -84,62 +117,15 @@ print('Constructing KDTree object')
 source = np.column_stack((x,y))
 tree = spatial.cKDTree(source)
 
-den = 0.0
-tmp_sum = 0.0
-
 print('Interpolating')
-w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=m_n).start()
-for i in range(m_n):
-	d,idx = tree.query((m_x[i],m_y[i]), k = neigh)
-	
-	# calculate the denominator
-	if neigh > 1:
-		for j in range(neigh):
-			if (d[j] < 1.0E-6):
-				d[j] = 1.0E-6
-			den = den + (1.0 / (d[j]**2))
-	else:
-		if (d < 1.0E-6):
-			d = 1.0E-6
-		den = den + (1.0 / (d**2))
-		
-	# calculate the weights
-	weights = (1.0 / d**2) / den
-	
-	# to assign the interpolated value
-	if neigh > 1:
-		for j in range(neigh):
-			tmp_sum = tmp_sum + weights[j]*z[idx[j]]
-	else:
-		tmp_sum = weights * z[idx]
-		
-	# now assign the value	
-	m_z[i] = tmp_sum
-	
-	# reset the denominator
-	den = 0.0
-	tmp_sum = 0.0
-	
-	pbar.update(i+1)
-pbar.finish()
+m_z, found = interpIdw(x,y,z,m_x,m_y,neigh,power,radius,min_neigh,tree)
 
-print('Writing results to file')
-# to create the output file (this is the interpolated mesh)
-fout = open(output_file,"w")
+# points that don't have enough neighbours within the search radius
+if (np.sum(~found) > 0):
+	print('Number of points not interpolated: ' + str(np.sum(~found)))
+	m_z[~found] = -999.0
 
+print('Writing results to file')
 # now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(m_e) + " " + str(m_n) + "\n")
-
-# writes the nodes
-for i in range(0,m_n):
-	fout.write(str(i+1) + " " + str("{:.3f}".format(m_x[i])) + " " + 
-		str("{:.3f}".format(m_y[i])) + " " + str("{:.3f}".format(m_z[i])) + "\n")
-#
-# writes the elements
-for i in range(0,m_e):
-	fout.write(str(i+1) + " 3 " + str(m_ikle[i,0]+1) + " " + str(m_ikle[i,1]+1) + " " + 
-		str(m_ikle[i,2]+1) + "\n")
+writeAdcirc(m_n,m_e,m_x,m_y,m_z,m_ikle,output_file)
 print('All done!')
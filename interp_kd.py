@@ -44,6 +44,12 @@
 # if (abs(A) < 1.0E-6):
 # The break statement was removed.
 #
+# Revised: Oct 18, 2026
+# The search and interpolation is now done for all mesh nodes at once 
+# using interpTin() from ppmodules/interpolation.py. Mesh nodes that are
+# not found inside the TIN are reported and assigned -999.0, instead of
+# stopping the script.
+#
 # Uses: Python 2 or 3, Numpy, Scipy
 #
 # Example:
@@ -60,11 +66,9 @@
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
 import numpy             as np             # numpy
-from scipy import spatial                  # kd tree for searching coords
-from scipy import linalg                   # linear algebra package
 from ppmodules.readMesh import *           # to get all readMesh functions
-from ppmodules.utilities import * 
-from progressbar import ProgressBar, Bar, Percentage, ETA
+from ppmodules.writeMesh import *          # to get all writeMesh functions
+from ppmodules.interpolation import *      # tin interpolation functions
 #
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -86,9 +90,6 @@ if (neigh < 2):
 	print('Number of neighbours must be greater than 1 ... Exiting')
 	sys.exit()
 
-# to create the output file
-fout = open(output_file,'w')
-
 # read the adcirc tin file
 print('Reading TIN ...')
 t_n,t_e,t_x,t_y,t_z,t_ikle = readAdcirc(tin_file)
@@ -97,16 +98,6 @@ t_n,t_e,t_x,t_y,t_z,t_ikle = readAdcirc(tin_file)
 minz = np.amin(t_z)
 maxz = np.amax(t_z)
 
-# compute centroids of each tin element
-centroid_x = np.zeros(t_e)
-centroid_y = np.zeros(t_e)
-
-for i in range(t_e):
-	centroid_x[i] = (t_x[t_ikle[i,0]] +t_x[t_ikle[i,1]] + \
-		t_x[t_ikle[i,2]]) / 3.0  
-	centroid_y[i] = (t_y[t_ikle[i,0]] +t_y[t_ikle[i,1]] + \
-		t_y[t_ikle[i,2]]) / 3.0
-
 # read the adcirc mesh file
 print('Reading mesh ...')
 m_n,m_e,m_x,m_y,m_z,m_ikle = readAdcirc(mesh_file)
@@ -114,108 +105,28 @@ m_n,m_e,m_x,m_y,m_z,m_ikle = readAdcirc(mesh_file)
 # reset the elevation of the mesh to zero
 #m_z = np.zeros(m_n)
 
-# construct the KDTree from the centroid nodes
-print('Constructing KDTree object from centroid nodes ...')
-source = np.column_stack((centroid_x,centroid_y))
-tree = spatial.cKDTree(source)
-
-# used for FEM shape function
-ones = np.ones(3)
-
-# the list that stores the triangle polygon for a particular TIN element
-poly = list()
+# find the tin element containing each mesh node, and interpolate 
+# using the FEM shape functions (all nodes are processed at once)
+print('Searching using KDTree ...')
+m_z, found = interpTin(t_x,t_y,t_z,t_ikle,m_x,m_y,neigh)
 
-# for the progress bar
-w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=m_n).start()
+# if the interpolated values are outside of the tin's range
+m_z[(m_z < minz) | (m_z > maxz)] = -999.0
 
-print('Searching using KDTree ...')
-for i in range(m_n): 
-	d,idx = tree.query( (m_x[i],m_y[i]), k = neigh)
-	
-	# instead of specifying number of neighbours, specify search radius
-	#idx = tree.query_ball_point( (m_x[i],m_y[i]), neigh)
-	
-	# reconstruct a poly out of the tin element for each idx 
-	not_found = 0
-	for j in range(len(idx)):
-		
-		# find the area of each triangle in the search space
-		x1 = t_x[t_ikle[idx[j],0]]
-		y1 = t_y[t_ikle[idx[j],0]]
-		x2 = t_x[t_ikle[idx[j],1]]
-		y2 = t_y[t_ikle[idx[j],1]]
-		x3 = t_x[t_ikle[idx[j],2]]
-		y3 = t_y[t_ikle[idx[j],2]]
-		
-		twoA = twoA = (x2*y3 - x3*y2) - (x1*y3-x3*y1) + (x1*y2 - x2*y1)
-		A = twoA / 2.0
-		
-		if (abs(A) < 1.0E-6):
-			A = 1.0E-6	
-		
-		poly = [(x1, y1), (x2, y2), (x3, y3)]
-			
-		if (point_in_poly(m_x[i], m_y[i], poly) == 'IN'):
-			
-			#+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
-			# construct the FEM interpolation function and interpolate
-			ikle_1 = t_ikle[idx[j]]
-			x_1 = t_x[ikle_1] 
-			y_1 = t_y[ikle_1]
-			z_1 = t_z[ikle_1]
-			M = np.column_stack((ones,x_1,y_1))
-			
-			#Minv = linalg.inv(M)
-			#Minv = minverse(M)
-			
-			# solve for the parameters
-			p_1 = linalg.solve(M,z_1)
-			
-			# interpolate for z
-			m_z[i] = p_1[0] + p_1[1]*m_x[i] + p_1[2]*m_y[i]
-			
-			#print('mesh node ' + str(i) + ' m_z ' + str(m_z[i]))
-			
-			if ((m_z[i] < minz) or (m_z[i] > maxz)):
-				m_z[i] = -999.0
-			#+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
-			break
-		else:
-			not_found = not_found + 1
-			
-		# re-set poly as empty list
-		poly = []
-	
-	if (not_found == len(idx)):
+# nodes that were not found are reported, and assigned -999.0
+not_found = np.where(found == False)[0]
+if (len(not_found) > 0):
+	m_z[not_found] = -999.0
+	print('Number of mesh nodes not found inside TIN: ' + str(len(not_found)))
+	for i in not_found[0:10]:
 		print('Mesh node ' + str(i+1) + ' not found inside TIN!')
-		print('Increase number of neighbours ... Exiting!')
-		sys.exit()
-		
-	# reset not_found count variable	
-	not_found = 0
-	pbar.update(i+1)
-pbar.finish()
+	if (len(not_found) > 10):
+		print('...')
+	print('These nodes are assigned -999.0 ... Increase number of neighbours!')
 
 # now write the adcirc mesh file
 print('Writing results to file ...')
-# to create the output file (this is the interpolated mesh)
-fout = open(output_file,'w')
-
-# now to write the adcirc mesh file
-fout.write('ADCIRC' + '\n')
-# writes the number of elements and number of nodes in the header file
-fout.write(str(m_e) + ' ' + str(m_n) + '\n')
-
-# writes the nodes
-for i in range(0,m_n):
-	fout.write(str(i+1) + ' ' + str('{:.3f}'.format(m_x[i])) + ' ' + 
-		str('{:.3f}'.format(m_y[i])) + ' ' + str('{:.3f}'.format(m_z[i])) + '\n')
-#
-# writes the elements
-for i in range(0,m_e):
-	fout.write(str(i+1) + ' 3 ' + str(m_ikle[i,0]+1) + ' ' + str(m_ikle[i,1]+1) + ' ' + 
-		str(m_ikle[i,2]+1) + '\n')
+writeAdcirc(m_n,m_e,m_x,m_y,m_z,m_ikle,output_file)
 
 print('All done')	
 	
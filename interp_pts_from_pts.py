@@ -16,6 +16,13 @@
 # scipy's kdtree to assign to the mesh node the point in the xyz dataset
 # that is closest.
 #
+# Revised: Oct 18, 2026
+# All points are now interpolated at once (a single query of the tree, and
+# vectorized weights), rather than one point at a time. Added optional
+# arguments for the power of the inverse distance weights, the search
+# radius, and the minimum number of neighbours within the radius. Points
+# that can't be interpolated are assigned -999.0.
+#
 # Uses: Python 2 or 3, Matplotlib, Numpy
 #
 # Example:
@@ -25,6 +32,12 @@
 # -i input xyz points file, no headers, comma delimited, no elevation
 # -z input xyz points file no headers, comma delimited, with elevation
 # -o output file (points_xy.csv interpolated)
+# -n number of nearest neighbours (between 1 and 10)
+#
+# Optional arguments (appended after -n):
+# -w power of the inverse distance weights (default 2)
+# -r search radius; only points within the radius are used (default none)
+# -k minimum number of neighbours within the radius (default 1)
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
@@ -32,7 +45,7 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from scipy import spatial                  # scipy to get kdTree
-from progressbar import ProgressBar, Bar, Percentage, ETA
+from ppmodules.interpolation import *      # idw interpolation
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -40,10 +53,11 @@ from progressbar import ProgressBar, Bar, Percentage, ETA
 curdir = os.getcwd()
 #
 # I/O
-if len(sys.argv) != 9 :
+if ((len(sys.argv) < 9) or (len(sys.argv) % 2 == 0)):
 	print('Wrong number of Arguments, stopping now...')
 	print('Usage:')
 	print('python interp_from_pts.py -i points_xy.csv -z bathy.xyz -o points_xyz.csv -n 10')
+	print('Optional: -w power -r radius -k min_neighbours')
 	sys.exit()
 
 pts_file = sys.argv[2]
@@ -51,6 +65,22 @@ bathy_file = sys.argv[4]
 output_file = sys.argv[6] # interp_mesh
 neigh = int(sys.argv[8]) # the number of nearest neighbours
 
+# optional arguments
+power = 2.0 # power of the inverse distance weights
+radius = None # search radius
+min_neigh = 1 # minimum number of neighbours within the radius
+
+for i in range(9, len(sys.argv), 2):
+	if (sys.argv[i] == '-w'):
+		power = float(sys.argv[i+1])
+	elif (sys.argv[i] == '-r'):
+		radius = float(sys.argv[i+1])
+	elif (sys.argv[i] == '-k'):
+		min_neigh = int(sys.argv[i+1])
+	else:
+		print('Unknown argument ' + sys.argv[i] + '. Exiting.')
+		sys.exit(0)
+
 # I am imposing a limit on neigh to be between 1 and 10
 if ((neigh < 1) or (neigh > 10)):
 	print('Number of neighbours must be between 1 and 10. Exiting.')
@@ -74,45 +104,13 @@ print('Constructing KDTree object')
 source = np.column_stack((x,y))
 tree = spatial.cKDTree(source)
 
-den = 0.0
-tmp_sum = 0.0
-
 print('Interpolating')
-w = [Percentage(), Bar(), ETA()]
-pbar = ProgressBar(widgets=w, maxval=len(ix)).start()
-for i in range(len(ix)):
-	d,idx = tree.query((ix[i],iy[i]), k = neigh)
-	
-	# calculate the denominator
-	if neigh > 1:
-		for j in range(neigh):
-			if (d[j] < 1.0E-6):
-				d[j] = 1.0E-6
-			den = den + (1.0 / (d[j]**2))
-	else:
-		if (d < 1.0E-6):
-			d = 1.0E-6
-		den = den + (1.0 / (d**2))
-		
-	# calculate the weights
-	weights = (1.0 / d**2) / den
-	
-	# to assign the interpolated value
-	if neigh > 1:
-		for j in range(neigh):
-			tmp_sum = tmp_sum + weights[j]*z[idx[j]]
-	else:
-		tmp_sum = weights * z[idx]
-		
-	# now assign the value	
-	iz[i] = tmp_sum
-	
-	# reset the denominator
-	den = 0.0
-	tmp_sum = 0.0
-	
-	pbar.update(i+1)
-pbar.finish()
+iz, found = interpIdw(x,y,z,ix,iy,neigh,power,radius,min_neigh,tree)
+
+# points that don't have enough neighbours within the search radius
+if (np.sum(~found) > 0):
+	print('Number of points not interpolated: ' + str(np.sum(~found)))
+	iz[~found] = -999.0
 
 print('Writing results to file')
 # to create the output file (this is the interpolated mesh)
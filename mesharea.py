@@ -18,15 +18,35 @@
 # for finding potentially troubling spots in the input topology (i.e., bad
 # breaklines) that cause creation of zero area triangles.
 #
-# Uses: Python 2 or 3, Matplotlib, Numpy
+# Revised: Oct 18, 2026
+# The areas and centroids of the elements are computed with the Mesh class
+# from ppmodules/mesh.py, for all elements at once.
+#
+# Revised: Oct 18, 2026
+# Added a mesh quality report. The minimum and maximum angles, the aspect
+# ratio (circumradius over twice the inradius) and the size ratio to the
+# neighbouring elements of each element, and the valence of each node, 
+# are computed with the Mesh class for all elements at once. Histograms of
+# these are printed, and the elements that fail any of the limits below
+# are written to a *.csv file, or to a *.csv file in WKT format.
+#
+# Uses: Python 2 or 3, Numpy
 #
 # Example:
 #
 # python mesharea.py -i out.grd -a 0.01 -o outarea.txt
+# or
+# python mesharea.py -i out.grd -q csv -o out_quality.csv
+# or
+# python mesharea.py -i out.grd -q wkt -o out_qualityWKT.csv
 # where:
 # -i input adcirc grid file
 # -a threshold area (in m2)
-# -o output file with coordinates of elements meeting the area threshold
+# -q write a quality report; the flagged elements are written as csv 
+#    (element, centroid and quality measures) or as wkt (element polygons
+#    and quality measures)
+# -o output file with coordinates of elements meeting the area threshold,
+#    or with the flagged elements
 #
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
@@ -34,54 +54,129 @@
 import os,sys
 import numpy as np
 from ppmodules.readMesh import *
+from ppmodules.mesh import *
+from ppmodules.writeMesh import *
 #
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Functions
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-def elemprop(x1,y1,x2,y2,x3,y3):
-	# element properties - computes area and centroids of each element
-	
-	# signs in eqs work when the elements are CCW (for example Triangle mesh
-	# generator produces these) 
-	# outputs element area, and its centroid coordinate
-	twoA = (x2*y3 - x3*y2) - (x1*y3-x3*y1) + (x1*y2 - x2*y1)
-	area = twoA / 2.0
-	
-	xc = (x1 + x2 + x3) / 3.0
-	yc = (y1 + y2 + y3) / 3.0
-	return area, xc, yc
+# prints the number (and percentage) of the values in each bin, where the
+# bins are given by their edges (the last bin includes its upper edge), and
+# the edges are printed with the format fmt
+def printHistogram(title, values, edges, fmt='{:.3f}'):
+	print(title + ' (min ' + fmt.format(np.amin(values)) + ', mean ' + 
+		'{:.3f}'.format(np.mean(values)) + ', max ' + 
+		fmt.format(np.amax(values)) + ')')
+	idx = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, 
+		len(edges) - 2)
+	counts = np.bincount(idx, minlength=len(edges) - 1)
+	for i in range(len(edges) - 1):
+		print('  ' + '{:>10}'.format(fmt.format(edges[i])) + ' - ' + 
+			'{:<10}'.format(fmt.format(edges[i+1])) + '{:>12d}'.format(counts[i]) + 
+			'{:>9.2f}'.format(100.0 * counts[i] / max(len(values), 1)) + '%')
 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# the limits of the quality report; elements with a smaller minimum angle,
+# or with a larger maximum angle, aspect ratio, size ratio or node valence
+# are flagged
+min_angle_limit = 20.0
+max_angle_limit = 140.0
+aspect_ratio_limit = 3.0
+size_ratio_limit = 2.0
+valence_limit = 9
+
 # I/O
 if len(sys.argv) != 7 :
 	print('Wrong number of Arguments, stopping now...')
 	print('Usage:')
 	print('python mesharea.py -i out.grd -a 0.01 -o outarea.txt')
+	print('or')
+	print('python mesharea.py -i out.grd -q csv -o out_quality.csv')
 	sys.exit()
 dummy1 =  sys.argv[1]
 adcirc_file = sys.argv[2]
 dummy2 =  sys.argv[3]
-area_threshold = sys.argv[4]
-area_threshold = float(area_threshold)
 dummy3 = sys.argv[5]
 output_file = sys.argv[6]
 
+if (dummy2 == '-q'):
+	report_format = sys.argv[4]
+	if (report_format not in ['csv', 'wkt']):
+		print('Value of -q must be csv or wkt. Exiting.')
+		sys.exit()
+else:
+	area_threshold = sys.argv[4]
+	area_threshold = float(area_threshold)
+
 # to create the output file
 fout = open(output_file,"w")
 
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(adcirc_file)
 
-# define properties arrays
-area = np.zeros(e)
-xc = np.zeros(e)
-yc = np.zeros(e)
-
-for i in range(e):
-	area[i],xc[i],yc[i] = elemprop(x[ikle[i,0]], y[ikle[i,0]],
-		x[ikle[i,1]], y[ikle[i,1]],	x[ikle[i,2]], y[ikle[i,2]])
-	if (area[i] < area_threshold):
-		fout.write(str(xc[i]) + ',' + str(yc[i]) + ',' + str(area[i]) + '\n')
+if (dummy2 == '-q'):
+	mesh = Mesh(x,y,ikle)
+	area = np.abs(mesh.getAreas())
+	xc, yc = mesh.getCentroids()
+	angles = mesh.getAngles()
+	min_angle = np.amin(angles, axis=1)
+	max_angle = np.amax(angles, axis=1)
+	aspect_ratio = mesh.getAspectRatios()
+	size_ratio = mesh.getSizeRatios()
+	valence = mesh.getValence()
+	max_valence = np.amax(valence[ikle], axis=1)
 	
+	print('Nodes: ' + str(n) + ', elements: ' + str(e))
+	printHistogram('Element area', area, 
+		np.array([0.0, 0.01, 1.0, 10.0, 100.0, 1000.0, 10000.0, np.inf]))
+	printHistogram('Minimum angle (degrees)', min_angle, 
+		np.array([0.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0]))
+	printHistogram('Maximum angle (degrees)', max_angle, 
+		np.array([60.0, 90.0, 120.0, 140.0, 160.0, 180.0]))
+	printHistogram('Aspect ratio', aspect_ratio, 
+		np.array([1.0, 1.5, 2.0, 3.0, 5.0, 10.0, np.inf]))
+	printHistogram('Size ratio to neighbours', size_ratio, 
+		np.array([1.0, 1.25, 1.5, 2.0, 3.0, 5.0, np.inf]))
+	printHistogram('Node valence', valence, 
+		np.array([0, 3, 4, 5, 6, 7, 8, 9, 10, np.inf]), '{:.0f}')
+	
+	flagged = np.nonzero((min_angle < min_angle_limit) | 
+		(max_angle > max_angle_limit) | (aspect_ratio > aspect_ratio_limit) |
+		(size_ratio > size_ratio_limit) | (max_valence > valence_limit))[0]
+	print('Flagged elements: ' + str(len(flagged)))
+	
+	measures = np.column_stack((area, min_angle, max_angle, aspect_ratio,
+		size_ratio, max_valence))[flagged]
+	
+	if (report_format == 'csv'):
+		fout.write('element,x,y,area,min_angle,max_angle,aspect_ratio,' + 
+			'size_ratio,max_valence' + '\n')
+		writeRows(fout, '%d,%.3f,%.3f,%.6f,%.3f,%.3f,%.3f,%.3f,%d', 
+			np.column_stack((flagged + 1, xc[flagged], yc[flagged], measures)))
+	else:
+		# the elements as closed polygons
+		ring = ikle[flagged][:,[0,1,2,0]]
+		coords = np.column_stack((x[ring], y[ring]))[:,[0,4,1,5,2,6,3,7]]
+		fout.write('WKT,element,area,min_angle,max_angle,aspect_ratio,' + 
+			'size_ratio,max_valence' + '\n')
+		writeRows(fout, '"POLYGON ((%.3f %.3f, %.3f %.3f, %.3f %.3f, %.3f %.3f))",' +
+			'%d,%.6f,%.3f,%.3f,%.3f,%.3f,%d', 
+			np.column_stack((coords, flagged + 1, measures)))
+	
+	fout.close()
+	sys.exit()
+
+# element properties - computes area and centroids of each element
+# signs in eqs work when the elements are CCW (for example Triangle mesh
+# generator produces these) 
+mesh = Mesh(x,y,ikle)
+area = mesh.getAreas()
+xc, yc = mesh.getCentroids()
+
+# outputs element area, and its centroid coordinate, for the elements 
+# smaller than the threshold
+small = np.nonzero(area < area_threshold)[0]
+for a, b, c in zip(xc[small].tolist(), yc[small].tolist(), area[small].tolist()):
+	fout.write(str(a) + ',' + str(b) + ',' + str(c) + '\n')
@@ -1 +1 @@
-__all__ = ["readMesh","writeMesh","utilities","selafin_io_pp"]
+__all__ = ["readMesh","writeMesh","utilities","selafin_io_pp","interpolation","polygons","sections","raster","renumbering","mesh"]
@@ -0,0 +1,228 @@
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Global Imports
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os # operating system
+import hashlib # to compute the keys of the cached interpolation matrices
+import numpy as np # numpy
+from scipy import spatial # kd tree for searching coords
+from scipy import sparse # sparse interpolation matrices
+from ppmodules.readMesh import writeCache # for interpMatrixCached()
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Functions
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# computes the barycentric coordinates (l1,l2,l3) of points (x,y) with
+# respect to the triangles tri of the tin (tri are indices into t_ikle);
+# x, y and tri can be arrays of any shape that broadcast together; also
+# returns valid, which is False for zero area triangles
+def barycentric(t_x,t_y,t_ikle,tri,x,y):
+  x1 = t_x[t_ikle[tri,0]]
+  y1 = t_y[t_ikle[tri,0]]
+  x2 = t_x[t_ikle[tri,1]]
+  y2 = t_y[t_ikle[tri,1]]
+  x3 = t_x[t_ikle[tri,2]]
+  y3 = t_y[t_ikle[tri,2]]
+
+  # twice the signed area of each triangle
+  twoA = (y2-y3)*(x1-x3) + (x3-x2)*(y1-y3)
+
+  valid = np.abs(twoA) > 1.0E-12
+  twoA = np.where(valid, twoA, 1.0)
+
+  l1 = ((y2-y3)*(x-x3) + (x3-x2)*(y-y3)) / twoA
+  l2 = ((y3-y1)*(x-x3) + (x1-x3)*(y-y3)) / twoA
+  l3 = 1.0 - l1 - l2
+
+  return l1,l2,l3,valid
+
+# finds the tin element that contains each point (x,y), and interpolates
+# the tin elevations t_z at the points using the element's linear shape
+# functions (i.e., barycentric coordinates); candidate elements are the
+# neigh elements with the closest centroids, found for all points at once
+# with a single cKDTree query; the points are processed in chunks to
+# limit memory use; returns the interpolated z, and a boolean array found
+# that is False for points that are not inside any candidate element (z
+# of these points is set to zero)
+def interpTin(t_x,t_y,t_z,t_ikle,x,y,neigh=10,chunk=100000):
+
+  # points on the edges of the tin elements are considered inside
+  eps = 1.0E-9
+
+  # centroids of each tin element
+  centroid_x = (t_x[t_ikle[:,0]] + t_x[t_ikle[:,1]] + t_x[t_ikle[:,2]]) / 3.0
+  centroid_y = (t_y[t_ikle[:,0]] + t_y[t_ikle[:,1]] + t_y[t_ikle[:,2]]) / 3.0
+
+  tree = spatial.cKDTree(np.column_stack((centroid_x,centroid_y)))
+
+  # can't search for more elements than there are in the tin
+  k = min(neigh, len(t_ikle))
+
+  z = np.zeros(len(x))
+  found = np.zeros(len(x), dtype=bool)
+
+  for s in range(0, len(x), chunk):
+    xc = x[s:s+chunk]
+    yc = y[s:s+chunk]
+    m = len(xc)
+
+    # candidate elements for each point, sorted from closest to farthest
+    d, idx = tree.query(np.column_stack((xc,yc)), k=k)
+    idx = np.reshape(idx, (m,k))
+
+    l1,l2,l3,valid = barycentric(t_x,t_y,t_ikle,idx,xc[:,None],yc[:,None])
+    inside = valid & (l1 >= -eps) & (l2 >= -eps) & (l3 >= -eps)
+
+    # the first (i.e., closest) candidate element that contains the point
+    rows = np.arange(m)
+    first = np.argmax(inside, axis=1)
+    tri = idx[rows,first]
+
+    found[s:s+m] = inside[rows,first]
+    z[s:s+m] = np.where(found[s:s+m],
+      l1[rows,first] * t_z[t_ikle[tri,0]] +
+      l2[rows,first] * t_z[t_ikle[tri,1]] +
+      l3[rows,first] * t_z[t_ikle[tri,2]], 0.0)
+
+  return z, found
+
+# queries the cKDTree for the k nearest neighbours of the points in xy,
+# using all available processors if the installed scipy supports it
+def queryTree(tree,xy,k,distance_upper_bound=np.inf):
+  try:
+    return tree.query(xy, k=k, distance_upper_bound=distance_upper_bound,
+      workers=-1)
+  except TypeError:
+    # older versions of scipy
+    return tree.query(xy, k=k, distance_upper_bound=distance_upper_bound)
+
+# interpolates z of the points (x,y) at the points (xi,yi) using inverse
+# distance weighting of the neigh closest points, with weights computed
+# as 1/d**power; if radius is given, only points within the radius are
+# used, and points (xi,yi) that have fewer than min_neigh points within the
+# radius are not interpolated; a cKDTree of (x,y) can be passed in tree
+# to avoid building it again; returns the interpolated zi, and a boolean
+# array found that is False for points that were not interpolated (zi of
+# these points is set to zero)
+def interpIdw(x,y,z,xi,yi,neigh=10,power=2.0,radius=None,min_neigh=1,
+  tree=None,chunk=1000000):
+
+  if tree is None:
+    tree = spatial.cKDTree(np.column_stack((x,y)))
+
+  if radius is None:
+    radius = np.inf
+
+  # can't search for more points than there are
+  k = min(neigh, len(x))
+
+  zi = np.zeros(len(xi))
+  found = np.zeros(len(xi), dtype=bool)
+
+  for s in range(0, len(xi), chunk):
+    xc = xi[s:s+chunk]
+    yc = yi[s:s+chunk]
+    m = len(xc)
+
+    d, idx = queryTree(tree, np.column_stack((xc,yc)), k, radius)
+    d = np.reshape(d, (m,k))
+    idx = np.reshape(idx, (m,k))
+
+    # neighbours outside of the radius are returned with d = inf
+    valid = np.isfinite(d)
+    idx = np.where(valid, idx, 0)
+
+    # to avoid division by zero if the distance is exactly zero
+    d = np.maximum(d, 1.0E-6)
+
+    w = np.where(valid, 1.0 / d**power, 0.0)
+    ok = (np.sum(valid, axis=1) >= max(min_neigh, 1))
+
+    # the sums are accumulated one neighbour at a time (k is small), in the
+    # same order as when the points were interpolated one at a time
+    den = np.zeros(m)
+    for j in range(k):
+      den = den + w[:,j]
+    den = np.where(ok, den, 1.0)
+
+    # the weights of each point sum to one
+    weights = w / den[:,None]
+
+    tmp_sum = np.zeros(m)
+    for j in range(k):
+      tmp_sum = tmp_sum + weights[:,j] * z[idx[:,j]]
+
+    found[s:s+m] = ok
+    zi[s:s+m] = np.where(ok, tmp_sum, 0.0)
+
+  return zi, found
+
+# builds a sparse matrix W (of size len(x) by len(s_x)) that interpolates
+# values given at the nodes of the source mesh (s_x,s_y,s_ikle, with ikle
+# zero based) to the points (x,y), so that the interpolated values are
+# W.dot(values); points inside the source mesh get the linear (barycentric)
+# weights of the element that contains them, and points outside of the
+# source mesh get the value of the closest source node (if nearest is
+# False, their rows of W are empty). The element that contains each point
+# is found with matplotlib's trifinder, which is what matplotlib's 
+# LinearTriInterpolator uses.
+def interpMatrix(s_x,s_y,s_ikle,x,y,nearest=True):
+  import matplotlib.tri as mtri
+
+  triang = mtri.Triangulation(s_x,s_y,s_ikle)
+  tri = np.asarray(triang.get_trifinder()(x,y), dtype=np.int64)
+
+  inside = (tri >= 0)
+  rows = np.arange(len(x))
+
+  l1,l2,l3,valid = barycentric(s_x,s_y,s_ikle,tri[inside],x[inside],y[inside])
+  t_ikle = s_ikle[tri[inside]]
+
+  r = np.tile(rows[inside], 3)
+  c = np.concatenate((t_ikle[:,0], t_ikle[:,1], t_ikle[:,2]))
+  w = np.concatenate((l1, l2, l3))
+
+  # points outside of the source mesh use the closest source node
+  if nearest and np.any(~inside):
+    tree = spatial.cKDTree(np.column_stack((s_x,s_y)))
+    d, idx = tree.query(np.column_stack((x[~inside],y[~inside])), k=1)
+
+    r = np.concatenate((r, rows[~inside]))
+    c = np.concatenate((c, np.reshape(idx, -1)))
+    w = np.concatenate((w, np.ones(np.count_nonzero(~inside))))
+
+  return sparse.csr_matrix((w, (r, c)), shape=(len(x), len(s_x)))
+
+# returns a key (a sha1 digest) of the source mesh and of the points, which
+# is stored with a cached interpolation matrix, and used to decide if the
+# cached matrix can be used
+def interpMatrixKey(s_x,s_y,s_ikle,x,y):
+  h = hashlib.sha1()
+  for a in (s_x, s_y, s_ikle, x, y):
+    a = np.ascontiguousarray(a)
+    h.update(str(a.dtype).encode() + str(a.shape).encode())
+    h.update(a.tobytes())
+  return h.hexdigest()
+
+# same as interpMatrix(), but the matrix is stored in cache_file (a *.npz
+# file), and read from it the next time the same source mesh and points 
+# are used; if the cache_file is not valid the matrix is computed again
+def interpMatrixCached(s_x,s_y,s_ikle,x,y,cache_file):
+  key = interpMatrixKey(s_x,s_y,s_ikle,x,y)
+
+  if os.path.isfile(cache_file):
+    try:
+      with np.load(cache_file) as data:
+        if (str(data['key']) == key):
+          return sparse.csr_matrix((data['data'], data['indices'], 
+            data['indptr']), shape=tuple(data['shape']))
+    except Exception:
+      # a corrupt or unreadable cache is treated as if it did not exist
+      pass
+
+  W = interpMatrix(s_x,s_y,s_ikle,x,y)
+
+  writeCache(cache_file, key=key, data=W.data, indices=W.indices, 
+    indptr=W.indptr, shape=np.array(W.shape))
+
+  return W
@@ -0,0 +1,378 @@
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Global Imports
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import sys # to exit on an invalid boundary
+import numpy as np # numpy
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Classes
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# the nodes (x,y, and optionally z) and the elements (ikle, zero based) of
+# a triangular mesh, together with the quantities derived from them (the
+# areas, centroids and orientation of the elements, the edges, the
+# neighbours, the elements around each node, and the boundary); each of
+# these is computed for all elements at once the first time it is asked
+# for, and is then kept, so that it is not computed again. The mesh is not
+# meant to be changed once it is made (getOriented() returns a new mesh).
+#
+# Element edge j (j = 0, 1, 2) goes from node ikle[i,j] to node
+# ikle[i,(j+1)%3], which is the same as in matplotlib's Triangulation.
+class Mesh(object):
+  def __init__(self,x,y,ikle,z=None):
+    self.x = np.asarray(x, dtype=np.float64)
+    self.y = np.asarray(y, dtype=np.float64)
+    if z is None:
+      z = np.zeros(len(self.x))
+    self.z = np.asarray(z, dtype=np.float64)
+    self.ikle = np.asarray(ikle)
+
+    self.n = len(self.x)
+    self.e = len(self.ikle)
+
+    # the derived quantities that have been computed so far
+    self.cache = dict()
+
+  # returns the quantity name, computing it with func() the first time
+  def getCached(self,name,func):
+    if name not in self.cache:
+      self.cache[name] = func()
+    return self.cache[name]
+
+  # returns the coordinates of the three nodes of each element
+  def getElementCoords(self):
+    x = self.x[self.ikle]
+    y = self.y[self.ikle]
+    return x[:,0], y[:,0], x[:,1], y[:,1], x[:,2], y[:,2]
+
+  # returns the area of each element (the area is negative for elements
+  # that are oriented clockwise)
+  def getAreas(self):
+    def areas():
+      x1,y1,x2,y2,x3,y3 = self.getElementCoords()
+      twoA = (x2*y3 - x3*y2) - (x1*y3-x3*y1) + (x1*y2 - x2*y1)
+      return twoA / 2.0
+    return self.getCached('areas', areas)
+
+  # returns the x and y of the centroid of each element
+  def getCentroids(self):
+    def centroids():
+      x1,y1,x2,y2,x3,y3 = self.getElementCoords()
+      return (x1 + x2 + x3) / 3.0, (y1 + y2 + y3) / 3.0
+    return self.getCached('centroids', centroids)
+
+  # returns True for each element that is oriented counter clockwise (the
+  # same test as CCW() in utilities.py)
+  def getCCW(self):
+    def ccw():
+      x1,y1,x2,y2,x3,y3 = self.getElementCoords()
+      return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)
+    return self.getCached('ccw', ccw)
+
+  # returns a mesh with the same nodes, where the elements that are not
+  # oriented counter clockwise have their first and last nodes switched
+  def getOriented(self):
+    def oriented():
+      cw = ~self.getCCW()
+      if not np.any(cw):
+        return self
+      ikle = self.ikle.copy()
+      ikle[cw] = ikle[cw][:,[2,1,0]]
+      return Mesh(self.x, self.y, ikle, self.z)
+    return self.getCached('oriented', oriented)
+
+  # returns the unique edges of the mesh, as an array of node pairs (the
+  # lower node first), and, for each element, the index of each of its
+  # three edges in that array; the edges are found by sorting integer keys
+  # of the node pairs
+  def getEdges(self):
+    def edges():
+      n1 = self.ikle[:,[0,1,2]].ravel()
+      n2 = self.ikle[:,[1,2,0]].ravel()
+      lo = np.minimum(n1,n2).astype(np.int64)
+      hi = np.maximum(n1,n2).astype(np.int64)
+      keys, inverse = np.unique(lo * max(self.n, 1) + hi, return_inverse=True)
+      edges = np.column_stack((keys // max(self.n, 1), keys % max(self.n, 1)))
+      return edges, np.reshape(inverse, (self.e, 3))
+    return self.getCached('edges', edges)
+
+  # returns the number of elements that share each of the unique edges
+  def getEdgeCounts(self):
+    def counts():
+      edges, element_edges = self.getEdges()
+      return np.bincount(element_edges.ravel(), minlength=len(edges))
+    return self.getCached('edge_counts', counts)
+
+  # returns, for each element, the element on the other side of each of
+  # its three edges, or -1 if there is none (i.e., the edge is on the
+  # boundary); same as the neighbors of matplotlib's Triangulation
+  def getNeighbours(self):
+    def neighbours():
+      edges, element_edges = self.getEdges()
+      counts = self.getEdgeCounts()
+
+      # the element edges sorted by edge, so that the two element edges
+      # of each interior edge are next to each other
+      order = np.argsort(element_edges.ravel(), kind='stable')
+      first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+      pairs = first[counts == 2]
+      a = order[pairs]
+      b = order[pairs + 1]
+
+      nbr = np.zeros(3*self.e, dtype=np.int64) - 1
+      nbr[a] = b // 3
+      nbr[b] = a // 3
+      return np.reshape(nbr, (self.e, 3))
+    return self.getCached('neighbours', neighbours)
+
+  # returns the elements around each node in compressed sparse row form,
+  # as the arrays indptr and indices; the elements around node i are
+  # indices[indptr[i]:indptr[i+1]], in increasing order
+  def getNodeElements(self):
+    def node_elements():
+      nodes = self.ikle.ravel()
+      order = np.argsort(nodes, kind='stable')
+      indptr = np.concatenate(([0], np.cumsum(np.bincount(nodes,
+        minlength=self.n))))
+      return indptr, order // 3
+    return self.getCached('node_elements', node_elements)
+
+  # returns the length of each of the three edges of each element
+  def getEdgeLengths(self):
+    def lengths():
+      dx = self.x[self.ikle[:,[1,2,0]]] - self.x[self.ikle]
+      dy = self.y[self.ikle[:,[1,2,0]]] - self.y[self.ikle]
+      return np.sqrt(dx*dx + dy*dy)
+    return self.getCached('edge_lengths', lengths)
+
+  # returns the interior angle (in degrees) of each element at each of its
+  # three nodes
+  def getAngles(self):
+    def angles():
+      x = self.x[self.ikle]
+      y = self.y[self.ikle]
+      ux = x[:,[1,2,0]] - x
+      uy = y[:,[1,2,0]] - y
+      vx = x[:,[2,0,1]] - x
+      vy = y[:,[2,0,1]] - y
+      return np.degrees(np.arctan2(np.abs(ux*vy - uy*vx), ux*vx + uy*vy))
+    return self.getCached('angles', angles)
+
+  # returns the aspect ratio of each element, as the ratio of the radius
+  # of its circumscribed circle to twice the radius of its inscribed circle
+  # (one for an equilateral element, and infinite for a zero area element)
+  def getAspectRatios(self):
+    def aspect_ratios():
+      l = self.getEdgeLengths()
+      area = np.abs(self.getAreas())
+      num = l[:,0] * l[:,1] * l[:,2] * (l[:,0] + l[:,1] + l[:,2])
+      with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = num / (16.0 * area * area)
+      return np.where(area > 0.0, ratio, np.inf)
+    return self.getCached('aspect_ratios', aspect_ratios)
+
+  # returns, for each element, the largest ratio between the size (the
+  # mean edge length) of the element and that of any of its neighbours
+  # (one for an element with no neighbours)
+  def getSizeRatios(self):
+    def size_ratios():
+      size = np.mean(self.getEdgeLengths(), axis=1)
+      nbr = self.getNeighbours()
+      mine = size[:,None]
+      theirs = size[np.maximum(nbr, 0)]
+      with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.maximum(theirs / mine, mine / theirs)
+      ratio = np.where(np.isnan(ratio), np.inf, ratio)
+      return np.amax(np.where(nbr >= 0, ratio, 1.0), axis=1)
+    return self.getCached('size_ratios', size_ratios)
+
+  # returns the valence of each node (the number of elements around it)
+  def getValence(self):
+    def valence():
+      indptr, indices = self.getNodeElements()
+      return np.diff(indptr)
+    return self.getCached('valence', valence)
+
+  # returns the edges of the elements that are not shared with any other
+  # element, as the arrays of their first and second nodes (in the order
+  # of the elements, and in the direction of each element)
+  def getBoundaryEdges(self):
+    def boundary_edges():
+      edges, element_edges = self.getEdges()
+      bnd = (self.getEdgeCounts()[element_edges.ravel()] == 1)
+      n1 = self.ikle[:,[0,1,2]].ravel()
+      n2 = self.ikle[:,[1,2,0]].ravel()
+      return n1[bnd], n2[bnd]
+    return self.getCached('boundary_edges', boundary_edges)
+
+  # returns the boundary nodes, and the indices where each boundary loop
+  # starts, as getBoundary() does; for the boundary telemac needs, the
+  # elements must be oriented counter clockwise (see getOriented())
+  def getBoundary(self):
+    def boundary():
+      start, end = self.getBoundaryEdges()
+      return chainBoundary(self.x, self.y, start, end)
+    return self.getCached('boundary', boundary)
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Functions
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# returns the boundary nodes of the mesh (ikle zero based, with all of the
+# elements oriented counter clockwise) in the order telemac needs them, as
+# the array nbor, together with the indices in nbor where each boundary
+# loop starts; the order is the same as that of ranbo.f from stbtel (which
+# is what the bnd_extr_stbtel.f90 program did): the boundary starts at the
+# node with the smallest x+y and goes counter clockwise around the mesh,
+# and the islands follow (each one clockwise). The boundary edges are the
+# element edges that are not shared by any other element, found by sorting
+# the keys of all of the edges (rather than searching the neighbours of
+# each node, as voisin.f does).
+def getBoundary(x,y,ikle):
+  return Mesh(x,y,ikle).getBoundary()
+
+# orders the boundary edges (the arrays of their first and second nodes,
+# in the order of the elements) into boundary loops, and returns the
+# boundary nodes and the indices where each loop starts (see getBoundary())
+def chainBoundary(x,y,n1,n2):
+  # the boundary edges (as lists, as they are ordered one at a time)
+  start = np.asarray(n1).tolist()
+  end = np.asarray(n2).tolist()
+  nptfr = len(start)
+
+  if (nptfr == 0):
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+  # the first edge starts at the node with the smallest x+y (of the nodes
+  # with the same x+y, within a tolerance, the one with the smallest y)
+  som = (x[n1] + y[n1]).tolist()
+  ys = y[n1].tolist()
+
+  som2 = x[0] + y[0]
+  y2 = y[0]
+  first = 0
+  for i in range(nptfr):
+    if (abs(som[i] - som2) <= abs(1.0E-6 * som[i])):
+      if (ys[i] <= y2):
+        y2 = ys[i]
+        som2 = som[i]
+        first = i
+    elif (som[i] <= som2):
+      y2 = ys[i]
+      som2 = som[i]
+      first = i
+
+  start[0], start[first] = start[first], start[0]
+  end[0], end[first] = end[first], end[0]
+
+  # positions of the edges that start at each node (the edges are swapped
+  # into place the same way as in ranbo.f, so that the islands, and the
+  # edges out of nodes that are on the boundary twice, come in the same
+  # order)
+  where = dict()
+  for p in range(nptfr):
+    where.setdefault(start[p], []).append(p)
+
+  loops = [0]
+  for i in range(1, nptfr):
+    # the first of the remaining edges that starts where the last one ends
+    cand = [p for p in where.get(end[i-1], []) if p >= i]
+    if (len(cand) > 0):
+      p = min(cand)
+      if (p != i):
+        where[start[p]][where[start[p]].index(p)] = i
+        where[start[i]][where[start[i]].index(i)] = p
+        start[i], start[p] = start[p], start[i]
+        end[i], end[p] = end[p], end[i]
+      continue
+
+    # the loop must be closed before the next one is started
+    if (start[loops[-1]] != end[i-1]):
+      print('Error in storing the boundary edges for node ' +
+        str(start[loops[-1]] + 1) + '. Exiting!')
+      sys.exit()
+    loops.append(i)
+
+  return np.array(start, dtype=np.int64), np.array(loops, dtype=np.int64)
+
+# computes the stage-storage and stage-area curves of the surface of the
+# mesh (its z, i.e., a tin), for the array of levels; returns the wetted
+# area (the area where the surface is below the level) and the volume
+# between each level and the surface below it. Each element is linear, so
+# the volume of an element that is partly below a level is a cubic of the
+# level (and the area is its derivative), which is computed exactly. The
+# elements that are all below a level add their area, and their area
+# times the level less their mean z, which is summed for all levels at
+# once from the elements sorted by their highest node; only the (element,
+# level) pairs where the level cuts the element are computed one by one,
+# chunk pairs at a time. If mask is given, only the elements where mask is
+# True are used.
+def stageStorage(mesh,levels,mask=None,chunk=1000000):
+  levels = np.asarray(levels, dtype=np.float64).ravel()
+
+  area = np.abs(mesh.getAreas())
+  zs = np.sort(mesh.z[mesh.ikle], axis=1)
+  if mask is not None:
+    area = area[mask]
+    zs = zs[mask]
+  z1 = zs[:,0]
+  z2 = zs[:,1]
+  z3 = zs[:,2]
+  zm = (z1 + z2 + z3) / 3.0
+
+  # the levels are sorted, and the results put back in order at the end
+  order = np.argsort(levels, kind='stable')
+  h = levels[order]
+  nlev = len(h)
+
+  wet = np.zeros(nlev)
+  vol = np.zeros(nlev)
+
+  # the elements that are all below each level (z3 <= h)
+  s = np.argsort(z3, kind='stable')
+  cum_area = np.concatenate(([0.0], np.cumsum(area[s])))
+  cum_vol = np.concatenate(([0.0], np.cumsum(area[s] * zm[s])))
+  k = np.searchsorted(z3[s], h, side='right')
+  wet = wet + cum_area[k]
+  vol = vol + (h * cum_area[k] - cum_vol[k])
+
+  # the levels that cut each element (z1 < h < z3) are lo to hi-1
+  lo = np.searchsorted(h, z1, side='right')
+  hi = np.searchsorted(h, z3, side='left')
+  count = np.maximum(hi - lo, 0)
+  ends = np.cumsum(count)
+  npairs = int(ends[-1]) if len(ends) > 0 else 0
+
+  for p0 in range(0, npairs, chunk):
+    p = np.arange(p0, min(p0 + chunk, npairs))
+    el = np.searchsorted(ends, p, side='right')
+    j = lo[el] + p - (ends[el] - count[el])
+
+    hh = h[j]
+    a = area[el]
+    e1 = z1[el]
+    e2 = z2[el]
+    e3 = z3[el]
+
+    # the level is either between the lowest and the middle node, or
+    # between the middle and the highest node
+    low = (hh <= e2)
+    d31 = e3 - e1
+    d21 = np.where(low, e2 - e1, 1.0)
+    d32 = np.where(low, 1.0, e3 - e2)
+    t = hh - e1
+    u = e3 - hh
+
+    wet_pair = np.where(low, a*t*t / (d21*d31), a - a*u*u / (d31*d32))
+    vol_pair = np.where(low, a*t*t*t / (3.0*d21*d31),
+      a*(hh - zm[el]) + a*u*u*u / (3.0*d31*d32))
+
+    wet = wet + np.bincount(j, wet_pair, minlength=nlev)
+    vol = vol + np.bincount(j, vol_pair, minlength=nlev)
+
+  wet_area = np.zeros(nlev)
+  volume = np.zeros(nlev)
+  wet_area[order] = wet
+  volume[order] = vol
+
+  return wet_area, volume
@@ -0,0 +1,197 @@
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Global Imports
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np # numpy
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Classes
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# a uniform grid of cells over a set of points (i.e., the mesh nodes); the
+# points are sorted by cell, so that the points in a rectangle (i.e., the
+# bounding box of a polygon) can be found by looking only at the cells the
+# rectangle covers, rather than at all of the points
+class PointGrid(object):
+  def __init__(self,x,y,cells=None):
+    self.x = np.asarray(x, dtype=np.float64)
+    self.y = np.asarray(y, dtype=np.float64)
+
+    n = len(self.x)
+
+    # number of cells in each direction (about 16 points per cell)
+    if cells is None:
+      cells = max(1, int(np.sqrt(n / 16.0)))
+    self.cells = cells
+
+    if (n > 0):
+      self.xmin = np.amin(self.x)
+      self.ymin = np.amin(self.y)
+      xmax = np.amax(self.x)
+      ymax = np.amax(self.y)
+    else:
+      self.xmin = self.ymin = xmax = ymax = 0.0
+
+    self.dx = max((xmax - self.xmin) / cells, 1.0E-9)
+    self.dy = max((ymax - self.ymin) / cells, 1.0E-9)
+
+    cell = self.getCell(self.x, self.y)
+
+    # points sorted by cell, and where each cell starts in the sorted array
+    self.order = np.argsort(cell, kind='mergesort')
+    self.start = np.searchsorted(cell[self.order],
+      np.arange(cells*cells + 1))
+
+  def getCol(self,x):
+    return np.clip(np.floor((x - self.xmin) / self.dx), 0,
+      self.cells-1).astype(np.int64)
+
+  def getRow(self,y):
+    return np.clip(np.floor((y - self.ymin) / self.dy), 0,
+      self.cells-1).astype(np.int64)
+
+  def getCell(self,x,y):
+    return self.getCol(x) * self.cells + self.getRow(y)
+
+  # returns the indices of the points inside the rectangle (edges included)
+  def getPointsInBox(self,xmin,xmax,ymin,ymax):
+    c0 = self.getCol(xmin)
+    c1 = self.getCol(xmax)
+    r0 = self.getRow(ymin)
+    r1 = self.getRow(ymax)
+
+    # each column of cells is one contiguous slice of the sorted points
+    idx = [self.order[self.start[c*self.cells + r0]:
+      self.start[c*self.cells + r1 + 1]] for c in range(c0, c1+1)]
+
+    if (len(idx) == 0):
+      return np.zeros(0, dtype=np.int64)
+    idx = np.concatenate(idx)
+
+    xi = self.x[idx]
+    yi = self.y[idx]
+    return idx[(xi >= xmin) & (xi <= xmax) & (yi >= ymin) & (yi <= ymax)]
+
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Functions
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# takes the shapeid, x and y columns of a pputils polygon file, and returns
+# a list of (px,py) arrays, one for each unique shapeid (in the same order
+# as np.unique(shapeid)), with the nodes in the order they are in the file
+def getPolygons(shapeid,x,y):
+  ids, inv = np.unique(shapeid, return_inverse=True)
+  inv = np.reshape(inv, -1)
+
+  # stable sort, so that the nodes of each polygon keep their order
+  order = np.argsort(inv, kind='mergesort')
+  start = np.searchsorted(inv[order], np.arange(len(ids) + 1))
+
+  polys = list()
+  for i in range(len(ids)):
+    idx = order[start[i]:start[i+1]]
+    polys.append((x[idx], y[idx]))
+
+  return polys
+
+# vectorized version of point_in_poly() from ppmodules/utilities.py, for
+# the points (x,y) and a polygon with vertices (px,py); returns a boolean
+# array that is True where point_in_poly() would return 'IN' (this includes
+# points that are on a vertex of the polygon, or on one of its horizontal
+# edges); the points are sorted by y, so that each edge of the polygon only
+# looks at the points whose y is in the range of the edge
+def pointsInPoly(x,y,px,py):
+  n = len(px)
+
+  order = np.argsort(y, kind='mergesort')
+  xs = x[order]
+  ys = y[order]
+
+  on = np.zeros(len(xs), dtype=bool)
+  inside = np.zeros(len(xs), dtype=bool)
+
+  pxl = px.tolist()
+  pyl = py.tolist()
+
+  # check if point is a vertex
+  for j in range(n):
+    lo = np.searchsorted(ys, pyl[j], side='left')
+    hi = np.searchsorted(ys, pyl[j], side='right')
+    if (hi > lo):
+      on[lo:hi] = on[lo:hi] | (xs[lo:hi] == pxl[j])
+
+  # check if point is on a horizontal boundary (the edges are the same ones
+  # point_in_poly() uses, where the first edge is checked twice)
+  for i in range(n):
+    if i == 0:
+      j1 = 0
+      j2 = 1
+    else:
+      j1 = i-1
+      j2 = i
+    if (pyl[j1] == pyl[j2]):
+      lo = np.searchsorted(ys, pyl[j1], side='left')
+      hi = np.searchsorted(ys, pyl[j1], side='right')
+      if (hi > lo):
+        on[lo:hi] = on[lo:hi] | ((xs[lo:hi] > min(pxl[j1], pxl[j2])) &
+          (xs[lo:hi] < max(pxl[j1], pxl[j2])))
+
+  # crossing number test
+  p1x = pxl[0]
+  p1y = pyl[0]
+  for i in range(n+1):
+    p2x = pxl[i % n]
+    p2y = pyl[i % n]
+
+    if (p1y != p2y):
+      # points with min(p1y,p2y) < y <= max(p1y,p2y)
+      lo = np.searchsorted(ys, min(p1y,p2y), side='right')
+      hi = np.searchsorted(ys, max(p1y,p2y), side='right')
+
+      if (hi > lo):
+        xx = xs[lo:hi]
+        yy = ys[lo:hi]
+        cross = (xx <= max(p1x,p2x))
+        if (p1x != p2x):
+          xints = (yy-p1y)*(p2x-p1x)/(p2y-p1y)+p1x
+          cross = cross & (xx <= xints)
+        inside[lo:hi] = inside[lo:hi] ^ cross
+
+    p1x = p2x
+    p1y = p2y
+
+  result = np.zeros(len(xs), dtype=bool)
+  result[order] = on | inside
+  return result
+
+# finds for each point (x,y) the polygon that contains it; the polygons are
+# a list of (px,py) arrays (see getPolygons()), and are processed in order,
+# so that if a point is in many polygons, the last one is used; returns an
+# array with the index of the polygon for each point (-1 if the point is
+# not in any polygon). Only the points inside the bounding box of a polygon
+# are tested, using the PointGrid; inside is the point in polygon test, and
+# takes (x,y,px,py) as arguments (the default is pointsInPoly())
+def getZones(x,y,polys,inside=pointsInPoly,grid=None):
+  x = np.asarray(x, dtype=np.float64)
+  y = np.asarray(y, dtype=np.float64)
+
+  if grid is None:
+    grid = PointGrid(x,y)
+
+  zone = np.zeros(len(x), dtype=np.int64) - 1
+
+  for i in range(len(polys)):
+    px,py = polys[i]
+    if (len(px) == 0):
+      continue
+
+    # the bounding box is made slightly larger, so that no point that is
+    # on the polygon is rejected because of round off
+    tol = 1.0E-9 * (1.0 + max(np.amax(np.abs(px)), np.amax(np.abs(py))))
+    idx = grid.getPointsInBox(np.amin(px) - tol, np.amax(px) + tol,
+      np.amin(py) - tol, np.amax(py) + tol)
+
+    if (len(idx) > 0):
+      zone[idx[inside(x[idx], y[idx], px, py)]] = i
+
+  return zone
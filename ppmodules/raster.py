@@ -0,0 +1,176 @@
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Global Imports
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np # numpy
+from ppmodules.writeMesh import * # for writeRows()
+from ppmodules.utilities import * # for fork_context()
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Functions
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# returns the coordinates of the columns and of the rows of a regular grid
+# with the given spacing that covers the rectangle (xmin,xmax,ymin,ymax);
+# the grid is the same as the one the adcirc2asc.py script has always made
+# (np.linspace over the rectangle, with range/spacing points)
+def gridAxes(xmin,xmax,ymin,ymax,spacing):
+  num_x_pts = int(divmod(xmax - xmin, spacing)[0])
+  num_y_pts = int(divmod(ymax - ymin, spacing)[0])
+
+  x_regs = np.linspace(xmin, xmax, num_x_pts)
+  y_regs = np.linspace(ymin, ymax, num_y_pts)
+
+  return x_regs, y_regs
+
+# returns a boolean array of shape (len(yg), len(xg)) that is True for the
+# grid points inside the polygon (px,py), where xg (which must be sorted)
+# and yg are the coordinates of the columns and rows of the grid; this is
+# a scanline fill that gives the same result as matplotlib's
+# Path.contains_point() (the same crossing test, done in the same floating
+# point operations), but only the edges that cross each row are looked at,
+# and each edge toggles a whole run of columns at once
+def polygonMask(px,py,xg,yg):
+  xg = np.asarray(xg, dtype=np.float64)
+  yg = np.asarray(yg, dtype=np.float64)
+  nrows = len(yg)
+  ncols = len(xg)
+
+  # the edges of the polygon (the polygon is closed from its last vertex
+  # back to its first vertex)
+  vtx0 = np.asarray(px, dtype=np.float64)
+  vty0 = np.asarray(py, dtype=np.float64)
+  vtx1 = np.roll(vtx0, -1)
+  vty1 = np.roll(vty0, -1)
+
+  # only the edges that are within the y range of the rows are needed
+  keep = (np.maximum(vty0,vty1) >= np.amin(yg)) & \
+    (np.minimum(vty0,vty1) <= np.amax(yg))
+  vtx0 = vtx0[keep]
+  vty0 = vty0[keep]
+  vtx1 = vtx1[keep]
+  vty1 = vty1[keep]
+
+  # pairs of rows and of the edges that cross them
+  yflag0 = (vty0[None,:] >= yg[:,None])
+  yflag1 = (vty1[None,:] >= yg[:,None])
+  r, j = np.nonzero(yflag0 != yflag1)
+
+  ty = yg[r]
+  yflag1 = yflag1[r,j]
+  vtx0 = vtx0[j]
+  vty0 = vty0[j]
+  vtx1 = vtx1[j]
+  vty1 = vty1[j]
+
+  # a point tx is toggled by an edge if (A >= (vtx1 - tx)*D) == yflag1;
+  # the left side is monotonic in tx, so the points where it is True are
+  # either all of the columns from k onwards (if D > 0) or all of the
+  # columns before k (if D < 0)
+  A = (vty1 - ty) * (vtx0 - vtx1)
+  D = vty0 - vty1
+  pos = (D > 0.0)
+
+  def after(k):
+    # True where the column k (clipped to the grid) is past the crossing
+    kc = np.clip(k, 0, ncols-1)
+    ge = (A >= (vtx1 - xg[kc]) * D)
+    return np.where(pos, ge, ~ge)
+
+  # estimate of k, which is then corrected so that it is exact
+  k = np.searchsorted(xg, vtx1 - A / D)
+  while True:
+    back = (k > 0) & after(k-1)
+    if not np.any(back):
+      break
+    k = k - back
+  while True:
+    fwd = (k < ncols) & ~after(k)
+    if not np.any(fwd):
+      break
+    k = k + fwd
+
+  # each edge toggles either the columns k onwards, or the columns before
+  # k (which is the same as toggling all columns, and then columns k
+  # onwards)
+  toggle = np.zeros((nrows, ncols+1), dtype=np.int64)
+  np.add.at(toggle, (r, k), 1)
+  np.add.at(toggle[:,0], r[pos != yflag1], 1)
+
+  return (np.cumsum(toggle[:,0:ncols], axis=1) % 2) == 1
+
+# the state used by rasterTile(); it is set by initRaster(), which is also
+# the initializer of each process of the pool in rasterTiles()
+raster_state = dict()
+
+# sets up the interpolation of the tin (x,y,z,ikle, with ikle zero based)
+# on the grid with columns x_regs and rows y_regs; poly is an optional
+# (px,py) polygon outside of which the grid is set to nodata
+def initRaster(x,y,z,ikle,x_regs,y_regs,poly=None,nodata=-999.0):
+  import matplotlib.tri as mtri
+
+  tin = mtri.Triangulation(x, y, ikle)
+  raster_state['interpolator'] = mtri.LinearTriInterpolator(tin, z)
+  raster_state['x_regs'] = np.asarray(x_regs, dtype=np.float64)
+  raster_state['y_regs'] = np.asarray(y_regs, dtype=np.float64)
+  raster_state['poly'] = poly
+  raster_state['nodata'] = nodata
+
+# interpolates the rows r0 to r1-1 of the grid (see initRaster()), and
+# returns them as a two dimensional array with the top row first (i.e.,
+# in the order they are written to *.asc and *.flt files)
+def rasterTile(rows):
+  r0, r1 = rows
+  x_regs = raster_state['x_regs']
+  y_regs = raster_state['y_regs'][r0:r1]
+  poly = raster_state['poly']
+  nodata = raster_state['nodata']
+
+  xreg, yreg = np.meshgrid(x_regs, y_regs)
+
+  zz = np.ma.filled(raster_state['interpolator'](xreg, yreg), np.nan)
+  zz = np.asarray(zz, dtype=np.float64)
+  zz[np.isnan(zz)] = nodata
+
+  if poly is not None:
+    zz[~polygonMask(poly[0], poly[1], x_regs, y_regs)] = nodata
+
+  return np.flipud(zz)
+
+# interpolates the tin (x,y,z,ikle, with ikle zero based) on the grid with
+# columns x_regs and rows y_regs, and yields the grid in tiles of whole
+# rows (of at most tile_cells cells, but at least one row), starting from
+# the top row; this way only a few tiles are in memory at any time, and
+# the tiles can be written to the output file as they are made. The tiles
+# are interpolated by a pool of processes if processes > 1. Grid points
+# outside of the tin, and outside of the optional (px,py) polygon poly
+# are set to nodata.
+def rasterTiles(x,y,z,ikle,x_regs,y_regs,poly=None,nodata=-999.0,
+  tile_cells=1000000,processes=1):
+
+  nrows = len(y_regs)
+  tile_rows = max(1, tile_cells // max(1, len(x_regs)))
+
+  # the tiles, from the top row down
+  tiles = [(max(0, r1 - tile_rows), r1) for r1 in range(nrows, 0, -tile_rows)]
+
+  args = (x,y,z,ikle,x_regs,y_regs,poly,nodata)
+
+  # where the processes can not be forked, a single process is used
+  ctx = fork_context()
+
+  if (processes <= 1 or ctx is None):
+    initRaster(*args)
+    for tile in tiles:
+      yield rasterTile(tile)
+    return
+
+  # the tiles are given to the pool a few at a time, so that the number of
+  # tiles in memory does not depend on the size of the grid
+  pool = ctx.Pool(processes, initRaster, args)
+  try:
+    for i in range(0, len(tiles), 2*processes):
+      for zz in pool.map(rasterTile, tiles[i:i+2*processes]):
+        yield zz
+  finally:
+    pool.terminate()
+    pool.join()
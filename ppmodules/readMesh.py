@@ -1,12 +1,115 @@
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os # operating system
 import numpy as np # numpy
+from itertools import islice
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Functions
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-def readAdcirc(adcirc_file):
+# parses a list of lines of text in bulk into a two dimensional numpy
+# array that has ncols columns; the lines are joined and converted with a 
+# single call to np.fromstring, which is much faster than splitting each
+# line; if the lines do not all have the same number of columns, this
+# falls back to parsing line by line (keeping the first ncols columns)
+def parseLines(lines, ncols, dtype=np.float64):
+  nlines = len(lines)
+  if (nlines == 0):
+    return np.zeros((0,ncols), dtype=dtype)
+  
+  data = np.fromstring(' '.join(lines), dtype=dtype, sep=' ')
+  
+  # number of columns of the first line
+  ncols_first = len(lines[0].split())
+  
+  if (ncols_first >= ncols and data.size == nlines*ncols_first):
+    return data.reshape(nlines, ncols_first)[:,0:ncols]
+  
+  # lines have a different number of columns
+  return np.array([line.split()[0:ncols] for line in lines]).astype(dtype)
+
+# reads nlines lines from an opened file fin, and parses them in bulk
+def readBlock(fin, nlines, ncols, dtype=np.float64):
+  lines = list(islice(fin, nlines))
+  return parseLines(lines, ncols, dtype)
+
+# the binary mesh cache is a *.npz file written next to the text mesh
+# file; it is used when the cache argument of the mesh readers is True, or
+# when the environment variable PPUTILS_MESH_CACHE is set to 1
+def useMeshCache(cache):
+  if (cache is None):
+    cache = (os.environ.get('PPUTILS_MESH_CACHE', '0') == '1')
+  return cache
+
+def meshCacheName(mesh_file):
+  return mesh_file + '.ppcache.npz'
+
+# returns the path, size and modification time of the mesh file, which are
+# stored in the cache, and used to decide if the cache is still valid
+def meshCacheKey(mesh_file):
+  st = os.stat(mesh_file)
+  return os.path.abspath(mesh_file), st.st_size, st.st_mtime
+
+# returns n,e,x,y,z,ikle from the cache, or None if there is no valid cache
+def readMeshCache(mesh_file):
+  cache_file = meshCacheName(mesh_file)
+  if not os.path.isfile(cache_file):
+    return None
+  
+  try:
+    path, size, mtime = meshCacheKey(mesh_file)
+    with np.load(cache_file) as data:
+      if (str(data['path']) != path or int(data['size']) != size or 
+        float(data['mtime']) != mtime):
+        return None
+      x = data['x']
+      y = data['y']
+      z = data['z']
+      ikle = data['ikle']
+  except Exception:
+    # a corrupt or unreadable cache is treated as if it did not exist
+    return None
+  
+  return len(x),len(ikle),x,y,z,ikle
+
+# writes the arrays to the *.npz cache_file; the cache is first written to
+# a temporary file, and then renamed, so that a partially written cache is
+# never read by another process
+def writeCache(cache_file, **arrays):
+  temp_file = cache_file + '.' + str(os.getpid()) + '.npz'
+  
+  try:
+    np.savez(temp_file, **arrays)
+    getattr(os, 'replace', os.rename)(temp_file, cache_file)
+  except Exception:
+    # the cache is optional (i.e., the directory may be read only)
+    if os.path.isfile(temp_file):
+      os.remove(temp_file)
+  
+  return None
+
+# writes the cache for the mesh file
+def writeMeshCache(mesh_file,n,e,x,y,z,ikle):
+  try:
+    path, size, mtime = meshCacheKey(mesh_file)
+  except Exception:
+    # the mesh file can not be read, so there is nothing to cache
+    return None
+  
+  writeCache(meshCacheName(mesh_file), path=path, size=size, mtime=mtime, 
+    x=x, y=y, z=z, ikle=ikle)
+  
+  return None
+
+def readAdcirc(adcirc_file, cache=None):
+
+  # if a valid binary cache exists, read the mesh from it
+  cache = useMeshCache(cache)
+  if cache:
+    mesh = readMeshCache(adcirc_file)
+    if mesh is not None:
+      return mesh
 
   fin = open(adcirc_file)
 
@@ -18,82 +121,45 @@ def readAdcirc(adcirc_file):
   e = int(str.split()[0])
   n = int(str.split()[1])
 
-  # now we can declare the arrays that are needed to store the values read
-  x = np.zeros(n, dtype=np.float64)
-  y = np.zeros(n, dtype=np.float64)
-  z = np.zeros(n, dtype=np.float64)
-
-  ikle = np.zeros( (e,3), dtype = np.int64)
-
-  # now we can read in the nodes
-  for i in range(n):
-    str = fin.readline()
-    lst = str.split()
-
-    x[i] = lst[1]
-    y[i] = lst[2]
-    z[i] = lst[3]
+  # now we can read in the nodes (node number, x, y, z)
+  nodes = readBlock(fin, n, 4, np.float64)
+  x = nodes[:,1].copy()
+  y = nodes[:,2].copy()
+  z = nodes[:,3].copy()
 
   # now we can read in the element connectivity
-  for j in range(e):
-    str = fin.readline()
-    lst = str.split()
+  # (element number, 3, node 1, node 2, node 3)
+  elements = readBlock(fin, e, 5, np.int64)
 
-    ikle[j,0] = int(lst[2])
-    ikle[j,1] = int(lst[3])
-    ikle[j,2] = int(lst[4])
+  fin.close()
 
   # now we shift the element connectivities, so that they are zero based
-  ikle[:,0] = ikle[:,0] - 1
-  ikle[:,1] = ikle[:,1] - 1
-  ikle[:,2] = ikle[:,2] - 1
+  ikle = elements[:,2:5] - 1
+  
+  if cache:
+    writeMeshCache(adcirc_file,n,e,x,y,z,ikle)
   
   return n,e,x,y,z,ikle
 
 def read2dm(two_dm_file):
 
-  fin = open(two_dm_file)
-
-  # https://stackoverflow.com/questions/845058/how-to-get-line-count-of-a-large-file-cheaply-in-python
-  # this code here cheaply reads the number of lines of a text file
-  def _make_gen(reader):
-    b = reader(1024 * 1024)
-    while b:
-      yield b
-      b = reader(1024*1024)
-  def rawgencount(filename):
-    f = open(filename, 'rb')
-    f_gen = _make_gen(f.raw.read)
-    return sum( buf.count(b'\n') for buf in f_gen )
-
-  num_lines = rawgencount(two_dm_file)
-
-  # because of the header line, the total number of lines in the file
-  # (which is nodes and elements joined is) n_plus_e
-  n_plus_e = num_lines - 1
-
-  # reads the header line
-  str = fin.readline()
-
-  # the number of elements counter
-  e = 0
-  n = 0
+  # the file is read only once; the header line is skipped
+  with open(two_dm_file) as fin:
+    lines = fin.readlines()[1:]
   
-  # go through each line and count the total number of elements and nodes
-  for i in range(n_plus_e):
-    str = fin.readline()
-    three_chars = str[0:3]
-    two_chars = str[0:2]
-    
-    if (three_chars == 'E3T'):
-      e = e + 1
-    if (two_chars == 'ND'):
-      n = n + 1
-
-  fin.close()
-
-  # open the same file again
-  fin = open(two_dm_file)
+  # the element and node cards, without the card names
+  ele_lines = [line[3:] for line in lines if line[0:3] == 'E3T']
+  node_lines = [line[2:] for line in lines if line[0:2] == 'ND']
+  
+  # the number of elements and nodes
+  e = len(ele_lines)
+  n = len(node_lines)
+  
+  # element number, node 1, node 2, node 3
+  elements = parseLines(ele_lines, 4, np.int64)
+  
+  # node number, x, y, z
+  nodes = parseLines(node_lines, 4, np.float64)
   
   # now we can declare the arrays that are needed to store the values read
   x = np.zeros(n, dtype=np.float64)
@@ -101,101 +167,45 @@ def read2dm(two_dm_file):
   z = np.zeros(n, dtype=np.float64)
 
   ikle = np.zeros( (e,3), dtype = np.int64)
-
-  # counters for nodes and elements
-  node_count = 0
-  ele_count = 0
   
-  # now to fill in x,y,z and ikle arrays
-  for i in range(n_plus_e):
-    str = fin.readline()
-    three_chars = str[0:3]
-    two_chars = str[0:2]
-    tmp = str.split(' ')
-    
-    if (three_chars == 'E3T'):
-      
-      ele_count = int(tmp[1])
-      ikle[ele_count-1,0] = int(tmp[2])
-      ikle[ele_count-1,1] = int(tmp[3])
-      ikle[ele_count-1,2] = int(tmp[4])
-
-    if (two_chars == 'ND'):
-      node_count = int(tmp[1])
-      x[node_count-1] = float(tmp[2])
-      y[node_count-1] = float(tmp[3])
-      z[node_count-1] = float(tmp[4])
-
-  fin.close()
+  # the elements and nodes are stored using their numbers
+  ele_num = elements[:,0] - 1
+  ikle[ele_num,:] = elements[:,1:4]
+  
+  node_num = nodes[:,0].astype(np.int64) - 1
+  x[node_num] = nodes[:,1]
+  y[node_num] = nodes[:,2]
+  z[node_num] = nodes[:,3]
 
   # now we shift the element connectivities, so that they are zero based
-  ikle[:,0] = ikle[:,0] - 1
-  ikle[:,1] = ikle[:,1] - 1
-  ikle[:,2] = ikle[:,2] - 1
+  ikle = ikle - 1
   
   return n,e,x,y,z,ikle
 
 def readPly(ply_file):
   #{{{
-  # define lists
-  x = list()
-  y = list()
-  z = list()
-  e1 = list()
-  e2 = list()
-  e3 = list()
+  fin = open(ply_file, 'r')
   
-  # each line in the file is a list object
-  line = list()
-  with open(ply_file, 'r') as f1:
-    for i in f1:
-      line.append(i)
+  # the header is the first 10 lines
+  header = list(islice(fin, 10))
   
-  # reads the nodes from    
-  n = line[3].split()[2]
-  n = int(n)
-  e = line[7].split()[2]
-  e = int(e)
+  # reads the number of nodes and elements from the header
+  n = int(header[3].split()[2])
+  e = int(header[7].split()[2])
   
-  node_str = str("")
-  # read nodes from file
-  for i in range(10,n+10):
-    node_str = line[i]
-    node_str_list = node_str.split()
-    x.append(node_str_list[0])
-    y.append(node_str_list[1])
-    z.append(node_str_list[2])
-    
+  # read nodes from file (x, y, z)
+  nodes = readBlock(fin, n, 3, np.float64)
+  xx = nodes[:,0].copy()
+  yy = nodes[:,1].copy()
+  zz = nodes[:,2].copy()
   
-  # write the temp elements file
-  for i in range(n+10,n+10+e):
-    ele_str = line[i]
-    ele_str_list = ele_str.split()
-    e1.append(ele_str_list[1])
-    e2.append(ele_str_list[2])
-    e3.append(ele_str_list[3])
-    
-  # turn these into numpy arrays
-  xx = np.zeros(n)
-  yy = np.zeros(n)
-  zz = np.zeros(n)
-  e11 = np.zeros(e)
-  e22 = np.zeros(e)
-  e33 = np.zeros(e)
+  # read elements from file (3, node 1, node 2, node 3)
+  elements = readBlock(fin, e, 4, np.int64)
   
-  for i in range(0,n):
-    xx[i] = x[i]
-    yy[i] = y[i]
-    zz[i] = z[i]
+  fin.close()
     
   # +1 to change index of elements to match
-  for i in range(0,e):
-    e11[i] = int(e1[i])+1
-    e22[i] = int(e2[i])+1
-    e33[i] = int(e3[i])+1
-    
-  # stack the elements
-  ikle = np.column_stack((e11,e22,e33))  
+  ikle = elements[:,1:4] + 1
   ikle = ikle.astype(np.int32)
   
   return n,e,xx,yy,zz,ikle
@@ -213,79 +223,26 @@ def readDat(dat_file):
   n = int( line.split()[0] )
   e = int( line.split()[1] ) # this includes the 1d elements too
 
-  # now we can define numpy arrays to store the mesh data
-  x = np.zeros(n, dtype=np.float64)
-  y = np.zeros(n, dtype=np.float64)
-  z = np.zeros(n, dtype=np.float64)
-
-  # this is the ikle array, but it has the shape that includes all
-  # elements (1d+2d)
-  ikle = np.zeros( (e,3), dtype=np.int64)
-
-  # element type flag in the *.dat mesh (103 = 1d mesh; 203 = 2d mesh)
-  mesh_flag = np.zeros(e, dtype=np.int64)
+  # read the nodes (node number, x, y, z)
+  nodes = readBlock(fin, n, 4, np.float64)
+  x = nodes[:,1].copy()
+  y = nodes[:,2].copy()
+  z = nodes[:,3].copy()
+
+  # read the elements (1d+2d); the element type flag in the *.dat mesh 
+  # is the second column (103 = 1d mesh; 203 = 2d mesh); only the 2d 
+  # elements are kept
+  lines = list(islice(fin, e))
+  lines2d = [line for line in lines if line.split(None,2)[1] == '203']
+  
+  # element number, 203, node 1, node 2, node 3
+  elements = parseLines(lines2d, 5, np.int64)
   
-  # now we can read the *.dat file line by line, and store into arrays
-  # read the nodes
-  for i in range(n):
-    # reads the file from the file stream as a string
-    line = fin.readline()
-
-    # converts the line as a list of strings
-    lst = line.split()
-
-    # do not have to read the node number (at lst[0])
-    x[i] = float( lst[1])
-    y[i] = float( lst[2])
-    z[i] = float( lst[3])
-
-  # now we are ready to store the elements into the ikle array
-  # count for the 2d elements
-  count = 0
-
-  # read the elements
-  for i in range(e):
-    # reads the file from the file stream as a string
-    line = fin.readline()
-
-    # converts the line as a list of strings
-    lst = line.split()
-
-    # store the mesh flag (convert string to an integer)
-    mesh_flag[i] = int(lst[1])
-
-    # store everything in the ikle array (1d+2d)
-    # count the ones that are 203 (these are 2d elements)
-    if (mesh_flag[i] == 203):
-      ikle[i,0] = lst[2]
-      ikle[i,1] = lst[3]
-      ikle[i,2] = lst[4]
-
-      # update the count
-      count = count + 1
-
-  # now that we have the count for the number of 2d elements, we can define
-  # the ikle2d array
-  ikle2d = np.zeros((count, 3), dtype=np.int64)
-
-  # go through the ikle array, and write only the 2d elements to the ikle2d array
-  a = 0 
-  for i in range(e):
-    if (mesh_flag[i] == 203):
-      ikle2d[a,0] = ikle[i,0]
-      ikle2d[a,1] = ikle[i,1]
-      ikle2d[a,2] = ikle[i,2]
-
-      # increment the counter
-      a = a + 1
-      
   # the number of 2d elements is this
-  e = count
+  e = len(lines2d)
 
   # change the indexes of the ikle2d array to zero based
-  ikle2d[:,0] = ikle2d[:,0] - 1
-  ikle2d[:,1] = ikle2d[:,1] - 1
-  ikle2d[:,2] = ikle2d[:,2] - 1
+  ikle2d = elements[:,2:5] - 1
   
   # close the input file
   fin.close()
@@ -0,0 +1,75 @@
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Global Imports
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np # numpy
+from scipy import sparse # sparse adjacency matrix
+from scipy.sparse import csgraph # reverse cuthill mckee
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Functions
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# returns the edges of the elements of the mesh (ikle zero based) as two
+# arrays of node indices; each edge is listed once for each element that
+# has it
+def meshEdges(ikle):
+  ikle = np.asarray(ikle, dtype=np.int64)
+  return ikle[:,[0,1,2]].ravel(), ikle[:,[1,2,0]].ravel()
+
+# returns the node adjacency graph of the mesh (n nodes, ikle zero based)
+# as a symmetric sparse matrix, where entry (i,j) is non zero if nodes i
+# and j are connected by an edge of the mesh
+def adjacencyMatrix(n,ikle):
+  n1, n2 = meshEdges(ikle)
+  rows = np.concatenate((n1, n2))
+  cols = np.concatenate((n2, n1))
+  data = np.ones(len(rows), dtype=np.int32)
+  return sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+
+# returns the bandwidth (the largest difference between the numbers of two
+# connected nodes) and the profile (the sum over all nodes of the
+# difference between the node and the lowest numbered node connected to
+# it) of the mesh (n nodes, ikle zero based)
+def meshBandwidth(n,ikle):
+  n1, n2 = meshEdges(ikle)
+  if (len(n1) == 0):
+    return 0, 0
+
+  bandwidth = int(np.amax(np.abs(n1 - n2)))
+
+  # the lowest numbered node connected to each node (or the node itself)
+  lowest = np.arange(n, dtype=np.int64)
+  np.minimum.at(lowest, n1, n2)
+  np.minimum.at(lowest, n2, n1)
+  profile = int(np.sum(np.arange(n, dtype=np.int64) - lowest))
+
+  return bandwidth, profile
+
+# returns the reverse cuthill mckee permutation of the nodes of the mesh
+# (n nodes, ikle zero based), as the array perm, where perm[i] is the old
+# index of the node that becomes node i
+def rcmPermutation(n,ikle):
+  A = adjacencyMatrix(n,ikle)
+  return np.asarray(csgraph.reverse_cuthill_mckee(A, symmetric_mode=True),
+    dtype=np.int64)
+
+# renumbers the nodes of the mesh (x,y,z,ikle, with ikle zero based) using
+# the reverse cuthill mckee algorithm, and returns the renumbered x,y,z and
+# ikle; if elements is True, the elements are also renumbered, in order of
+# their lowest numbered node (elements with the same lowest node keep
+# their order)
+def renumberMesh(x,y,z,ikle,elements=False):
+  n = len(x)
+  perm = rcmPermutation(n,ikle)
+
+  # the new index of each old node
+  inv = np.zeros(n, dtype=np.int64)
+  inv[perm] = np.arange(n)
+
+  ikle = inv[ikle]
+
+  if elements:
+    order = np.argsort(np.amin(ikle, axis=1), kind='stable')
+    ikle = ikle[order]
+
+  return x[perm], y[perm], z[perm], ikle
@@ -0,0 +1,206 @@
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Global Imports
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import numpy as np # numpy
+from scipy import sparse # sparse integration matrices
+from ppmodules.interpolation import * # for interpMatrix()
+from ppmodules.polygons import * # for PointGrid
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Functions
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# returns the weights w of simpson's rule for the stations sta, so that
+# the integral of f is w.dot(f); the weights are the same as those used by
+# scipy's simpson() (for an even number of stations, the last interval is
+# integrated with the correction of Cartwright, which is what scipy does
+# since version 1.11)
+def simpsonWeights(sta):
+  m = len(sta)
+  w = np.zeros(m)
+
+  if (m < 2):
+    return w
+
+  # trapezoidal rule
+  if (m == 2):
+    w[:] = 0.5 * (sta[1] - sta[0])
+    return w
+
+  # pairs of intervals of the composite rule
+  n = m if (m % 2 == 1) else m-1
+  h = np.diff(sta[0:n])
+  h0 = h[0::2]
+  h1 = h[1::2]
+  hsum = h0 + h1
+
+  w[0:n-2:2] += hsum / 6.0 * (2.0 - h1/h0)
+  w[1:n-1:2] += hsum / 6.0 * (hsum*hsum / (h0*h1))
+  w[2:n:2] += hsum / 6.0 * (2.0 - h0/h1)
+
+  # the last interval (for an even number of stations)
+  if (n < m):
+    h0 = sta[-2] - sta[-3]
+    h1 = sta[-1] - sta[-2]
+    w[-1] += (2.0*h1*h1 + 3.0*h0*h1) / (6.0*(h0 + h1))
+    w[-2] += (h1*h1 + 3.0*h0*h1) / (6.0*h0)
+    w[-3] -= h1*h1*h1 / (6.0*h0*(h0 + h1))
+
+  return w
+
+# returns the chainage along each line of a pputils lines file (the
+# chainage starts at zero for each new shapeid), as well as the distance
+# from the previous node
+def getChainage(shapeid,x,y):
+  dist = np.zeros(len(shapeid))
+  sta = np.zeros(len(shapeid))
+
+  for i in range(1, len(shapeid)):
+    if (shapeid[i] - shapeid[i-1] < 0.001):
+      xdist = x[i] - x[i-1]
+      ydist = y[i] - y[i-1]
+      dist[i] = np.sqrt(xdist*xdist + ydist*ydist)
+      sta[i] = sta[i-1] + dist[i]
+
+  return sta, dist
+
+# returns the parameters t (0 < t < 1) along the segment from (x1,y1) to
+# (x2,y2) where the segment crosses the edges of the mesh; edges is an
+# array of the node pairs of each edge, and grid is a PointGrid of the
+# edge mid points (half is half of the longest edge)
+def getEdgeCrossings(x,y,edges,grid,half,x1,y1,x2,y2):
+  idx = grid.getPointsInBox(min(x1,x2) - half, max(x1,x2) + half,
+    min(y1,y2) - half, max(y1,y2) + half)
+
+  ax = x[edges[idx,0]]
+  ay = y[edges[idx,0]]
+  bx = x[edges[idx,1]]
+  by = y[edges[idx,1]]
+
+  # solves (x1,y1) + t*(x2-x1,y2-y1) = a + s*(b-a) for t and s
+  dx = x2 - x1
+  dy = y2 - y1
+  ex = bx - ax
+  ey = by - ay
+  den = dx*ey - dy*ex
+
+  ok = np.abs(den) > 1.0E-12
+  den = np.where(ok, den, 1.0)
+  t = ((ax-x1)*ey - (ay-y1)*ex) / den
+  s = ((ax-x1)*dy - (ay-y1)*dx) / den
+
+  ok = ok & (t > 0.0) & (t < 1.0) & (s >= 0.0) & (s <= 1.0)
+  return np.unique(t[ok])
+
+# builds the operators needed to compute the discharge through sections;
+# (x,y,ikle) is the mesh (ikle zero based), and (shapeid,x_lns,y_lns) are
+# the nodes of the (resampled) sections in pputils lines format; returns
+# the ids of the sections, a sparse matrix P that interpolates values at
+# the mesh nodes to the integration points of the sections, a sparse
+# matrix W (integration points by sections) of the integration weights,
+# and a boolean array that is True for sections that have points outside
+# of the mesh (their discharge is not defined).
+#
+# By default, the integration points are the nodes of the sections, and W
+# is simpson's rule on their chainage (the same as calling simps for each
+# section). If exact is True, the sections are also split where they cross
+# the edges of the mesh, so that the depths and velocities are linear on
+# each piece, and each piece is integrated with simpson's rule using its
+# mid point (which is exact for the unit discharges u*h and v*h, and for
+# their magnitude if the direction of the flow is the same along a piece).
+def sectionOperators(x,y,ikle,shapeid,x_lns,y_lns,exact=False):
+  sta, dist = getChainage(shapeid,x_lns,y_lns)
+
+  ids = np.unique(shapeid)
+
+  px = list()
+  py = list()
+  rows = list()
+  cols = list()
+  vals = list()
+  npts = 0
+
+  if exact:
+    # unique edges of the mesh, and a grid of their mid points
+    edges = np.sort(np.vstack((ikle[:,[0,1]], ikle[:,[1,2]],
+      ikle[:,[2,0]])), axis=1)
+    edges = np.unique(edges, axis=0)
+    grid = PointGrid(0.5*(x[edges[:,0]] + x[edges[:,1]]),
+      0.5*(y[edges[:,0]] + y[edges[:,1]]))
+    half = 0.5 * np.amax(np.sqrt((x[edges[:,1]] - x[edges[:,0]])**2 +
+      (y[edges[:,1]] - y[edges[:,0]])**2))
+
+  for j in range(len(ids)):
+    idx = np.nonzero(np.abs(ids[j] - shapeid) < 0.01)[0]
+
+    if not exact:
+      cx = x_lns[idx]
+      cy = y_lns[idx]
+      w = simpsonWeights(sta[idx])
+    else:
+      # break points of the section: its nodes, and the edge crossings
+      bx = [x_lns[idx[0]]]
+      by = [y_lns[idx[0]]]
+      bs = [sta[idx[0]]]
+      for k in range(1, len(idx)):
+        i0 = idx[k-1]
+        i1 = idx[k]
+        t = getEdgeCrossings(x,y,edges,grid,half,
+          x_lns[i0],y_lns[i0],x_lns[i1],y_lns[i1])
+        t = np.append(t, 1.0)
+        bx.extend((x_lns[i0] + t*(x_lns[i1] - x_lns[i0])).tolist())
+        by.extend((y_lns[i0] + t*(y_lns[i1] - y_lns[i0])).tolist())
+        bs.extend((sta[i0] + t*(sta[i1] - sta[i0])).tolist())
+      bx = np.array(bx)
+      by = np.array(by)
+      bs = np.array(bs)
+
+      # the break points, followed by the mid points of each piece
+      cx = np.concatenate((bx, 0.5*(bx[:-1] + bx[1:])))
+      cy = np.concatenate((by, 0.5*(by[:-1] + by[1:])))
+      h = bs[1:] - bs[:-1]
+      nb = len(bx)
+      w = np.zeros(len(cx))
+      np.add.at(w, np.arange(nb-1), h/6.0)
+      np.add.at(w, np.arange(1,nb), h/6.0)
+      w[nb:] = 4.0*h/6.0
+
+    px.append(cx)
+    py.append(cy)
+    rows.append(np.arange(npts, npts + len(cx)))
+    cols.append(np.zeros(len(cx), dtype=np.int64) + j)
+    vals.append(w)
+    npts = npts + len(cx)
+
+  px = np.concatenate(px)
+  py = np.concatenate(py)
+
+  P = interpMatrix(x, y, ikle, px, py, nearest=False)
+  W = sparse.csr_matrix((np.concatenate(vals),
+    (np.concatenate(rows), np.concatenate(cols))), shape=(npts, len(ids)))
+
+  # integration points outside of the mesh have no values
+  outside = (np.diff(P.indptr) == 0)
+  undefined = np.zeros(len(ids), dtype=bool)
+  undefined[np.concatenate(cols)[outside]] = True
+
+  return ids, P, W, undefined
+
+# computes the discharge through the sections for many time steps at once;
+# depths, velu and velv are arrays of shape (ntimes, NPOIN), and P, W and
+# undefined are from sectionOperators(); returns Q of shape (ntimes,
+# number of sections), where Q is the integral of the magnitude of the
+# unit discharge (the sections must be perpendicular to the flow)
+def sectionFlux(P,W,undefined,depths,velu,velv):
+  depths_lns = P.dot(np.asarray(depths, dtype=np.float64).T).T
+  velu_lns = P.dot(np.asarray(velu, dtype=np.float64).T).T
+  velv_lns = P.dot(np.asarray(velv, dtype=np.float64).T).T
+
+  uh = velu_lns * depths_lns
+  vh = velv_lns * depths_lns
+  mag = np.sqrt(uh*uh + vh*vh)
+
+  Q = np.asarray(W.T.dot(mag.T).T)
+  Q[:,undefined] = np.nan
+
+  return Q
@@ -33,6 +33,29 @@
 # Revised: Nov 24, 2019
 # Made the change recommended by Qilong Bi to work in writing 3d files.
 #
+# Revised: Oct 18, 2026
+# The IKLE, IPOBO, x and y records in readHeader() are now read with a
+# single read per record, and decoded in bulk using numpy.
+#
+# Revised: Oct 18, 2026
+# Time step positions are now computed from NPOIN, NBV1 and float_size, so
+# that readVariables() seeks directly to the desired time step instead of
+# scanning all prior time steps. Added readVariable() that reads a single
+# variable for a given time step.
+#
+# Revised: Oct 18, 2026
+# Added mapResults() that exposes all results in the file as a memory 
+# mapped array of shape (ntimes, NBV1, NPOIN), for files that are too
+# large to be read into memory.
+#
+# Revised: Oct 18, 2026
+# writeHeader() and writeVariables() now write each record with a single
+# call. Added writeVariablesBatch() that writes several time steps at once.
+#
+# Revised: Oct 18, 2026
+# Added readVariablesAtNodes() that extracts results for many nodes at 
+# once, using the memory map of the file. readVariablesAtNode() now uses it.
+#
 # Uses: Python 2 or 3, Numpy
 #
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -95,11 +118,23 @@ class ppSELAFIN:
     
     self.time = []
     
+    # byte offset of the first time step, and of each time step in the file
+    self.pos_data = 0
+    self.frame_pos = np.zeros(0, dtype=np.int64)
+    
     # temporary array that hold results read for a single time step
     # for each variable in the file
     self.temp = np.zeros((self.NBV1,self.NPOIN))
     
     self.tempAtNode = np.zeros((0,0))
+    self.tempAtNodes = np.zeros((0,0,0))
+    
+    # temporary array that holds results of a single variable
+    self.tempVar = np.zeros(self.NPOIN)
+    
+    # memory mapped view of all results (see mapResults())
+    self.mm = None
+    self.res = np.zeros((0, self.NBV1, self.NPOIN))
     
   # methods start here
   def readHeader(self):
@@ -176,23 +211,19 @@ class ppSELAFIN:
     dummy = unpack('>i', self.f.read(4))[0]
     garbage = unpack('>i', self.f.read(4))[0]
     
-    self.IKLE = np.zeros((self.NELEM, self.NDP), dtype=np.int32)
-    
+    # the connectivity, boundary and coordinate records are read in bulk,
+    # one read per fortran record, and decoded as big endian numpy arrays
     garbage = unpack('>i', self.f.read(4))[0]
-    for i in range(self.NELEM):
-      for j in range(self.NDP):
-        self.IKLE[i,j] = unpack('>l', self.f.read(4))[0]
+    self.IKLE = np.frombuffer(self.f.read(4*self.NELEM*self.NDP), 
+      dtype='>i4').reshape(self.NELEM, self.NDP).astype(np.int32)
     garbage = unpack('>i', self.f.read(4))[0]    
     
-    self.IPOBO = np.zeros(self.NPOIN, dtype=np.int32)
-    
     garbage = unpack('>i', self.f.read(4))[0]
-    for i in range(self.NPOIN):
-      self.IPOBO[i] = unpack('>l', self.f.read(4))[0]
+    self.IPOBO = np.frombuffer(self.f.read(4*self.NPOIN), 
+      dtype='>i4').astype(np.int32)
     garbage = unpack('>i', self.f.read(4))[0]
       
     # reads x
-    self.x = np.zeros(self.NPOIN)
     garbage = unpack('>i', self.f.read(4))[0]
     
     # this is where we decide if it is single of double precision
@@ -202,17 +233,19 @@ class ppSELAFIN:
       self.float_type = 'd'
       self.float_size = 8  
     
-    for i in range(self.NPOIN):
-      self.x[i] = unpack('>' + self.float_type, self.f.read(self.float_size))[0]
+    self.x = np.frombuffer(self.f.read(self.float_size*self.NPOIN), 
+      dtype='>' + self.float_type).astype(np.float64)
     garbage = unpack('>i', self.f.read(4))[0]
     
     # reads y 
-    self.y = np.zeros(self.NPOIN)
     garbage = unpack('>i', self.f.read(4))[0]
-    for i in range(self.NPOIN):
-      self.y[i] = unpack('>' + self.float_type, self.f.read(self.float_size))[0]
+    self.y = np.frombuffer(self.f.read(self.float_size*self.NPOIN), 
+      dtype='>' + self.float_type).astype(np.float64)
     garbage = unpack('>i', self.f.read(4))[0]
     
+    # the results for the first time step start here
+    self.pos_data = self.f.tell()
+    
   def writeHeader(self):
     self.f = open(self.slf_file, 'wb')
     
@@ -265,68 +298,80 @@ class ppSELAFIN:
     self.f.write(pack('>i', 1)) # NPLAN???
     self.f.write(pack('>i', 16))
     
+    # the connectivity, boundary and coordinate records are each written
+    # with a single call
     self.f.write(pack('>i', 4*self.NELEM*self.NDP))
-    for i in range(self.NELEM):
-      for j in range(self.NDP):
-        self.f.write(pack('>i', self.IKLE[i,j]))
+    self.f.write(np.asarray(self.IKLE).astype('>i4').tobytes())
     self.f.write(pack('>i', 4*self.NELEM*self.NDP))
     
     self.f.write(pack('>i', 4*self.NPOIN))
-    for i in range(len(self.IPOBO)):
-      self.f.write(pack('>i', self.IPOBO[i]))
+    self.f.write(np.asarray(self.IPOBO).astype('>i4').tobytes())
     self.f.write(pack('>i', 4*self.NPOIN))
     
     # this is the garbage record that determines the float size
     # I have no idea why this works, but it does!!!
     self.f.write(pack('>i', self.float_size*self.NPOIN))
-    for i in range(len(self.x)):
-      self.f.write(pack('>'+self.float_type, self.x[i]))
+    self.f.write(np.asarray(self.x).astype('>'+self.float_type).tobytes())
     self.f.write(pack('>i', self.float_size*self.NPOIN))
 
     self.f.write(pack('>i', self.float_size*self.NPOIN))
-    for i in range(len(self.y)):
-      self.f.write(pack('>'+self.float_type, self.y[i]))
+    self.f.write(np.asarray(self.y).astype('>'+self.float_type).tobytes())
     self.f.write(pack('>i', self.float_size*self.NPOIN))
     
   def writeVariables(self,time,temp):
+    # writes a single time step; temp has shape (NBV1, NPOIN)
+    self.writeVariablesBatch([time], [temp])
+    
+  def writeVariablesBatch(self,times,temps):
+    # writes several time steps with a single call; times is a list of
+    # length ntimes, and temps has shape (ntimes, NBV1, NPOIN)
+    temps = np.asarray(temps)
+    
     # appends object's time 
-    self.time.append(time)
+    self.time.extend(times)
+    
+    # keeps only the last 2d array in object's memory
+    self.temp = temps[-1]
+    
+    # the time steps are assembled as numpy records (including the fortran
+    # markers), and then written to the file all at once
+    frames = np.zeros(len(times), dtype=self.getFrameType())
     
-    # keeps only the current 2d array in object's memory
-    self.temp = temp
+    # the time record
+    frames['tstart'] = 4
+    frames['time'] = times
+    frames['tend'] = 4
     
-    # write the time 
-    self.f.write(pack('>i', 4))
-    self.f.write(pack('>'+self.float_type, time))
-    self.f.write(pack('>i', 4))
+    # the variables
+    frames['vars']['start'] = self.float_size*self.NPOIN
+    frames['vars']['values'] = temps
+    frames['vars']['end'] = self.float_size*self.NPOIN
     
-    # writes the rest of the variables
-    for j in range(self.NBV1):
-      self.f.write(pack('>i', self.float_size*self.NPOIN))
-      for k in range(self.NPOIN):
-        self.f.write(pack('>'+self.float_type, self.temp[j,k]))
-      self.f.write(pack('>i', self.float_size*self.NPOIN))
+    self.f.write(frames.tobytes())
     
   def readTimes(self):
     pos_prior_to_time_reading = self.f.tell()
     
-    while True:
-      try:
-        # get the times
-        self.f.seek(4,1)
-        self.time.append( unpack('>'+self.float_type, self.f.read(self.float_size))[0] )
-        self.f.seek(4,1)
-        
-        # skip through the variables
-        self.f.seek(self.NBV1*(4+self.float_size*self.NPOIN+4), 1)
-        
-        # skip the variables
-        # 4 at begining and end are garbage
-        # 4*NPOIN assumes each times step there are NPOIN nodes of 
-        # size 4 bytes (i.e., single precision)
-        # f.seek(NBV1*(4+4*NPOIN+4), 1)
-      except:
-        break
+    # the number of time steps is computed from the file size, as each 
+    # time step has the same size; a time step is counted as long as its
+    # time value can be read (same as scanning the file record by record)
+    self.f.seek(0,2)
+    nbytes = self.f.tell() - self.pos_data - (4 + self.float_size)
+    if (nbytes >= 0):
+      numTimes = nbytes // self.getFrameSize() + 1
+    else:
+      numTimes = 0
+    
+    # byte offset of each time step in the file (built once)
+    self.frame_pos = self.pos_data + \
+      np.arange(numTimes, dtype=np.int64) * self.getFrameSize()
+    
+    # get the times
+    self.time = []
+    for t in range(numTimes):
+      self.f.seek(self.frame_pos[t] + 4)
+      self.time.append( unpack('>'+self.float_type, self.f.read(self.float_size))[0] )
+    
     self.f.seek(pos_prior_to_time_reading)
     
   def readVariables(self,t_des):
@@ -336,75 +381,121 @@ class ppSELAFIN:
     # reads data for all variables in the *.slf file at desired time t_des
     self.temp = np.zeros((self.NBV1,self.NPOIN))
     
-    # it reads the time again, but this it is not used
-    time2 = []
-    
-    # time index
-    t = -1
-    
-    while True:
-      try:
-        self.f.seek(4,1)
-        time2.append( unpack('>'+self.float_type, self.f.read(self.float_size))[0] )
-        self.f.seek(4,1)
-        
-        t = t + 1
-        
-        if (t == t_des):
-          # print('slf time: ' + str(t))
-          for i in range(self.NBV1):
-            self.f.seek(4,1)
-            for j in range(self.NPOIN):
-              self.temp[i,j] = unpack('>'+self.float_type, self.f.read(self.float_size))[0]
-            self.f.seek(4,1)
-        else:
-          self.f.seek(self.NBV1*(4+self.float_size*self.NPOIN+4), 1)
-      except:
-        break
+    # skip the time record, and read all variable records in one go
+    nbytes = self.NBV1 * self.getRecordType().itemsize
+    buf = b''
+    # t_des is a time step index; a float is only found if it is a whole
+    # number (i.e., readVariables(times[-1]) reads step 0 if times = [0.0])
+    if (t_des >= 0 and t_des == int(t_des)):
+      self.f.seek(self.getFramePosition(int(t_des)) + 4 + self.float_size + 4)
+      buf = self.f.read(nbytes)
+    
+    # if t_des is not in the file, the results are left as zeros; values
+    # missing from a truncated last time step are also left as zeros
+    if (len(buf) > 0):
+      buf = buf + b'\x00' * (nbytes - len(buf))
+      rec = np.frombuffer(buf, dtype=self.getRecordType(), count=self.NBV1)
+      self.temp = rec['values'].astype(np.float64)
         
     # need to re-set in case another variable needs to be read!
     self.f.seek(pos_prior_to_var_reading)    
 
+  def readVariable(self,t_des,v):
+    pos_prior_to_var_reading = self.f.tell()
+    
+    # reads data for a single variable v at desired time t_des
+    self.tempVar = np.zeros(self.NPOIN)
+    
+    # skip the time record, the records of variables prior to v and the
+    # 4 byte marker at the start of the record of variable v
+    nbytes = self.float_size * self.NPOIN
+    buf = b''
+    if (t_des >= 0 and t_des == int(t_des) and v >= 0 and v < self.NBV1):
+      self.f.seek(self.getFramePosition(int(t_des)) + 4 + self.float_size + 4 + 
+        v * self.getRecordType().itemsize + 4)
+      buf = self.f.read(nbytes)
+    
+    if (len(buf) > 0):
+      buf = buf + b'\x00' * (nbytes - len(buf))
+      self.tempVar = np.frombuffer(buf, 
+        dtype='>'+self.float_type).astype(np.float64)
+    
+    self.f.seek(pos_prior_to_var_reading)    
+
+  def mapResults(self):
+    # maps all time steps in the file with numpy.memmap, without reading 
+    # them into memory; self.res is a strided view of the results with 
+    # shape (ntimes, NBV1, NPOIN), where the 4 byte fortran markers are
+    # skipped via strides; slicing self.res (i.e., res[t,v,:] or 
+    # res[:,v,node]) reads only the data that is needed
+    
+    frame_type = self.getFrameType()
+    
+    # only complete time steps can be mapped
+    pos_prior_to_mapping = self.f.tell()
+    self.f.seek(0,2)
+    numTimes = (self.f.tell() - self.pos_data) // frame_type.itemsize
+    self.f.seek(pos_prior_to_mapping)
+    
+    if (numTimes > 0):
+      self.mm = np.memmap(self.slf_file, dtype=frame_type, mode='r', 
+        offset=self.pos_data, shape=(numTimes,))
+      self.res = self.mm['vars']['values']
+    else:
+      self.mm = np.zeros(0, dtype=frame_type)
+      self.res = np.zeros((0, self.NBV1, self.NPOIN))
+    
   def readVariablesAtNode(self,node):
     
     # node is the desired node from which to extract results for
+    self.readVariablesAtNodes([node])
+    self.tempAtNode = self.tempAtNodes[0]
+    
+  def readVariablesAtNodes(self,nodes):
+    
+    # nodes is an array of node indices from which to extract results for;
+    # the results are stored in an array of shape (npoints, ntimes, NBV1)
+    nodes = np.asarray(nodes, dtype=np.int64)
     numTimes = len(self.time)
     
     pos_prior_to_var_reading = self.f.tell()
     
-    # reads data for all variables in the *.slf file at desired time t_des
-    self.tempAtNode = np.zeros((numTimes, self.NBV1))
+    self.tempAtNodes = np.zeros((len(nodes), numTimes, self.NBV1))
     
-    # it reads the time again, but this it is not used
-    time2 = []
+    # the values are extracted from the memory map of the file, which only
+    # reads the parts of the file where the nodes are stored
+    if (self.mm is None):
+      self.mapResults()
     
-    # time index
-    t = -1
+    # results at a truncated last time step (if any) are left as zeros
+    n = min(numTimes, self.res.shape[0])
+    self.tempAtNodes[:,0:n,:] = np.transpose(self.res[0:n,:,nodes], (2,0,1))
     
-    while True:
-      try:
-        self.f.seek(4,1)
-        time2.append( unpack('>'+self.float_type, self.f.read(self.float_size))[0] )
-        self.f.seek(4,1)
-        
-        # this is the time step index
-        t = t + 1
-        
-        for i in range(self.NBV1):
-          self.f.seek(4,1)
-          
-          self.f.seek( (node)*self.float_size, 1)
-          self.tempAtNode[t,i] = unpack('>'+self.float_type, self.f.read(self.float_size))[0]
-          self.f.seek ((self.NPOIN - node -1)*self.float_size , 1)
-              
-          self.f.seek(4,1)
-      except:
-        break
-        
     # need to re-set in case another variable needs to be read!
     self.f.seek(pos_prior_to_var_reading)  
     
   # get methods start here
+  def getRecordType(self):
+    # numpy dtype of a single fortran record of NPOIN floats, including
+    # the 4 byte markers at its start and end
+    return np.dtype([('start', '>i4'), 
+      ('values', '>'+self.float_type, (self.NPOIN,)), ('end', '>i4')])
+    
+  def getFrameType(self):
+    # numpy dtype of a single time step; the time record, followed by
+    # a record for each variable
+    return np.dtype([('tstart', '>i4'), ('time', '>'+self.float_type), 
+      ('tend', '>i4'), ('vars', self.getRecordType(), (self.NBV1,))])
+    
+  def getFrameSize(self):
+    # size in bytes of a single time step (the time record, followed by
+    # a record for each variable)
+    return self.getFrameType().itemsize
+    
+  def getFramePosition(self,t):
+    # byte offset in the file of the start of time step t
+    return self.pos_data + t * self.getFrameSize()
+    
   def getPrecision(self):
     return self.float_type,self.float_size
     
@@ -438,8 +529,17 @@ class ppSELAFIN:
   def getVarValues(self):
     return self.temp
     
+  def getVariable(self):
+    return self.tempVar
+    
+  def getResults(self):
+    return self.res
+    
   def getVarValuesAtNode(self):
     return self.tempAtNode
+    
+  def getVarValuesAtNodes(self):
+    return self.tempAtNodes
 
   def getIPOBO(self):
     return self.IPOBO
@@ -488,4 +588,7 @@ class ppSELAFIN:
     self.y = y
     
   def close(self):
+    # releases the memory map (if any) before closing the file
+    self.mm = None
+    self.res = np.zeros((0, self.NBV1, self.NPOIN))
     self.f.close()
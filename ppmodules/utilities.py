@@ -1,18 +1,59 @@
 import os,sys     
 import numpy as np
-import struct     
-import subprocess
-from collections import OrderedDict
+import multiprocessing
 from scipy import spatial
 from ppmodules.readMesh import *
+from ppmodules.mesh import * # for Mesh and getBoundary()
+
+# returns the indices of the unique (x,y) nodes, in the order in which they
+# first occur; two nodes are duplicates if their coordinates are the same 
+# once rounded to the nearest tol (the default tol of 0.001 is the same as 
+# cropping to three decimals); the rounded coordinates are used as integer 
+# keys, and the duplicates are found by sorting the keys (rather than by 
+# building a dictionary of tuples one node at a time). If radius is > 0, 
+# nodes that are within radius of a node that occurs before them (and is 
+# kept) are also removed (i.e., near duplicates are snapped to the first
+# node).
+def unique_nodes_index(x,y,tol=0.001,radius=0.0):
+  scale = 1.0 / tol
+  kx = np.rint(np.asarray(x) * scale).astype(np.int64)
+  ky = np.rint(np.asarray(y) * scale).astype(np.int64)
+  
+  if (len(kx) == 0):
+    return np.zeros(0, dtype=np.int64)
+  
+  # lexsort is stable, so the first node of each group of duplicates is
+  # the one that occurs first in the input
+  order = np.lexsort((ky,kx))
+  first = np.ones(len(order), dtype=bool)
+  first[1:] = (kx[order[1:]] != kx[order[:-1]]) | \
+    (ky[order[1:]] != ky[order[:-1]])
+  
+  idx = np.sort(order[first])
+  
+  if (radius > 0.0):
+    # pairs of nodes (i,j), i < j, that are within radius of each other
+    tree = spatial.cKDTree(np.column_stack((x[idx],y[idx])))
+    pairs = np.array(list(tree.query_pairs(radius)), dtype=np.int64)
+    
+    removed = np.zeros(len(idx), dtype=bool)
+    if (len(pairs) > 0):
+      # visit the pairs in the order of the later node, so that whether
+      # the earlier node is kept is already known
+      pairs = pairs[np.lexsort((pairs[:,0],pairs[:,1]))]
+      for i,j in pairs.tolist():
+        if (not removed[i]) and (not removed[j]):
+          removed[j] = True
+    
+    idx = idx[~removed]
+  
+  return idx
 
-def remove_duplicate_nodes(x,y,z):
+def remove_duplicate_nodes(x,y,z,tol=0.001,radius=0.0):
   # This method removes duplicate nodes by keeping the unique values of
-  # (x,y,z) coordinates. If two nodes have the same (x,y) coordinate and
-  # a different z coordinate, this algorithm will think the nodes are
-  # unique. This means (1,1,2) and (1,1,3) are two unique nodes. If 
-  # wanting to have no duplicates in the (x,y) space, must use the
-  # sister method remove_duplicate_nodes_xy below.
+  # (x,y) coordinates. If two nodes have the same (x,y) coordinate and
+  # a different z coordinate, the first of the two nodes is kept. 
+  # See unique_nodes_index() for the meaning of tol and radius.
   
   print('Removing duplicate nodes ...')
   
@@ -21,81 +62,18 @@ def remove_duplicate_nodes(x,y,z):
   y = np.around(y,decimals=3)
   z = np.around(z,decimals=3)
   
-  # this piece of code uses OrderedDict to remove duplicate nodes
-  # source "http://stackoverflow.com/questions/12698987"
-  # ###################################################################
-  tmp = OrderedDict()
-  for point in zip(x, y, z):
-    tmp.setdefault(point[:2], point)
-  
-  # in python 3 tmp.values() is a view object that needs to be 
-  # converted to a list
-  mypoints = list(tmp.values()) 
-  # ###################################################################
-  
-  n_rev = len(mypoints)
-  
-  x_new = np.zeros(n_rev)
-  y_new = np.zeros(n_rev)
-  z_new = np.zeros(n_rev)
+  idx = unique_nodes_index(x,y,tol,radius)
   
-  for i in range(len(mypoints)):
-    x_new[i] = mypoints[i][0]
-    y_new[i] = mypoints[i][1]
-    z_new[i] = mypoints[i][2]
-  
-  return x_new,y_new,z_new
+  return x[idx],y[idx],z[idx]
 
-def remove_duplicate_nodes_xy(x,y,z):
+def remove_duplicate_nodes_xy(x,y,z,tol=0.001,radius=0.0):
   # This method removes duplicate nodes by keeping the unique values of
-  # (x,y) coordinates only. The z values of the unique coordinates are
-  # assigned by performing a search using KDTree. This isn't really 
-  # all that efficient, but it works 100% (i.e., there will not be a
-  # duplicate node that has the same (x,y) coordinates.
-  print('Removing duplicate nodes ...')
-  
-  # crop all the points to three decimals only
-  x = np.around(x,decimals=3)
-  y = np.around(y,decimals=3)
-  z = np.around(z,decimals=3)
-  
-  # this piece of code uses OrderedDict to remove duplicate nodes
-  # source "http://stackoverflow.com/questions/12698987"
-  # ###################################################################
-  tmp = OrderedDict()
-  for point in zip(x, y):
-    tmp.setdefault(point[:1], point)
-  
-  # in python 3 tmp.values() is a view object that needs to be 
-  # converted to a list
-  mypoints = list(tmp.values()) 
-  # ###################################################################
-  
-  n_rev = len(mypoints)
-  
-  x_new = np.zeros(n_rev)
-  y_new = np.zeros(n_rev)
-  z_new = np.zeros(n_rev)
-  
-  for i in range(len(mypoints)):
-    x_new[i] = mypoints[i][0]
-    y_new[i] = mypoints[i][1]
-  
-  # now that we have unique x and y, we need to assign a z to each node
-  # use a cKDTree search to do this
-  source = np.column_stack((x,y))
-  tree = spatial.cKDTree(source)
-  
-  print('Assigning z values to unique nodes ...')
-  w = [Percentage(), Bar(), ETA()]
-  pbar = ProgressBar(widgets=w, maxval=n_rev).start()
-  for i in range(n_rev):
-    d,idx = tree.query( (x_new[i],y_new[i]), k = 1)
-    z_new[i] = z[idx]
-    pbar.update(i+1)
-  pbar.finish()  
-  
-  return x_new,y_new,z_new
+  # (x,y) coordinates only (i.e., there will not be a duplicate node that
+  # has the same (x,y) coordinates). The z value of each unique node is 
+  # the z of its first occurrence. This used to assign z with a KDTree 
+  # search for each unique node; it is now the same as 
+  # remove_duplicate_nodes(), and is kept for existing scripts.
+  return remove_duplicate_nodes(x,y,z,tol,radius)
 
 def adjustTriangulation(n,e,x,y,z,ikle):
   
@@ -310,257 +288,229 @@ def ptInTriangle(pt, tri):
 
 
 # identical to my fortran code idwm.f90
-# takes as input an xyz array, and a coordinate x,y, and outputs the 
-# z values of the input coordinate using my idwm algorithm.
-def idwm(elev,x,y):
-
-  # define some presets
-  # set min_prev vars to large numbers
-  min1cur = 99999.9
-  min2cur = 99999.9
-  min3cur = 99999.9
-  min4cur = 99999.9
-  
-  min1pre = 99999.9
-  min2pre = 99999.9
-  min3pre = 99999.9
-  min4pre = 99999.9
-  
-  # initialize min_loc
-  min1loc = -1
-  min2loc = -1
-  min3loc = -1
-  min4loc = -1
-  
-  # finds min and max of the elev data
-  # print(np.amin(elev[2,:]), np.amax(elev[2,:]))
+# takes as input an xyz array, and the coordinates x,y of one or many 
+# points, and outputs the z values at the input coordinates using my idwm
+# algorithm. The idwm algorithm finds the closest elev point in each of 
+# the four quadrants around (x,y), and uses them in an inverse distance 
+# weighting. Only elev points closer than 99999.9 are considered.
+#
+# The closest points in each quadrant are found for all (x,y) at once 
+# using a cKDTree of the elev points; the search is expanded (doubling the
+# number of neighbours) only for points whose quadrants have not yet been 
+# resolved. The results are identical to the original loop over all of
+# the elev points (which found, for each quadrant, the first elev point 
+# with the smallest distance).
+#
+# x and y can be scalars (a scalar is returned), or arrays; a cKDTree of
+# elev[0,:], elev[1,:] can be passed in tree to avoid building it again.
+def idwm(elev,x,y,tree=None,chunk=10000,max_neigh=1024):
+
+  # points further than this are never used
+  far = 99999.9
+
+  scalar = (np.ndim(x) == 0)
+  x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+  y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+
+  ex = elev[0,:]
+  ey = elev[1,:]
+  ez = elev[2,:]
 
   # number of points in the elev data
-  n = len(elev[0,:])
+  n = len(ex)
+
+  if tree is None:
+    tree = spatial.cKDTree(np.column_stack((ex,ey)))
+
+  # the distance and location of the closest point in each quadrant; if a
+  # quadrant has no point, its distance is far and its location is -1
+  mincur = np.zeros((len(x),4)) + far
+  minloc = np.zeros((len(x),4), dtype=np.int64) - 1
+
+  # the corners of the bounding box of the elev data that are farthest 
+  # from (x,y) in each quadrant; once the search radius reaches a corner,
+  # every point in that quadrant has been searched
+  xmin = np.amin(ex)
+  xmax = np.amax(ex)
+  ymin = np.amin(ey)
+  ymax = np.amax(ey)
+  corner_x = [xmax, xmin, xmin, xmax]
+  corner_y = [ymax, ymax, ymin, ymin]
+
+  # points whose quadrants are not yet resolved
+  pending = np.arange(len(x))
+  k = min(16, n)
+
+  while (len(pending) > 0):
+    done = np.zeros(len(pending), dtype=bool)
+
+    for s in range(0, len(pending), chunk):
+      p = pending[s:s+chunk]
+      m = len(p)
+      px = x[p][:,None]
+      py = y[p][:,None]
+
+      d,idx = tree.query(np.column_stack((x[p],y[p])), k=k,
+        distance_upper_bound=far * (1.0 + 1.0E-9))
+      d = np.reshape(d, (m,k))
+      idx = np.reshape(idx, (m,k))
+
+      # neighbours beyond the upper bound are returned with d = inf
+      valid = np.isfinite(d)
+      idx = np.where(valid, idx, 0)
+
+      # the distances are computed exactly as in the original algorithm
+      xi = ex[idx]
+      yi = ey[idx]
+      dist = np.sqrt(np.power(xi - px,2.0) + np.power(yi - py,2.0))
+      valid = valid & (dist < far)
+
+      # the search radius of each point; all points within it were found
+      radius = d[:,-1]
+      exhausted = (k >= n) | ~np.isfinite(radius)
+
+      quad = [(xi >= px) & (yi >= py), (xi < px) & (yi >= py),
+        (xi < px) & (yi < py), (xi > px) & (yi < py)]
+
+      complete = np.ones(m, dtype=bool)
+      for q in range(4):
+        inq = quad[q] & valid
+        dq = np.where(inq, dist, np.inf)
+        dmin = np.amin(dq, axis=1)
+        found = np.isfinite(dmin)
+
+        # of the points with the same distance, the one with the smallest
+        # index is used (as in the original loop)
+        loc = np.amin(np.where(inq & (dq == dmin[:,None]), idx, n), axis=1)
+
+        # distance from (x,y) to the farthest corner of the quadrant
+        dcorner = np.sqrt(np.power(corner_x[q] - x[p],2.0) + 
+          np.power(corner_y[q] - y[p],2.0))
+
+        # the quadrant is resolved if all points were searched, if the
+        # closest point found is inside the search radius (ties at the 
+        # search radius may not all have been returned yet), or if the 
+        # search radius covers the whole quadrant
+        complete = complete & (exhausted | 
+          (found & (dmin * (1.0 + 1.0E-9) < radius)) | 
+          (dcorner * (1.0 + 1.0E-9) < radius))
+
+        mincur[p,q] = np.where(found, dmin, far)
+        minloc[p,q] = np.where(found, loc, -1)
+
+      done[s:s+m] = complete
+
+    pending = pending[~done]
+
+    if (k >= min(max_neigh, n)):
+      break
+    k = min(2*k, n)
+
+  # points that are still not resolved (i.e., a quadrant is empty, but 
+  # the data extends far in that direction) are searched one at a time 
+  # against all of the elev points
+  for i in pending:
+    dist = np.sqrt(np.power(ex - x[i],2.0) + np.power(ey - y[i],2.0))
+
+    quad = [(ex >= x[i]) & (ey >= y[i]), (ex < x[i]) & (ey >= y[i]),
+      (ex < x[i]) & (ey < y[i]), (ex > x[i]) & (ey < y[i])]
+
+    for q in range(4):
+      dq = np.where(quad[q] & (dist < far), dist, np.inf)
+
+      # argmin returns the first occurrence of the minimum
+      loc = np.argmin(dq)
+      if np.isfinite(dq[loc]):
+        mincur[i,q] = dq[loc]
+        minloc[i,q] = loc
+      else:
+        mincur[i,q] = far
+        minloc[i,q] = -1
 
-  dist = np.zeros(n)
-  xdist = np.subtract(elev[0,:],x)
-  ydist = np.subtract(elev[1,:],y)
-  
-  dist = np.sqrt(np.power(xdist,2.0) + np.power(ydist,2.0))
-  
-  # this is the loop that is really computationally expensive
-  for i in range(n):
-    # quadrant 1
-    if (elev[0,i] >= x and elev[1,i] >= y):
-      if (dist[i] < min1pre):
-        min1cur = dist[i]
-        min1loc = i
-    
-    # quadrant 2
-    if (elev[0,i] < x and elev[1,i] >= y):
-      if (dist[i] < min2pre):
-        min2cur = dist[i]
-        min2loc = i
-    
-    # quadrant 3
-    if (elev[0,i] < x and elev[1,i] < y):
-      if (dist[i] < min3pre):
-        min3cur = dist[i]
-        min3loc = i
-    
-    # quadrant 4
-    if (elev[0,i] > x and elev[1,i] < y):
-      if (dist[i] < min4pre):
-        min4cur = dist[i]
-        min4loc = i
-        
-    min1pre = min1cur
-    min2pre = min2cur
-    min3pre = min3cur
-    min4pre = min4cur
-  
   # to fix the division by zero error (if the point (x,y) is exactly
-  # on a node of elev array  
-  if (min1cur < 1.0E-6):
-    min1cur = 1.0E-6
-
-  if (min2cur < 1.0E-6):
-    min2cur = 1.0E-6
-    
-  if (min3cur < 1.0E-6):
-    min3cur = 1.0E-6
-    
-  if (min4cur < 1.0E-6):
-    min4cur = 1.0E-6    
+  # on a node of elev array
+  mincur = np.maximum(mincur, 1.0E-6)
 
   # calculate the weights
-  den = (1.0/(min1cur**2)) +(1.0/(min2cur**2)) +(1.0/(min3cur**2)) +\
-    (1.0/(min4cur**2))
-  
-  #print('distances')
-  #print(min1cur,min2cur,min3cur,min4cur)
-  
-  #print('Den ' + str(den))  
-    
-  # to calculate the weights
-  w1 = (1.0/(min1cur**2))/den
-  w2 = (1.0/(min2cur**2))/den
-  w3 = (1.0/(min3cur**2))/den
-  w4 = (1.0/(min4cur**2))/den  
-  
-  #print('weights')
-  #print(w1,w2,w3,w4)
-  
-  #print('elevations')
-  #print(elev[2,min1loc], elev[2,min2loc], elev[2,min3loc], elev[2,min4loc])
-  
-  #print('distances')
-  #print(min1cur,min2cur,min3cur,min4cur)
-  
-  #print('minxloc')
-  #print(min1loc,min2loc,min3loc,min4loc)
-  
-  # if minxloc is negative, I don't want to let python use the last
-  # item in the array in the calculation (which is what it would do)
-  
-  if min1loc < 0:
-    tmp1 = 0.0
-  else:
-    tmp1 = elev[2,min1loc]
-    
-  if min2loc < 0:
-    tmp2 = 0.0
-  else:
-    tmp2 = elev[2,min2loc]
-    
-  if min3loc < 0:
-    tmp3 = 0.0
-  else:
-    tmp3 = elev[2,min3loc]
+  den = (1.0/(mincur[:,0]**2)) +(1.0/(mincur[:,1]**2)) +\
+    (1.0/(mincur[:,2]**2)) + (1.0/(mincur[:,3]**2))
 
-  if min4loc < 0:
-    tmp4 = 0.0
-  else:
-    tmp4 = elev[2,min4loc]
+  z = np.zeros(len(x))
+  for q in range(4):
+    w = (1.0/(mincur[:,q]**2))/den
+
+    # if minloc is negative, I don't want to let python use the last
+    # item in the array in the calculation (which is what it would do)
+    tmp = np.where(minloc[:,q] < 0, 0.0, ez[np.maximum(minloc[:,q],0)])
+
+    z = z + w*tmp
+
+  if scalar:
+    return z[0]
 
-  z = w1*tmp1+w2*tmp2+ w3*tmp3+w4*tmp4
-    
   return z
    
 # this works for python 2 and 3
 def CCW(x1,y1,x2,y2,x3,y3):
    return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)
 
-# this method takes in an adcirc file, and returns the IPOBO and IKLE arrays
-# and also generates temp.cli file for use in Telemac
-# this version uses the output from bnd_extr_stbtel.f90 Fortran program
+# returns the contents of a telemac boundary conditions file (*.cli) for
+# the boundary nodes nbor (zero based), with all of the nodes set as solid
+# boundaries
+def getCli(nbor):
+  cli_base = '2 2 2 0.000 0.000 0.000 0.000 2 0.000 0.000 0.000 '
+  lines = [cli_base + str(nbor[i]+1) + ' ' + str(i+1) + '\n' 
+    for i in range(len(nbor))]
+  return ''.join(lines)
+
+# this method takes in an adcirc file, and returns the IPOBO and IKLE arrays,
+# as well as the contents of the *.cli file for use in Telemac (which the
+# calling script writes to the *.cli file); nothing is written to the
+# working directory, so many scripts can run in the same directory at once
 
 # note that this function returns the ikle and the ipobo arrays that are
 # one based, as this is what telemac needs
 
 def getIPOBO_IKLE(adcirc_file):
-  
-  try:
-    # this only works when the paths are sourced!
-    pputils_path = os.environ['PPUTILS']
-  except:
-    pputils_path = os.getcwd()
 
   # reads the adcirc file (note the ikle here is zero based)
   n,e,x,y,z,ikle = readAdcirc(adcirc_file)
   
-  # #######################
-  # make sure the elements are oriented in CCW fashion
-  # go through each element, and make sure it is oriented in CCW fashion
-  for i in range(len(ikle)):
-    
-    # if the element is not CCW then must change its orientation
-    if not CCW( x[ikle[i,0]], y[ikle[i,0]], x[ikle[i,1]], y[ikle[i,1]], 
-      x[ikle[i,2]], y[ikle[i,2]] ):
-    
-      t0 = ikle[i,0]
-      t1 = ikle[i,1]
-      t2 = ikle[i,2]
-      
-      # switch orientation
-      ikle[i,0] = t2
-      ikle[i,2] = t0
-  # #######################
-
-  # the above returns ikle that is zero based, but
-  # telemac will need them to be one-based; conversion is done below
-  ikle[:,0] = ikle[:,0] + 1
-  ikle[:,1] = ikle[:,1] + 1
-  ikle[:,2] = ikle[:,2] + 1
+  # make sure the elements are oriented in CCW fashion; the elements that
+  # are not CCW have their first and last nodes switched
+  mesh = Mesh(x,y,ikle).getOriented()
+  ikle = mesh.ikle
   
-  # temporary ipobo.txt (this is the output from the bnd_extr_stbtel.f90)
-  temp_ipobo = 'ipobo.txt'
+  # the boundary nodes, ordered as telemac needs them
+  nbor, loops = mesh.getBoundary()
   
-  # now we are ready to generate the ppIPOB array by running a pre-compiled
-  # binary of bnd_extr_stbtel.f90
+  # the *.cli file
+  cli = getCli(nbor)
   
-  # to determine if the system is 32 or 64 bit
-  archtype = struct.calcsize('P') * 8
-
-  # gets the current directory
-  curdir = os.getcwd()
-
-  ########################################################################
-  if (os.name == 'posix'):
-    # to determine processor type
-    proctype = os.uname()[4][:]
-    
-    if (proctype == 'i686'):
-      callstr = pputils_path + '/boundary/bin/bnd_extr_stbtel_32'
-    elif (proctype == 'x86_64'):
-      callstr = pputils_path + '/boundary/bin/bnd_extr_stbtel_64'
-    elif (proctype == 'armv7l'):
-      callstr = pputils_path + '/boundary/bin/bnd_extr_stbtel_pi32'
-      
-    # make sure the binary is allowed to be executed
-    subprocess.call(['chmod', '+x', callstr])
-      
-    # execute the binary 
-    #print('Executing bnd_extr_stbtel program ...')
-    subprocess.call([callstr, adcirc_file, temp_ipobo])
-          
-  if (os.name == 'nt'):
-    # nt is for windows [still to update]
-    callstr = ".\\boundary\\bin\\bnd_extr_stbtel_32.exe"
-    subprocess.call([callstr, adcirc_file, temp_ipobo])
-    ########################################################################
-
-  # now we can read in the ipobo.txt file, and populate the ppIPOB variable
-  # as well as write the *.cli file
-
-  # read the ipobo.txt file as a master list
-  line = list()
-  with open('ipobo.txt', 'r') as f1:
-    for i in f1:
-      line.append(i)
-
-  # now we can write the temp.cli file
-  fcli = open('temp.cli', 'w')
-  cli_base = str('2 2 2 0.000 0.000 0.000 0.000 2 0.000 0.000 0.000 ')
-
-  # write the *.cli file
-  for i in range(len(line)):
-    fcli.write(cli_base + str(int(line[i])) + ' ' + str(i+1) + '\n')
-
-  # close the *.cli file
-  fcli.close()
-
-  # note the temp.cli gets renamed in the master script
-
-  # now store the ppIPOB array
+  # now store the ppIPOB array (the ppIPOB array is one based)
   ppIPOB = np.zeros(n, dtype=np.int32)
-
-  ipob_count = 0
-
-  # returns the ppIPOB array that is one based
-  for i in range(len(line)):
-    ipob_count = ipob_count + 1
-    ppIPOB[int(line[i])-1] = ipob_count
-
-  # now we can remove the ipobo.txt file
-  os.remove('ipobo.txt')
-  
-  return n,e,x,y,z,ikle,ppIPOB
+  ppIPOB[nbor] = np.arange(1, len(nbor)+1)
   
-
+  # the above returns ikle that is zero based, but
+  # telemac will need them to be one-based; conversion is done below
+  ikle = ikle + 1
+  
+  return n,e,x,y,z,ikle,ppIPOB,cli
+  
+
+# returns the multiprocessing context used to run work on a pool of
+# processes; the processes must be forked, as the scripts have no __main__
+# guard (and would be run again by each new process), so None is returned
+# where fork is not available (i.e., windows), in which case the work is
+# done by a single process
+def fork_context():
+  if hasattr(multiprocessing, 'get_context'):
+    try:
+      return multiprocessing.get_context('fork')
+    except ValueError:
+      return None
+  elif (os.name == 'nt'):
+    return None
+  
+  # older versions of python always fork on unix
+  return multiprocessing
@@ -2,11 +2,34 @@
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import numpy             as np             # numpy
+from xml.sax.saxutils import quoteattr     # to write the vtk xml attributes
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Functions
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
+# writes the rows of a two dimensional array to an opened file, where each
+# row is formatted using fmt (i.e., '%d %.3f %.3f %.3f'); the rows are
+# written in chunks, and each chunk is formatted with a single string
+# formatting operation, rather than one operation per value
+def writeRows(fout, fmt, data, chunk=100000):
+  line = fmt + '\n'
+  
+  for i in range(0, len(data), chunk):
+    block = data[i:i+chunk]
+    fout.write((line * len(block)) % tuple(block.ravel().tolist()))
+  
+  return None
+
+# returns an array of node numbers, x, y, z (node numbers are one based)
+def nodesArray(n,x,y,z):
+  return np.column_stack((np.arange(1, n+1), x[0:n], y[0:n], z[0:n]))
+
+# returns an array of element numbers, followed by the three node numbers
+# of each element (element and node numbers are one based)
+def elementsArray(e,ikle):
+  return np.column_stack((np.arange(1, e+1), np.asarray(ikle)[0:e,0:3] + 1))
+
 # this function assumes the indices in the ikle array are zero based
 def writeAdcirc(n,e,x,y,z,ikle,name):
   
@@ -20,16 +43,12 @@ def writeAdcirc(n,e,x,y,z,ikle,name):
   fout.write(str(e) + ' ' + str(n) + '\n')
   
   # writes the nodes
-  for i in range(n):
-    fout.write(str(i+1) + ' ' + str('{:.3f}'.format(x[i] )) + ' ' + 
-      str('{:.3f}'.format(y[i])) + ' ' + str('{:.3f}'.format(z[i])) + '\n')
+  writeRows(fout, '%d %.3f %.3f %.3f', nodesArray(n,x,y,z))
   
   # writes the elements
   # the readAdcirc function assigns the ikle starting at zero, so that is why
   # we have to add 1
-  for i in range(e):
-    fout.write(str(i+1) + ' 3 ' + str(ikle[i,0]+1) + ' ' + str(ikle[i,1]+1) + 
-      ' ' +   str(ikle[i,2]+1) + '\n')
+  writeRows(fout, '%d 3 %d %d %d', elementsArray(e,ikle))
 
   # close the fout file
   fout.close()
@@ -48,20 +67,45 @@ def write2dm(n,e,x,y,z,ikle,name):
 
   # writes the elements
   # the n,e,x,y,z,ikle are zero based, so we add 1 to make it 1 based
-  for i in range(e):
-    fout.write('E3T ' + str(i+1) + ' ' + str(ikle[i,0]+1) + ' ' + str(ikle[i,1]+1) + 
-      ' ' +   str(ikle[i,2]+1) + ' 1' + '\n')
+  writeRows(fout, 'E3T %d %d %d %d 1', elementsArray(e,ikle))
 
   # writes the nodes
-  for i in range(n):
-    fout.write('ND ' + str(i+1) + ' ' + str('{:.3f}'.format(x[i] )) + ' ' + 
-      str('{:.3f}'.format(y[i])) + ' ' + str('{:.3f}'.format(z[i])) + '\n')
+  writeRows(fout, 'ND %d %.3f %.3f %.3f', nodesArray(n,x,y,z))
 
   # close the fout file
   fout.close()
   
   return None
 
+# writes the elements and the nodes of the mesh to two *.csv files in WKT
+# (well known text) format, named after output_file (output_file_e.csv and
+# output_file_n.csv); this function assumes the indices in the ikle array
+# are zero based
+def writeWKT(n,e,x,y,z,ikle,output_file):
+  output_file_e = output_file.rsplit('.',1)[0] + '_e.csv'
+  output_file_n = output_file.rsplit('.',1)[0] + '_n.csv'
+  
+  # the elements, as closed polygons
+  ikle = np.asarray(ikle)[0:e,0:3]
+  ring = ikle[:,[0,1,2,0]]
+  data = np.column_stack((x[ring], y[ring], z[ring]))[:,[0,4,8,1,5,9,2,6,10,3,7,11]]
+  data = np.column_stack((data, np.arange(1, e+1)))
+  
+  fout = open(output_file_e, 'w')
+  fout.write('WKT,element' + '\n')
+  writeRows(fout, '"POLYGON ((%.3f %.3f %.3f, %.3f %.3f %.3f,%.3f %.3f %.3f, ' +
+    '%.3f %.3f %.3f))",%d', data)
+  fout.close()
+  
+  # the nodes, as points
+  fout = open(output_file_n, 'w')
+  fout.write('WKT,node' + '\n')
+  writeRows(fout, '"POINT (%.3f %.3f %.3f)",%d', 
+    np.column_stack((x[0:n], y[0:n], z[0:n], np.arange(1, n+1))))
+  fout.close()
+  
+  return None
+
 def writeVTKscalar(n,e,x,y,z,ikle,fname,vname):
   # write the file output
   # fname argument is the name of the output adcirc file
@@ -78,22 +122,15 @@ def writeVTKscalar(n,e,x,y,z,ikle,fname,vname):
   fout.write('POINTS ' + str(len(x)) + ' float' + '\n')
   
   # to write the node coordinates
-  for i in range(len(x)):
-    fout.write(str('{:.3f}'.format(x[i])) + ' ' + 
-      str('{:.3f}'.format(y[i])) + ' ' + str('{:.3f}'.format(0.0)) + 
-      '\n')
+  writeRows(fout, '%.3f %.3f 0.000', np.column_stack((x,y)))
       
   # to write the node connectivity table
   fout.write('CELLS ' + str(len(ikle)) + ' ' + str(len(ikle)*4) + '\n')
-  
-  for i in range(len(ikle)):
-    fout.write('3 ' + str(ikle[i][0]) + ' ' + str(ikle[i][1]) + ' ' + 
-      str(ikle[i][2]) + '\n')
+  writeRows(fout, '3 %d %d %d', np.asarray(ikle)[:,0:3])
       
   # to write the cell types
   fout.write('CELL_TYPES ' + str(len(ikle)) + '\n')
-  for i in range(len(ikle)):
-    fout.write('5' + '\n')
+  fout.write('5\n' * len(ikle))
     
   # write the empty line
   fout.write('' + '\n')
@@ -105,10 +142,113 @@ def writeVTKscalar(n,e,x,y,z,ikle,fname,vname):
   fout.write('SCALARS ' + vname + '\n')
   fout.write('float' + '\n')
   fout.write('LOOKUP_TABLE default' + '\n')
-  for i in range(len(x)):
-    fout.write(str('{:.3f}'.format(z[i])) + '\n')
+  writeRows(fout, '%.3f', np.asarray(z).reshape(-1,1))
+
+  fout.close()
+  
+  return None
+
+# VTK XML names of the numpy data types written by writeVTU()
+vtu_types = {'f4' : 'Float32', 'f8' : 'Float64', 'i4' : 'Int32', 
+  'i8' : 'Int64', 'u1' : 'UInt8'}
 
+# returns the connectivity, offsets and types arrays of the cells of an
+# unstructured grid in the VTK XML format, for the cells ikle (zero based,
+# one cell per row) that are all of the VTK cell_type (5 for triangles, 13
+# for wedges); these are made once, and passed to writeVTU() for each file
+def vtuCells(ikle, cell_type):
+  ikle = np.asarray(ikle)
+  e = ikle.shape[0]
+  k = ikle.shape[1]
+  
+  # 32 bit integers are used, unless the mesh is too large for them
+  itype = '<i4' if (e*k < 2**31) else '<i8'
+  
+  connectivity = np.ascontiguousarray(ikle, dtype=itype).ravel()
+  offsets = np.arange(1, e+1, dtype=itype) * k
+  types = np.zeros(e, dtype='u1') + cell_type
+  
+  return connectivity, offsets, types
+
+# writes an unstructured grid to a VTK XML file (*.vtu), where all of the
+# arrays are written from their numpy buffers into a single block of raw 
+# appended (little endian) binary data; points is an (n,3) array, cells
+# are from vtuCells(), and point_data is a list of (name, array) pairs,
+# where each array has shape (n,) for a scalar or (n,3) for a vector. The
+# arrays are written in the precision they have (i.e., float32 results
+# of a single precision *.slf file are written as Float32).
+def writeVTU(fname, points, cells, point_data):
+  connectivity, offsets, types = cells
+  
+  # the arrays in the order they are in the appended data
+  arrays = list()
+  for name, values in point_data:
+    values = np.asarray(values)
+    if (values.dtype.kind != 'f'):
+      values = values.astype(np.float64)
+    arrays.append(values.astype(values.dtype.newbyteorder('<'), copy=False))
+  arrays.append(np.asarray(points, dtype='<f8'))
+  arrays.extend([connectivity, offsets, types])
+  
+  # offset of each array in the appended data (each array is preceded by
+  # its size in bytes, as a UInt64)
+  pos = np.cumsum([0] + [8 + a.nbytes for a in arrays])
+  
+  def dataArray(i, name=None):
+    a = arrays[i]
+    s = '<DataArray type="' + vtu_types[a.dtype.str[1:]] + '"'
+    if name is not None:
+      s = s + ' Name=' + quoteattr(name)
+    if (a.ndim > 1):
+      s = s + ' NumberOfComponents="' + str(a.shape[1]) + '"'
+    return s + ' format="appended" offset="' + str(pos[i]) + '"/>\n'
+  
+  n = len(arrays[len(point_data)])
+  e = len(types)
+  
+  header = '<?xml version="1.0"?>\n'
+  header = header + '<VTKFile type="UnstructuredGrid" version="1.0" ' + \
+    'byte_order="LittleEndian" header_type="UInt64">\n'
+  header = header + '<UnstructuredGrid>\n'
+  header = header + '<Piece NumberOfPoints="' + str(n) + \
+    '" NumberOfCells="' + str(e) + '">\n'
+  header = header + '<PointData>\n'
+  for i in range(len(point_data)):
+    header = header + dataArray(i, point_data[i][0])
+  header = header + '</PointData>\n'
+  header = header + '<Points>\n' + dataArray(len(point_data)) + '</Points>\n'
+  header = header + '<Cells>\n'
+  header = header + dataArray(len(point_data)+1, 'connectivity')
+  header = header + dataArray(len(point_data)+2, 'offsets')
+  header = header + dataArray(len(point_data)+3, 'types')
+  header = header + '</Cells>\n'
+  header = header + '</Piece>\n'
+  header = header + '</UnstructuredGrid>\n'
+  header = header + '<AppendedData encoding="raw">\n_'
+  
+  fout = open(fname, 'wb')
+  fout.write(header.encode())
+  for a in arrays:
+    fout.write(np.uint64(a.nbytes).astype('<u8').tobytes())
+    fout.write(np.ascontiguousarray(a).tobytes())
+  fout.write('\n</AppendedData>\n</VTKFile>\n'.encode())
   fout.close()
   
   return None
 
+# writes a ParaView collection file (*.pvd), that lists the *.vtu files 
+# (fnames) of each of the times of a time series
+def writePVD(fname, fnames, times):
+  fout = open(fname, 'w')
+  fout.write('<?xml version="1.0"?>\n')
+  fout.write('<VTKFile type="Collection" version="0.1" ' + 
+    'byte_order="LittleEndian">\n')
+  fout.write('<Collection>\n')
+  for i in range(len(fnames)):
+    fout.write('<DataSet timestep="' + repr(float(times[i])) + 
+      '" group="" part="0" file=' + quoteattr(fnames[i]) + '/>\n')
+  fout.write('</Collection>\n')
+  fout.write('</VTKFile>\n')
+  fout.close()
+  
+  return None
@@ -1545,59 +1545,63 @@ class Writer(object):
         if not self.fields[0][0].startswith("Deletion"):
             f.write(b' ') # deletion flag
         for (fieldName, fieldType, size, deci), value in zip(self.fields, record):
-            fieldType = fieldType.upper()
-            size = int(size)
-            if fieldType in ("N","F"):
-                # numeric or float: number stored as a string, right justified, and padded with blanks to the width of the field.
-                if value in MISSING:
-                    value = b"*"*size # QGIS NULL
-                elif not deci:
-                    # force to int
-                    try:
-                        # first try to force directly to int.
-                        # forcing a large int to float and back to int
-                        # will lose information and result in wrong nr.
-                        value = int(value) 
-                    except ValueError:
-                        # forcing directly to int failed, so was probably a float.
-                        value = int(float(value))
-                    value = format(value, "d")[:size].rjust(size) # caps the size if exceeds the field size
-                else:
-                    value = float(value)
-                    value = format(value, ".%sf"%deci)[:size].rjust(size) # caps the size if exceeds the field size
-            elif fieldType == "D":
-                # date: 8 bytes - date stored as a string in the format YYYYMMDD.
-                if isinstance(value, date):
-                    value = '{:04d}{:02d}{:02d}'.format(value.year, value.month, value.day)
-                elif isinstance(value, list) and len(value) == 3:
-                    value = '{:04d}{:02d}{:02d}'.format(*value)
-                elif value in MISSING:
-                    value = b'0' * 8 # QGIS NULL for date type
-                elif is_string(value) and len(value) == 8:
-                    pass # value is already a date string
-                else:
-                    raise ShapefileException("Date values must be either a datetime.date object, a list, a YYYYMMDD string, or a missing value.")
-            elif fieldType == 'L':
-                # logical: 1 byte - initialized to 0x20 (space) otherwise T or F.
-                if value in MISSING:
-                    value = b' ' # missing is set to space
-                elif value in [True,1]:
-                    value = b'T'
-                elif value in [False,0]:
-                    value = b'F'
-                else:
-                    value = b' ' # unknown is set to space
+            f.write(self.__dbfValue(fieldName, fieldType, size, deci, value))
+
+    def __dbfValue(self, fieldName, fieldType, size, deci, value):
+        """Formats a single dbf value as bytes of the size of the field."""
+        fieldType = fieldType.upper()
+        size = int(size)
+        if fieldType in ("N","F"):
+            # numeric or float: number stored as a string, right justified, and padded with blanks to the width of the field.
+            if value in MISSING:
+                value = b"*"*size # QGIS NULL
+            elif not deci:
+                # force to int
+                try:
+                    # first try to force directly to int.
+                    # forcing a large int to float and back to int
+                    # will lose information and result in wrong nr.
+                    value = int(value) 
+                except ValueError:
+                    # forcing directly to int failed, so was probably a float.
+                    value = int(float(value))
+                value = format(value, "d")[:size].rjust(size) # caps the size if exceeds the field size
+            else:
+                value = float(value)
+                value = format(value, ".%sf"%deci)[:size].rjust(size) # caps the size if exceeds the field size
+        elif fieldType == "D":
+            # date: 8 bytes - date stored as a string in the format YYYYMMDD.
+            if isinstance(value, date):
+                value = '{:04d}{:02d}{:02d}'.format(value.year, value.month, value.day)
+            elif isinstance(value, list) and len(value) == 3:
+                value = '{:04d}{:02d}{:02d}'.format(*value)
+            elif value in MISSING:
+                value = b'0' * 8 # QGIS NULL for date type
+            elif is_string(value) and len(value) == 8:
+                pass # value is already a date string
             else:
-                # anything else is forced to string, truncated to the length of the field
-                value = b(value, self.encoding, self.encodingErrors)[:size].ljust(size)
-            if not isinstance(value, bytes):
-                # just in case some of the numeric format() and date strftime() results are still in unicode (Python 3 only)
-                value = b(value, 'ascii', self.encodingErrors) # should be default ascii encoding
-            if len(value) != size:
-                raise ShapefileException(
-                    "Shapefile Writer unable to pack incorrect sized value"
-                    " (size %d) into field '%s' (size %d)." % (len(value), fieldName, size))
-            f.write(value)
+                raise ShapefileException("Date values must be either a datetime.date object, a list, a YYYYMMDD string, or a missing value.")
+        elif fieldType == 'L':
+            # logical: 1 byte - initialized to 0x20 (space) otherwise T or F.
+            if value in MISSING:
+                value = b' ' # missing is set to space
+            elif value in [True,1]:
+                value = b'T'
+            elif value in [False,0]:
+                value = b'F'
+            else:
+                value = b' ' # unknown is set to space
+        else:
+            # anything else is forced to string, truncated to the length of the field
+            value = b(value, self.encoding, self.encodingErrors)[:size].ljust(size)
+        if not isinstance(value, bytes):
+            # just in case some of the numeric format() and date strftime() results are still in unicode (Python 3 only)
+            value = b(value, 'ascii', self.encodingErrors) # should be default ascii encoding
+        if len(value) != size:
+            raise ShapefileException(
+                "Shapefile Writer unable to pack incorrect sized value"
+                " (size %d) into field '%s' (size %d)." % (len(value), fieldName, size))
+        return value
 
     def balance(self):
         """Adds corresponding empty attributes or null geometry records depending
@@ -1759,6 +1763,216 @@ class Writer(object):
         # write the shape
         self.shape(polyShape)
 
+    def shapeArrays(self, x, y, z=None, m=None, connectivity=None, offsets=None):
+        """Writes many shapes at once, of the shapeType of the shapefile, from
+        arrays of the coordinates of the vertices. The result is the same as
+        calling point(), line(), poly(), etc once for each shape (with a
+        single part per shape), but the shp and shx records are packed with
+        numpy structured arrays, and are written in large blocks.
+        For POINT, POINTM and POINTZ shapefiles, each vertex is a shape.
+        For the other types, the vertices of shape i are either the row i of
+        connectivity (an array of indices into the coordinate arrays, with one
+        row per shape, such as the elements of a mesh), or the vertices
+        offsets[i] to offsets[i+1]-1 (offsets has one more item than there are
+        shapes). If neither is given, all of the vertices are a single shape.
+        Polygon rings are written as given, and are not closed.
+        If z (elevation) is not given, it defaults to 0.
+        If m (measure) is not given, it defaults to NoData."""
+        import numpy as np
+        shapeType = self.shapeType
+        if shapeType in (None, NULL, MULTIPATCH):
+            raise ShapefileException("shapeArrays() can not write shapes of type %s." % shapeType)
+        # Balance if already not balanced
+        if self.autoBalance and self.recNum < self.shpNum:
+            self.balance()
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if z is None:
+            z = np.zeros(len(x))
+        if m is None:
+            m = np.zeros(len(x)) + NODATA
+        z = np.asarray(z, dtype=np.float64).ravel()
+        m = np.asarray(m, dtype=np.float64).ravel()
+        single = shapeType in (1,11,21)
+        hasParts = shapeType in (3,5,13,15,23,25)
+        hasZ = shapeType in (11,13,15,18)
+        hasM = shapeType in (11,13,15,18,21,23,25,28)
+        # The vertices of all shapes, and where each shape starts
+        if single:
+            vertices = np.arange(len(x))
+            starts = np.arange(len(x) + 1)
+        elif connectivity is not None:
+            connectivity = np.asarray(connectivity, dtype=np.int64)
+            vertices = connectivity.ravel()
+            starts = np.arange(connectivity.shape[0] + 1) * connectivity.shape[1]
+        elif offsets is not None:
+            vertices = np.arange(len(x))
+            starts = np.asarray(offsets, dtype=np.int64)
+        else:
+            vertices = np.arange(len(x))
+            starts = np.array([0, len(x)])
+        counts = np.diff(starts)
+        if np.any(counts < 1):
+            raise ShapefileException("Shapes must have at least one point.")
+
+        def recordDtype(k):
+            """The layout of a shp record with k points (as in __shpRecord())."""
+            fields = [('num', '>i4'), ('length', '>i4'), ('type', '<i4')]
+            if single:
+                fields.append(('xy', '<f8', (2,)))
+                if hasZ:
+                    fields.append(('z', '<f8'))
+                if hasM:
+                    fields.append(('m', '<f8'))
+                return np.dtype(fields)
+            fields.append(('bbox', '<f8', (4,)))
+            if hasParts:
+                fields.append(('nparts', '<i4'))
+            fields.append(('npoints', '<i4'))
+            if hasParts:
+                fields.append(('parts', '<i4'))
+            fields.append(('xy', '<f8', (k,2)))
+            if hasZ:
+                fields.extend([('zbox', '<f8', (2,)), ('z', '<f8', (k,))])
+            if hasM:
+                fields.extend([('mbox', '<f8', (2,)), ('m', '<f8', (k,))])
+            return np.dtype(fields)
+
+        shp = self.__getFileObj(self.shp)
+        shx = self.__getFileObj(self.shx)
+        # The shapes are written a block at a time, to limit the memory used
+        chunk = 100000
+        for s in range(0, len(counts), chunk):
+            n = len(counts[s:s+chunk])
+            # Shapes with the same number of points have the same record layout
+            groups = []
+            sizes = np.zeros(n, dtype=np.int64)
+            for k in np.unique(counts[s:s+chunk]):
+                sel = np.nonzero(counts[s:s+chunk] == k)[0]
+                idx = vertices[starts[s + sel][:,None] + np.arange(k)]
+                dt = recordDtype(k)
+                rec = np.zeros(len(sel), dtype=dt)
+                rec['num'] = self.shpNum + 1 + sel
+                rec['length'] = (dt.itemsize - 8) // 2
+                rec['type'] = shapeType
+                px = x[idx]
+                py = y[idx]
+                pz = z[idx]
+                pm = m[idx]
+                boxes = [np.amin(px, axis=1), np.amin(py, axis=1),
+                         np.amax(px, axis=1), np.amax(py, axis=1)]
+                zbox = [np.amin(pz, axis=1), np.amax(pz, axis=1)]
+                mbox = [np.amin(pm, axis=1), np.amax(pm, axis=1)]
+                if single:
+                    rec['xy'] = np.column_stack((px[:,0], py[:,0]))
+                    if hasZ:
+                        rec['z'] = pz[:,0]
+                    if hasM:
+                        rec['m'] = pm[:,0]
+                else:
+                    rec['bbox'] = np.column_stack(boxes)
+                    if hasParts:
+                        rec['nparts'] = 1
+                        rec['parts'] = 0
+                    rec['npoints'] = k
+                    rec['xy'] = np.stack((px, py), axis=2)
+                    if hasZ:
+                        rec['zbox'] = np.column_stack(zbox)
+                        rec['z'] = pz
+                    if hasM:
+                        rec['mbox'] = np.column_stack(mbox)
+                        rec['m'] = pm
+                # Update the boxes of the whole shapefile
+                bbox = [float(np.amin(boxes[0])), float(np.amin(boxes[1])),
+                        float(np.amax(boxes[2])), float(np.amax(boxes[3]))]
+                if self._bbox:
+                    bbox = [min(bbox[0],self._bbox[0]), min(bbox[1],self._bbox[1]), max(bbox[2],self._bbox[2]), max(bbox[3],self._bbox[3])]
+                self._bbox = bbox
+                if hasZ:
+                    zbox = [float(np.amin(zbox[0])), float(np.amax(zbox[1]))]
+                    if self._zbox:
+                        zbox = [min(zbox[0],self._zbox[0]), max(zbox[1],self._zbox[1])]
+                    self._zbox = zbox
+                if hasM:
+                    mbox = [float(np.amin(mbox[0])), float(np.amax(mbox[1]))]
+                    if self._mbox:
+                        mbox = [min(mbox[0],self._mbox[0]), max(mbox[1],self._mbox[1])]
+                    self._mbox = mbox
+                sizes[sel] = dt.itemsize
+                groups.append((sel, rec))
+            # Record offsets in the shp file
+            pos = np.concatenate(([0], np.cumsum(sizes)))
+            if len(groups) == 1:
+                data = groups[0][1].tobytes()
+            else:
+                buf = np.zeros(pos[-1], dtype=np.uint8)
+                for sel, rec in groups:
+                    size = rec.dtype.itemsize
+                    buf[pos[sel][:,None] + np.arange(size)] = rec.view(np.uint8).reshape(len(sel), size)
+                data = buf.tobytes()
+            index = np.zeros(n, dtype=[('offset', '>i4'), ('length', '>i4')])
+            index['offset'] = (shp.tell() + pos[:-1]) // 2
+            index['length'] = (sizes - 8) // 2
+            shp.write(data)
+            shx.write(index.tobytes())
+            self.shpNum += n
+
+    def recordArrays(self, *columnList, **columnDict):
+        """Writes many dbf attribute records at once, from an array of values
+        for each field. The arrays are given either in the order of the
+        fields, or as keyword arguments of field names and arrays (fields
+        that are not given are left blank). The values are formatted the same
+        way as in record(), but numeric arrays for N and F fields, and string
+        or integer arrays for C fields, are formatted with numpy, and the
+        records are written in large blocks."""
+        import numpy as np
+        # Balance if already not balanced
+        if self.autoBalance and self.recNum > self.shpNum:
+            self.balance()
+        f = self.__getFileObj(self.dbf)
+        if self.recNum == 0:
+            # writing the header also removes the deletion flag field
+            self.__dbfHeader()
+        if columnList:
+            columns = list(columnList[:len(self.fields)])
+        else:
+            columns = [columnDict.get(field[0]) for field in self.fields]
+        sizes = [len(column) for column in columns if column is not None]
+        if not sizes:
+            raise ShapefileException("recordArrays() needs at least one array of values.")
+        n = sizes[0]
+        dt = np.dtype([('deletion', 'S1')] + [('f%s' % i, 'S%s' % int(field[2])) for i, field in enumerate(self.fields)])
+        # The records are written a block at a time, to limit the memory used
+        chunk = 100000
+        for s in range(0, n, chunk):
+            rec = np.zeros(min(chunk, n - s), dtype=dt)
+            rec['deletion'] = b' '
+            for i, (fieldName, fieldType, size, deci) in enumerate(self.fields):
+                fieldType = fieldType.upper()
+                size = int(size)
+                column = columns[i] if i < len(columns) else None
+                if column is None:
+                    # missing values
+                    rec['f%s' % i] = self.__dbfValue(fieldName, fieldType, size, deci, None)
+                    continue
+                values = np.asarray(column[s:s+chunk])
+                if fieldType in ("N","F") and values.dtype.kind in 'iuf':
+                    fmt = "%d" if not deci else "%%.%sf" % deci
+                    values = np.char.mod(fmt, values).astype('S').astype('S%s' % size)
+                    values = np.char.rjust(values, size)
+                elif fieldType not in ("N","F","D","L") and values.dtype.kind in 'iuSU':
+                    if values.dtype.kind in 'iu':
+                        values = values.astype('U')
+                    if values.dtype.kind == 'U':
+                        values = np.char.encode(values, self.encoding, self.encodingErrors)
+                    values = np.char.ljust(values.astype('S%s' % size), size)
+                else:
+                    # anything else is formatted one value at a time
+                    values = [self.__dbfValue(fieldName, fieldType, size, deci, value) for value in column[s:s+chunk]]
+                rec['f%s' % i] = values
+            f.write(rec.tobytes())
+            self.recNum += len(rec)
+
     def field(self, name, fieldType="C", size="50", decimal=0):
         """Adds a dbf field descriptor to the shapefile."""
         if fieldType == "D":
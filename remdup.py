@@ -16,6 +16,13 @@
 # Purpose: Script takes in a *.csv of the nodes, and removes duplicates
 # using OrderedDict from collections.
 #
+# Revised: Oct 18, 2026
+# Duplicates are now found by sorting integer (millimetre) keys of the 
+# coordinates, using unique_nodes_index() from ppmodules/utilities.py,
+# rather than with an OrderedDict. The first occurrence of each node is 
+# kept, as before. Added optional arguments for the tolerance, and for a 
+# radius within which near duplicates are removed.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -24,28 +31,48 @@
 # where:
 # -i input nodes file
 # -o output nodes file where duplicates are removed
+#
+# Optional arguments (appended after -o):
+# -t tolerance of the duplicate test (default 0.001)
+# -r nodes within this radius of an earlier node are removed (default 0)
+#
+# python remdup.py -i nodes.csv -o nodes_remdup.csv -t 0.01 -r 0.5
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys
 import numpy as np
-from collections import OrderedDict
+from ppmodules.utilities import *          # unique_nodes_index()
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~	
 # I/O
-if len(sys.argv) != 5 :
+if ((len(sys.argv) < 5) or (len(sys.argv) % 2 == 0)):
 	print('Wrong number of Arguments, stopping now...')
 	print('Usage:')
 	print('python remdup.py -i nodes.csv -o nodes_remdup.csv')
+	print('Optional: -t tolerance -r radius')
 	sys.exit()
 dummy1 =  sys.argv[1]
 input_file = sys.argv[2]
 dummy2 =  sys.argv[3]
 output_file = sys.argv[4]
 
+# optional arguments
+tol = 0.001 # tolerance of the duplicate test
+radius = 0.0 # radius within which near duplicates are removed
+
+for i in range(5, len(sys.argv), 2):
+	if (sys.argv[i] == '-t'):
+		tol = float(sys.argv[i+1])
+	elif (sys.argv[i] == '-r'):
+		radius = float(sys.argv[i+1])
+	else:
+		print('Unknown argument ' + sys.argv[i] + '. Exiting.')
+		sys.exit(0)
+
 # find out if the nodes file is x,y,z or x,y,x,size
 with open(input_file, 'r') as f:
   line = next(f) # read 1 line
@@ -73,21 +100,10 @@ z = np.around(z,decimals=3)
 
 n = len(x)
 
-# this piece of code uses OrderedDict to remove duplicate nodes
-# source "http://stackoverflow.com/questions/12698987"
-# ###################################################################
-tmp = OrderedDict()
-for point in zip(x, y, z, size):
-  tmp.setdefault(point[:2], point)
-
-# in python 3 tmp.values() is a view object that needs to be 
-# converted to a list
-mypoints = list(tmp.values()) 
-# ###################################################################
-
-n_rev = len(mypoints)
+# indices of the unique nodes, in the order they first occur
+idx = unique_nodes_index(x,y,tol,radius)
 
 # prints the nodes that have duplicates removed
-for i in range(n_rev):
-	fout.write(str(mypoints[i][0]) + ',' + str(mypoints[i][1]) + ',' + 
-		str("{:.3f}".format(mypoints[i][2])) + '\n')
+fout.write(''.join([str(x[i]) + ',' + str(y[i]) + ',' + 
+	str("{:.3f}".format(z[i])) + '\n' for i in idx.tolist()]))
+fout.close()
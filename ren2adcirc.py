@@ -20,6 +20,10 @@
 # adcirc via adcirc2ren.py, the coordinate shift is written there. These same 
 # coordinates must be used as input here to get the correct adcirc file.
 #
+# Revised: Oct 18, 2026
+# The elements are oriented with the Mesh class from ppmodules/mesh.py,
+# for all elements at once.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -35,15 +39,9 @@
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
 import numpy             as np             # numpy
+from ppmodules.writeMesh import *          # to get all writeMesh functions
+from ppmodules.mesh import *               # for the Mesh class
 # 
-# this is the function that returns True if the elements is oriented CCW
-#def CCW((x1,y1),(x2,y2),(x3,y3)):
-#   return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)
-
-# this works for python 2 and 3
-def CCW(x1,y1,x2,y2,x3,y3):
-   return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)	
-
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~	
@@ -71,8 +69,6 @@ elements_data = np.genfromtxt(elements_file,unpack=True)
 # print nodes_data.shape
 # print elements_data.shape
 
-fout = open(adcirc_file,"w")
-
 # nodes 
 node_id = np.arange(1,len(nodes_data[1,:])+1)
 x = nodes_data[0,:] + xref
@@ -90,36 +86,9 @@ e3 = e3.astype(np.int32)
 # construct the ikle numpy array
 ikle = np.column_stack((e1,e2,e3))
 
-# go through each element, and make sure it is oriented in CCW fashion
-
-for i in range(len(ikle)):
-	
-	# if the element is not CCW then must change its orientation
-	if not CCW( x[ikle[i,0]-1], y[ikle[i,0]-1], x[ikle[i,1]-1], y[ikle[i,1]-1], 
-		x[ikle[i,2]-1], y[ikle[i,2]-1] ):
-		
-		t0 = ikle[i,0]
-		t1 = ikle[i,1]
-		t2 = ikle[i,2]
-		
-		# switch orientation
-		ikle[i,0] = t2
-		ikle[i,2] = t0
-		
-		# print('re-orienting element ' + str(i+1))
-
-# now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(len(e1)) + " " + str(len(node_id)) + "\n")
-
-# writes the nodes
-for i in range(0,len(node_id)):
-	fout.write(str(node_id[i]) + " " + str("{:.3f}".format(x[i])) + " " + 
-		str("{:.3f}".format(y[i])) + " " + str("{:.3f}".format(z[i])) + "\n")
+# the elements that are not CCW have their first and last nodes switched
+ikle = Mesh(x,y,ikle-1).getOriented().ikle + 1
 
-# writes the elements
-for i in range(0,len(e1)):
-	fout.write(str(i+1) + " 3 " + str(ikle[i,0]) + " " + str(ikle[i,1]) + " " + 
-		str(ikle[i,2]) + "\n")	
+# now to write the adcirc mesh file (ikle here is one based)
+writeAdcirc(len(node_id),len(e1),x,y,z,ikle-1,adcirc_file)
 
@@ -19,49 +19,51 @@
 # Changed how different system architectures are called; made it run
 # for the raspberry pi system.
 #
-# Only works on Linux/Unix; TODO: make it work under windows
+# Revised: Oct 18, 2026
+# The mesh is now renumbered in python (with scipy's reverse cuthill mckee),
+# rather than by the triangulation_rcm binaries; no temporary files are
+# written, the coordinates are not shifted, and ren2adcirc.py and 
+# adcirc2wkt.py are no longer called as subprocesses. The elements can also
+# be renumbered (in order of their lowest numbered node), and the bandwidth
+# and profile of the mesh are reported before and after the renumbering.
+# Works on all operating systems.
 #
-# Uses: Python 2 or 3
+# Uses: Python 2 or 3, Numpy, Scipy
 #
 # Example:
 #
 # python renumber.py -i out.grd -o out_rcm.grd
+# or
+# python renumber.py -i out.grd -o out_rcm.grd -e yes
 # where:
 # -i input adcirc mesh file
 # -o adcirc mesh file renumbered according to Reverse-Cuthill-McKee algorithm
+# -e (optional) yes to also renumber the elements (default is no)
 #
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys                              # system parameters
-import struct                              # to determine sys architecture
+import numpy             as np             # numpy
 from ppmodules.readMesh import *           # readMesh functions
-import subprocess
+from ppmodules.writeMesh import *          # writeAdcirc() and writeWKT()
+from ppmodules.mesh import *               # for the Mesh class
+from ppmodules.renumbering import *        # reverse cuthill mckee
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~  
-curdir = os.getcwd()
-#
-try:
-  # this only works when the paths are sourced!
-  pputils_path = os.environ['PPUTILS']
-except:
-  pputils_path = curdir
-  
-  # this is to maintain legacy support
-  if (sys.version_info > (3, 0)):
-    version = 3
-    pystr = 'python3'
-  elif (sys.version_info > (2, 7)):
-    version = 2
-    pystr = 'python'
-#
 # I/O
-if len(sys.argv) != 5 :
+if len(sys.argv) == 5 :
+  renumber_elements = 'no'
+elif len(sys.argv) == 7 :
+  renumber_elements = sys.argv[6]
+else:
   print('Wrong number of Arguments, stopping now...')
   print('Usage:')
   print('python renumber.py -i out.grd -o out_rcm.grd')
+  print('or')
+  print('python renumber.py -i out.grd -o out_rcm.grd -e yes')
   sys.exit()
   
 dummy1 =  sys.argv[1]
@@ -69,93 +71,32 @@ input_file = sys.argv[2]
 dummy2 = sys.argv[3]
 output_file = sys.argv[4]
 
-# to create the temporary output files
-fn = open("out_nodes.txt","w")
-fe = open("out_elements.txt","w")
+if (renumber_elements not in ['yes', 'no']):
+  print('Value of -e must be yes or no. Exiting.')
+  sys.exit()
 
 # read the adcirc file
 n,e,x,y,z,ikle = readAdcirc(input_file)
 
-# before writing the files, find coordinates of x and y min (to subtract from)
-xref = x[np.argmin(x)] 
-yref = y[np.argmin(x)] 
-
-# write the shifted temporary output files
-for i in range(n):
-  fn.write(str(x[i]-xref) + ' ' + str(y[i]-yref) + ' ' + str(z[i]) + '\n')
-
-for i in range(e):
-  fe.write(str(ikle[i,0]) + ' ' + str(ikle[i,1]) + ' ' + str(ikle[i,2]) + '\n')
+bandwidth, profile = meshBandwidth(n,ikle)
+print('Bandwidth before renumbering: ' + str(bandwidth))
+print('Profile before renumbering: ' + str(profile))
 
-fn.close()
-fe.close()
+# renumber the mesh
+x,y,z,ikle = renumberMesh(x,y,z,ikle,elements=(renumber_elements == 'yes'))
 
-# outputs posix if on linux
-#print 'Operating system: ' + os.name
+bandwidth, profile = meshBandwidth(n,ikle)
+print('Bandwidth after renumbering: ' + str(bandwidth))
+print('Profile after renumbering: ' + str(profile))
 
-# prints whether system is 32 or 64 bit
-archtype = struct.calcsize("P") * 8
-#print 'Architecture: ' + str(archtype) + ' bit'
+# make sure the elements are oriented in CCW fashion; the elements that
+# are not CCW have their first and last nodes switched
+ikle = Mesh(x,y,ikle).getOriented().ikle
 
-if (os.name == 'posix'):
-  # determines processor type
-  # for linux32 its i686
-  # for linux64 its x86_64
-  # for raspberry pi 32 its armv7l
-  
-  proctype = os.uname()[4][:]
-  
-  # this assumes chmod +x has already been applied to the binaries
-  if (proctype == 'i686'):
-    callstr = pputils_path + '/renumber/bin/triangulation_rcm_32 out'
-  elif (proctype == 'x86_64'):
-    callstr = pputils_path + '/renumber/bin/triangulation_rcm_64 out'
-  elif (proctype == 'armv7l'):
-    callstr = pputils_path + '/renumber/bin/triangulation_rcm_pi32 out'
-  else:
-    print('OS not supported!')
-    print('Exiting!')
-    sys.exit()
-  
-  # run the binary executable (this was compiled in gfortran)
-  subprocess.call(callstr, shell=True)
-     
-  # use subprocess to call ren2adcirc.py
-  # TODO: port ren2adcirc.py code here, as opposed to calling it 
-  # as a subprocess
-  try:
-    # this only works when the paths are sourced!
-    callstr = str('ren2adcirc.py -i out_rcm_nodes.txt ' +
-      'out_rcm_elements.txt -o ' + output_file + ' -s ' +
-      str(xref) + ' ' + str(yref))
-    
-    call_list = callstr.split()
-    subprocess.call(call_list)
-  except:
-    callstr = str(pystr + ' ren2adcirc.py -i out_rcm_nodes.txt ' +
-      'out_rcm_elements.txt -o ' + output_file + ' -s ' +
-      str(xref) + ' ' + str(yref))
-
-    call_list = callstr.split()
-    subprocess.call(call_list)
-  
-  # remove the intermediate files
-  os.remove("out_nodes.txt")
-  os.remove("out_rcm_nodes.txt")
-  os.remove("out_elements.txt")
-  os.remove("out_rcm_elements.txt")
-  
-  # use subprocess to call adcirc2wkt.py
-  # strip the extension from output file string
-  wkt_file = output_file.split('.',1)[0]
+# write the renumbered adcirc file
+writeAdcirc(n,e,x,y,z,ikle,output_file)
 
-  try:
-    # this only works when the paths are sourced!
-    callstr = str('adcirc2wkt.py -i ' + output_file + ' -o ' + wkt_file + 'WKT.csv')
-    call_list = callstr.split()
-    subprocess.call(call_list)
-    
-  except:
-    callstr = str(pystr + ' adcirc2wkt.py -i ' + output_file + ' -o ' + wkt_file + 'WKT.csv')  
-    call_list = callstr.split()
-    subprocess.call(call_list)
+# write the WKT files of the renumbered mesh
+# strip the extension from output file string
+wkt_file = output_file.split('.',1)[0]
+writeWKT(n,e,x,y,z,ikle,wkt_file + 'WKT.csv')
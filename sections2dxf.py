@@ -15,6 +15,11 @@
 # The script will offset each cross section line 100 m away from each
 # other in case there are multiple cross section lines in the file.
 # 
+# Revised: Oct 18, 2026
+# The sections are streamed to the dxf file from the arrays of the lines
+# file (see dxfwrite/stream.py), rather than first made into dxfwrite
+# entity objects. Sections that have only one node are not written.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -96,28 +101,19 @@ for i in range(n_lns):
   
   #fout.write(str(shapeid_lns[i]) + ',' + str(sta[i]) + ',' + str(new_sta[i]) + '\n')
 
-# write the breaklines
-poly = dxf.polyline()
-
-for i in range(0,n_lns):
-  if (i>0):
-    cur_lns_shapeid = shapeid_lns[i]
-    prev_lns_shapeid = shapeid_lns[i-1]
-    
-    if (cur_lns_shapeid - prev_lns_shapeid < 0.001):
-      # create tupples for vertexes to add
-      v0 = (new_sta[i-1], z_lns[i-1], 0.0)
-      v1 = (new_sta[i], z_lns[i], 0.0)
-      poly.add_vertices( [v0, v1] )
-      
-      # this is needed, as the else below is never executed
-      # for the last line in the lines file!
-      if (i == n_lns-1):
-        drawing.add(poly)
-    else:
-      drawing.add(poly)
-      poly = dxf.polyline()
-
-############################################################################
-drawing.save()
-
+# the segments of the sections (a node and the next node of the same
+# section); as before, each segment is written as a pair of vertices
+same = (shapeid_lns[1:] - shapeid_lns[:-1] < 0.001)
+seg = np.nonzero(same)[0]
+idx = np.column_stack((seg, seg+1)).ravel()
+
+# each section starts with a new polyline
+line = np.concatenate(([0], np.cumsum(~same)))[seg]
+starts = np.nonzero(np.diff(np.concatenate(([-1], line))))[0]
+offsets = 2 * np.append(starts, len(seg))
+
+# write the breaklines (the sections are drawn in the station, elevation
+# plane)
+stream = drawing.stream()
+stream.add_polylines(new_sta[idx], z_lns[idx], np.zeros(len(idx)), offsets=offsets)
+stream.close()
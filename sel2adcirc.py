@@ -41,6 +41,7 @@
 import sys
 import numpy as np
 from ppmodules.selafin_io_pp import *
+from ppmodules.writeMesh import *
 #
 #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # MAIN
@@ -60,8 +61,6 @@ else:
 	print('python sel2adcirc.py -i input.slf -v 2 -t 23 -o output.grd')
 	sys.exit()
 
-# create the output file
-fout = open(output_file, "w")
 #
 # Read the header of the selafin result file and get geometry and
 # variable names and units
@@ -87,20 +86,8 @@ elements = len(ikle[:,0])
 # the variable to print in the adcirc file
 var1 = master_results[var1_idx]
 
-# now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(elements) + " " + str(nodes) + "\n")
-
-# writes the nodes
-for i in range(nodes):
-	fout.write(str(i+1) + " " + str("{:.3f}".format(x[i])) + " " + 
-		str("{:.3f}".format(y[i])) + " " + str("{:.3f}".format(var1[i])) + "\n")
-
-# writes the elements
-for i in range(elements):
-	fout.write(str(i+1) + " 3 " + str(ikle[i,0]) + " " + str(ikle[i,1]) + " " + 
-		str(ikle[i,2]) + "\n")	
+# now to write the adcirc mesh file (the ikle in the *.slf file is one based)
+writeAdcirc(nodes,elements,x,y,var1,ikle-1,output_file)
 
 # print("All Done!")
 
@@ -49,6 +49,12 @@
 #
 # Revised: Dec 27, 2020
 # Added the date to the time stamp, as it is read from the slf file.
+#
+# Revised: Oct 18, 2026
+# The triangulation and the figure are created only once, and only the
+# contours, vectors and time stamp are updated for each frame. Added the
+# optional -n argument (always the last argument) to render the frames
+# with a number of processes.
 # 
 # Using: Python 2 or 3, Matplotlib, Numpy
 #
@@ -56,6 +62,7 @@
 #          python sel2png.py -i input.slf -c sel2png.cfg -v 0 1 -o output.png
 #          python sel2png.py -i input.slf -c sel2png.cfg -v 4 -o output.png -s 1 -e 6
 #          python sel2png.py -i input.slf -c sel2png.cfg -v 0 1 -o output.png -s 1 -e 6
+#          python sel2png.py -i input.slf -c sel2png.cfg -v 4 -o output.png -n 4
 # 
 # where:
 #       --> -i is the *.slf file as input
@@ -68,6 +75,8 @@
 #
 #       --> -o is the *.png output file
 #
+#       --> -n (optional) is the number of processes used to render the frames
+#
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -78,6 +87,16 @@ import matplotlib.cm as cm
 import numpy as np
 from datetime import datetime, date, time, timedelta
 from ppmodules.selafin_io_pp import *
+from ppmodules.interpolation import *
+from ppmodules.utilities import *
+
+# number of processes used to render the frames; the optional -n argument
+# is always the last one, and is removed so the other arguments are parsed
+# as before
+processes = 1
+if (len(sys.argv) > 2 and sys.argv[-2] == '-n'):
+  processes = int(sys.argv[-1])
+  del sys.argv[-2:]
 
 if len(sys.argv) == 9:
   input_file = sys.argv[2]
@@ -118,6 +137,7 @@ else:
   print('python sel2png.py -i input.slf -c sel2png.cfg -v 4 5 -o output.png')
   print('python sel2png.py -i input.slf -c sel2png.cfg -v 4 -o output.png -s 1 -e 5')
   print('python sel2png.py -i input.slf -c sel2png.cfg -v 4 5 -o output.png -s 1 -e 5')
+  print('python sel2png.py -i input.slf -c sel2png.cfg -v 4 -o output.png -n 4')
   sys.exit()
  
 # reads the extension from the output_file
@@ -256,15 +276,11 @@ for i in range(len(variables)):
 # gets some of the mesh properties from the *.slf file
 NELEM, NPOIN, NDP, IKLE, IPOBO, x, y = slf.getMesh()
 
-# define u and v for plotting (if needed)
-u = np.zeros(NPOIN)
-v = np.zeros(NPOIN)
-
 # the IKLE array starts at element 1, but matplotlib needs it to start
 # at zero
 IKLE[:,:] = IKLE[:,:] - 1
 
-# create a Matplotlib triangulation object
+# create a Matplotlib triangulation object (only once, for all frames)
 triang = mtri.Triangulation(x,y,IKLE)
 
 # to create a list of files
@@ -295,25 +311,74 @@ if (idx_list[0] not in idx_times):
 elif (idx_list[-1] not in idx_times):
   print('Ending time specified not in *.slf file. Exiting.')
   sys.exit()
-  
-# this is the same as my sel2vtk.py script
-for count, item in enumerate(filenames):
-  print('Writing file ' + item)
-  file_out.append(item)
-
-  # file_out[count] is the file that will be saved
-  slf.readVariables(idx_list[count])
-  master_results = slf.getVarValues()
 
+# determine the axis label
+if (var_index2 > 0):
+  title = 'Vel Mag [m/s]'
+else:
+  title = variables[var_index1] + ' [' + units[var_index1] + ']'
+
+# now we must find the vector variables to plot (if vector flag is on)
+# it will find telemac2d velocity vector, tomawac's mean direction, and
+# artemis's wave_incidence vector
+if (vectors > 0):
+  if not (((idx_vel_u > -1000) and (idx_vel_v > -1000)) or
+    ((idx_mean_dir > -1000) and (idx_wave_height > -1000)) or
+    ((idx_art_wave_height > -1000) and (idx_art_wave_inc > -1000))):
+    print('Vector variable not found in file. Exiting.')
+    sys.exit()
+
+# to plot the vectors on a grid, the u and v are interpolated on a regular
+# grid based on the vector_grid_size parameter; the grid (the code here is
+# taken from adcirc2asc.py) and its interpolation matrix are made once
+if ((vectors > 0) and (vector_grid > 0)):
+  
+  # to accomodate code pasting
+  spacing = vector_grid_size
+  
+  # determine the spacing of the regular grid
+  range_in_x = float(np.max(x) - np.min(x))
+  range_in_y = float(np.max(y) - np.min(y))
+  
+  # first index is integer divider, second is remainder
+  num_x_pts = divmod(range_in_x, spacing)
+  num_y_pts = divmod(range_in_y, spacing)
+  
+  # creates the regular grid
+  xreg, yreg = np.meshgrid(np.linspace(np.min(x), np.max(x), int(num_x_pts[0])),
+    np.linspace(np.min(y), np.max(y), int(num_y_pts[0])))
+  x_regs = xreg[1,:]
+  y_regs = yreg[:,1]
+  
+  # grid points outside of the mesh have no vectors
+  W_grid = interpMatrix(x, y, IKLE, np.ravel(xreg), np.ravel(yreg), 
+    nearest=False)
+  outside_grid = np.reshape(np.diff(W_grid.indptr) == 0, xreg.shape)
+
+# the results are read from the memory map of the *.slf file; this is done
+# before the processes are created, so that they all share the map (and 
+# the mesh) rather than reading the file again
+slf.mapResults()
+res = slf.getResults()
+nmapped = min(len(times), res.shape[0])
+
+# returns the results of all variables at time step index t
+def getFrame(t):
+  if (t < nmapped):
+    return np.asarray(res[t], dtype=np.float64)
+
+  # a truncated last time step is not in the memory map
+  slf.readVariables(t)
+  return slf.getVarValues()
+
+# returns the field values to plot, and the range of the colour coding
+def getPlotArray(master_results):
   # if two variable indices were specified, compute vector magnitude
   if (var_index2 > 0):
     plot_array = np.sqrt(np.power(master_results[var_index1],2) +
       np.power(master_results[var_index2],2))
   else:
-    plot_array = master_results[var_index1]
-  
-  # creates a triangulation grid using matplotlib function Triangulation
-  triang = mtri.Triangulation(x, y, IKLE)
+    plot_array = np.array(master_results[var_index1])
   
   if ((cbar_min_global == -1) and (cbar_max_global == -1)):
     # this is the range of the colour coding
@@ -330,148 +395,182 @@ for count, item in enumerate(filenames):
   # added on 2018.07.28
 
   # the adjustments below work when plot_array are +ve values
-  # I originally had it all like this      
   if (cbar_max_global > 0):
-    #print('I am in the +ve section')
-    for i in range(len(plot_array)):
-      if (plot_array[i] < cbar_min):
-        plot_array[i] = cbar_min + cbar_min*0.01
-      if (plot_array[i] > cbar_max):
-        plot_array[i] = cbar_max - cbar_max*0.01
+    plot_array = np.where(plot_array < cbar_min, cbar_min + cbar_min*0.01,
+      plot_array)
+    plot_array = np.where(plot_array > cbar_max, cbar_max - cbar_max*0.01,
+      plot_array)
   
   # if plot_array values are -ve, reverse +/- signs from above
-  #if (cbar_min_global < 0 and cbar_max_global < 0):
   if (cbar_min_global < 0):
-    #print('I am in the -ve section')
-    for i in range(len(plot_array)):
-      if (plot_array[i] < cbar_min):
-        plot_array[i] = cbar_min - cbar_min*0.01
-      if (plot_array[i] > cbar_max):
-        plot_array[i] = cbar_max + cbar_max*0.01
-        
-  # adjust the levels
-  levels = np.linspace(cbar_min, cbar_max, 16)
+    plot_array = np.where(plot_array < cbar_min, cbar_min - cbar_min*0.01,
+      plot_array)
+    plot_array = np.where(plot_array > cbar_max, cbar_max + cbar_max*0.01,
+      plot_array)
   
-  plt.figure()
-  plt.gca().set_aspect('equal')
-  cmap = cm.get_cmap(name=cbar_color_map)
-  plt.tricontourf(triang, plot_array, levels=levels,
-    cmap=cmap, antialiased=True)
+  return plot_array, cbar_min, cbar_max
+
+# returns the u and v components of the vectors to plot
+def getVectors(master_results):
+  # for telemac2d
+  if ((idx_vel_u > -1000) and (idx_vel_v > -1000)):
+    u = master_results[idx_vel_u]
+    v = master_results[idx_vel_v]
+
+  # for tomawac  
+  elif ((idx_mean_dir > -1000) and (idx_wave_height > -1000)):
+    u = np.sin(master_results[idx_mean_dir] * np.pi / 180.0) * \
+        master_results[idx_wave_height]
+    v = np.cos(master_results[idx_mean_dir] * np.pi / 180.0) * \
+        master_results[idx_wave_height]
+
+  # for artemis
+  else:
+    u = np.cos(master_results[idx_art_wave_inc] * np.pi / 180.0) * \
+        master_results[idx_art_wave_height]
+    v = np.sin(master_results[idx_art_wave_inc] * np.pi / 180.0) * \
+        master_results[idx_art_wave_height]
+
+  if (vector_grid > 0):
+    # matplotlib automatically manages masked values
+    u = np.ma.masked_array(np.reshape(W_grid.dot(u), xreg.shape), 
+      mask=outside_grid)
+    v = np.ma.masked_array(np.reshape(W_grid.dot(v), xreg.shape), 
+      mask=outside_grid)
   
-  # axis limits (the zoom flag controls this)
-  if (zoom > 0):
-    plt.xlim(xll,xur)
-    plt.ylim(yll,yur)
+  return u, v
+
+# the figure of each process; it is created when the first frame is 
+# rendered, and then only its contours, colour bar (if the colour range 
+# changes), vectors and time stamp are updated
+figure_state = dict()
 
-  plt.axis('off')
+# renders the frame count (an index into the filenames list)
+def renderFrame(count):
+  print('Writing file ' + filenames[count])
   
-  # this is for the colorbar
-  cb = plt.colorbar(orientation='vertical', shrink=0.3,format='%.3f')
-  cb.set_ticks(levels)
-  cb.ax.tick_params(labelsize=5)
+  master_results = getFrame(idx_list[count])
+  plot_array, cbar_min, cbar_max = getPlotArray(master_results)
+  
+  # adjust the levels
+  levels = np.linspace(cbar_min, cbar_max, 16)
   
   # this is the timestamp label 
   timestamp = 'Index: ' + str(idx_list[count]) + '\n' + \
     'Time: ' + str('{:.1f}'.format(times[idx_list[count]])) + ' sec' + '\n' + \
     'Date: ' + str(pydates[count].strftime("%d %b %Y %H:%M"))
+  
+  fs = figure_state
+  if (len(fs) == 0):
+    fs['fig'] = plt.figure()
+    fs['ax'] = plt.gca()
+    fs['ax'].set_aspect('equal')
+    fs['cmap'] = plt.get_cmap(cbar_color_map)
+    fs['cs'] = None
+    fs['cb'] = None
+    fs['levels'] = None
+  fig = fs['fig']
+  ax = fs['ax']
+  
+  # the contours are the only part of the plot that is drawn again
+  if fs['cs'] is not None:
+    try:
+      fs['cs'].remove()
+    except AttributeError:
+      # older versions of matplotlib
+      for c in fs['cs'].collections:
+        c.remove()
+  fs['cs'] = ax.tricontourf(triang, plot_array, levels=levels,
+    cmap=fs['cmap'], antialiased=True)
+  
+  if (fs['cb'] is None):
+    # axis limits (the zoom flag controls this)
+    if (zoom > 0):
+      ax.set_xlim(xll,xur)
+      ax.set_ylim(yll,yur)
 
-  if (zoom > 0):
-    t=plt.text(xll, yll, timestamp, fontsize=6, bbox=dict(boxstyle='square'))
-    t.set_bbox(dict(facecolor='white', alpha=1.0))
-    # this I used to plot the mesh
-    #plt.triplot(triang, lw=0.1, color='black')
-  else:
-    t=plt.text(np.max(x), np.min(y), timestamp, fontsize=6, bbox=dict(boxstyle='square'))
-    t.set_bbox(dict(facecolor='white', alpha=1.0))
+    ax.axis('off')
   
-  # determine the axis label
-  if (var_index2 > 0):
-    title = 'Vel Mag [m/s]'
+    if (zoom > 0):
+      t=ax.text(xll, yll, timestamp, fontsize=6, bbox=dict(boxstyle='square'))
+    else:
+      t=ax.text(np.max(x), np.min(y), timestamp, fontsize=6, bbox=dict(boxstyle='square'))
+    t.set_bbox(dict(facecolor='white', alpha=1.0))
+    fs['text'] = t
   else:
-    title = variables[var_index1] + ' [' + units[var_index1] + ']'
+    fs['text'].set_text(timestamp)
   
-  # set the title, and its size
-  cb.ax.set_title(title, size=5)
+  # the colour bar only changes if the range of the colour coding does
+  if (fs['cb'] is None):
+    # this is for the colorbar
+    cb = fig.colorbar(fs['cs'], ax=ax, orientation='vertical', shrink=0.3,
+      format='%.3f')
+    cb.set_ticks(levels)
+    cb.ax.tick_params(labelsize=5)
+    
+    # set the title, and its size
+    cb.ax.set_title(title, size=5)
+    fs['cb'] = cb
+    fs['levels'] = levels
+  elif not np.array_equal(fs['levels'], levels):
+    # the colorbar is drawn again in the axes it already has
+    cax = fs['cb'].ax
+    cax.clear()
+    cb = fig.colorbar(fs['cs'], cax=cax, orientation='vertical', 
+      format='%.3f')
+    cb.set_ticks(levels)
+    cb.ax.tick_params(labelsize=5)
+    cb.ax.set_title(title, size=5)
+    fs['cb'] = cb
+    fs['levels'] = levels
   
-  # to plot the vectors (if vector flag is on)
+  # to plot the vectors (if vector flag is on); the vectors are drawn on
+  # top of the contours (which are added again for each frame)
   if (vectors > 0):
+    u, v = getVectors(master_results)
     
-    # now we must find the vector variables to plot
-    # it will find telemac2d velocity vector, tomawac's mean direction, and
-    # artemis's wave_incidence vector
-
-    # for telemac2d
-    if ((idx_vel_u > -1000) and (idx_vel_v > -1000)):
-      u = master_results[idx_vel_u]
-      v = master_results[idx_vel_v]
-
-    # for tomawac  
-    elif ((idx_mean_dir > -1000) and (idx_wave_height > -1000)):
-      for i in range(len(x)):
-        u[i] = np.sin(master_results[idx_mean_dir][i] * np.pi / 180.0) * \
-            master_results[idx_wave_height][i]
-        v[i] = np.cos(master_results[idx_mean_dir][i] * np.pi / 180.0) * \
-            master_results[idx_wave_height][i]
-
-    # for artemis
-    elif ((idx_art_wave_height > -1000) and (idx_art_wave_inc > -1000) ):
-      for i in range(len(x)):
-        u[i] = np.cos(master_results[idx_art_wave_inc][i] * np.pi / 180.0) * \
-            master_results[idx_art_wave_height][i]
-        v[i] = np.sin(master_results[idx_art_wave_inc][i] * np.pi / 180.0) * \
-            master_results[idx_art_wave_height][i]
-    else:
-      print('Vector variable not found in file. Exiting.')
-      sys.exit()
-
-    if (vector_grid > 0):
-      # plot the vectors on a grid
-      # we now have to convert the u and v to a regular vector based on the
-      # vector_grid_size parameter, the code here is taken from adcirc2asc.py
-
-      # to accomodate code pasting
-      spacing = vector_grid_size
-      
-      # determine the spacing of the regular grid
-      range_in_x = float(np.max(x) - np.min(x))
-      range_in_y = float(np.max(y) - np.min(y))
-
-      max_range = max(range_in_x, range_in_y)
-      
-      # first index is integer divider, second is remainder
-      num_x_pts = divmod(range_in_x, spacing)
-      num_y_pts = divmod(range_in_y, spacing)
-      
-      # creates the regular grid
-      xreg, yreg = np.meshgrid(np.linspace(np.min(x), np.max(x), int(num_x_pts[0])),
-        np.linspace(np.min(y), np.max(y), int(num_y_pts[0])))
-      x_regs = xreg[1,:]
-      y_regs = yreg[:,1]
-
-      # perform the triangulation
-      interpolator = mtri.LinearTriInterpolator(triang, u)
-      u_grid = interpolator(xreg, yreg)
-      
-      interpolator = mtri.LinearTriInterpolator(triang, v)
-      v_grid = interpolator(xreg, yreg)
-
-      # matplotlib automatically manages np.nan's
-      # now, we are ready to plot the vectors
-      
+    if ('quiver' in fs):
+      fs['quiver'].set_UVC(u, v)
+    elif (vector_grid > 0):
       # width is the shaft width of the arrows
-      plt.quiver(x_regs, y_regs, u_grid, v_grid,
+      fs['quiver'] = ax.quiver(x_regs, y_regs, u, v,
         width=vector_width, pivot='middle', color=vector_color,
         angles='xy', scale_units='xy',
-        scale=1.0/vector_scale)
-                                          
+        scale=1.0/vector_scale, zorder=2)
     else:
       # plot the vectors at every node point
-      plt.quiver(x, y, u, v, pivot='middle',width=vector_width,
+      fs['quiver'] = ax.quiver(x, y, u, v, pivot='middle',width=vector_width,
         color=vector_color, angles='xy', scale_units='xy',
-        scale=1.0/vector_scale)
+        scale=1.0/vector_scale, zorder=2)
   
   # this plots the figure
-  fig = plt.gcf() # returns the reference for the current figure
   fig.set_size_inches(12,9)
-  fig.savefig(file_out[count], dpi=300, bbox_inches='tight', transparent=False)
-  plt.close()
+  fig.savefig(filenames[count], dpi=300, bbox_inches='tight', transparent=False)
+
+# renders a range of frames (a list of indices into the filenames list)
+def renderFrames(counts):
+  for count in counts:
+    renderFrame(count)
+  return len(counts)
+
+# the frames that are in the memory map can be rendered in parallel (a
+# single process is used where the processes can not be forked)
+counts = [count for count in range(len(filenames)) if idx_list[count] < nmapped]
+rest = [count for count in range(len(filenames)) if idx_list[count] >= nmapped]
+
+ctx = fork_context()
+
+if (processes > 1 and ctx is not None and len(counts) > 1):
+  # each process renders contiguous ranges of frames, reusing its figure
+  ranges = [list(r) for r in np.array_split(counts, 
+    min(len(counts), 4*processes))]
+  pool = ctx.Pool(processes)
+  try:
+    pool.map(renderFrames, ranges, chunksize=1)
+  finally:
+    pool.terminate()
+    pool.join()
+else:
+  rest = counts + rest
+
+renderFrames(rest)
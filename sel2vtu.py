@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+#
+#+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!
+#                                                                       #
+#                                 sel2vtu.py                            #
+#                                                                       #
+#+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!+!
+#
+# Author: Pat Prodanovic, Ph.D., P.Eng.
+#
+# Date: Oct 18, 2026
+#
+# Purpose: Same as sel2vtk.py, except that it writes a VTK XML file (*.vtu)
+# for each time record, and a ParaView collection file (*.pvd) that lists
+# the *.vtu files and their times (open the *.pvd file in ParaView to get
+# the whole time series). The *.vtu files are binary, and each array is
+# written from its numpy buffer in one go, in the precision of the *.slf
+# file. The cells of the mesh (and, for 2d files, the points) are made
+# only once, and are written as is to each *.vtu file. Works for 2d and 3d
+# *.slf files (3d files are written as wedges, with the z of the points
+# taken from the ELEVATION Z variable of each time record).
+#
+# Using: Python 2 or 3, Numpy
+#
+# Example: python sel2vtu.py -i results.slf -o results.pvd
+#          python sel2vtu.py -i results.slf -o results.pvd -t_start 0 -t_end 5
+#          python sel2vtu.py -i results.slf -o results.pvd -n 4
+#
+# where:
+#       --> -i is the *.slf file as input
+#
+#       --> -o is the *.pvd output file; the *.vtu files are named after it
+#              (i.e., results00000.vtu, results00001.vtu, etc)
+#
+#       --> -t_start and -t_end (optional) are the first and last time step
+#              indices to write
+#
+#       --> -n (optional) is the number of processes used to write the files
+#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Global Imports
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+import os,sys
+import numpy as np
+from ppmodules.selafin_io_pp import *
+from ppmodules.writeMesh import *
+from ppmodules.utilities import *
+
+# number of processes used to write the files; the optional -n argument
+# is always the last one, and is removed so the other arguments are parsed
+# as before
+processes = 1
+if (len(sys.argv) > 2 and sys.argv[-2] == '-n'):
+  processes = int(sys.argv[-1])
+  del sys.argv[-2:]
+
+if len(sys.argv) == 5:
+  input_file = sys.argv[2]
+  output_file = sys.argv[4]
+  t_start = 0
+  t_end = 0
+elif len(sys.argv) == 9:
+  input_file = sys.argv[2]
+  output_file = sys.argv[4]
+  t_start = int(sys.argv[6])
+  t_end = int(sys.argv[8])
+else:
+  print('Wrong number of Arguments, stopping now...')
+  print('Usage:')
+  print('python sel2vtu.py -i results.slf -o results.pvd')
+  print('or')
+  print('python sel2vtu.py -i results.slf -o results.pvd -t_start 0 -t_end 5')
+  print('or')
+  print('python sel2vtu.py -i results.slf -o results.pvd -n 4')
+  sys.exit()
+
+# use selafin_io_pp class ppSELAFIN
+slf = ppSELAFIN(input_file)
+slf.readHeader()
+slf.readTimes()
+
+# get times of the selafin file, and the variable names
+times = slf.getTimes()
+variables = slf.getVarNames()
+
+# update the index of t_end
+# len(times) gives total number of items in the array
+# len(times) - 1 is the index of the last element
+if len(sys.argv) == 5:
+  t_end = len(times)-1
+
+# gets some of the mesh properties from the *.slf file
+NELEM, NPOIN, NDP, IKLE, IPOBO, x, y = slf.getMesh()
+
+# to remove duplicate spaces from variables
+for i in range(len(variables)):
+  variables[i] = ' '.join(variables[i].split())
+
+# determine if the *.slf file is 2d or 3d by reading how many planes it has
+NPLAN = slf.getNPLAN()
+
+# verify that variable ELEVATION or COTE are in the *.slf file
+if (NPLAN > 1):
+  el_idx = -1
+  for i in range(len(variables)):
+    if ((variables[i].find('ELEVATION') > -1)):
+      el_idx = i
+    elif ((variables[i].find('COTE Z') > -1)):
+      el_idx = i
+  if (el_idx < 0):
+    print('Variable \'ELEVATION Z\' or \'COTE Z\' not in *.slf file')
+    sys.exit()
+
+# the IKLE array starts at element 1, but vtk needs it to start at zero
+IKLE = IKLE - 1
+
+# the cells are made only once (wedges for 3d files, triangles for 2d)
+if (NPLAN > 1):
+  cells = vtuCells(IKLE, 13)
+else:
+  cells = vtuCells(IKLE, 5)
+
+# the points of a 2d file do not change with time
+points = np.column_stack((x, y, np.zeros(len(x))))
+
+# list of time indices in *.slf file
+idx_times = np.arange(len(times))
+
+# initialize the index list of time steps to extract
+idx_list = list()
+
+# create a list of filenames based on time records in the slf file
+filenames = list()
+for i in range(t_start, t_end+1, 1):
+  filenames.append(output_file.rsplit('.',1)[0] + "{:0>5d}".format(i) + '.vtu')
+  idx_list.append(i)
+
+# to check if the idx_list is within times list
+if (idx_list[0] not in idx_times):
+  print('Starting time specified not in *.slf file. Exiting.')
+  sys.exit()
+elif (idx_list[-1] not in idx_times):
+  print('Ending time specified not in *.slf file. Exiting.')
+  sys.exit()
+
+# find the indices of the vector variables
+idx_vel_u = -1000
+idx_vel_v = -1000
+idx_vel_z = -1000
+
+# for tomawac
+idx_mean_dir = -1000
+idx_wave_height = -1000
+
+# for artemis
+idx_art_wave_inc = -1000
+idx_art_wave_height = -1000
+
+# from the list of variables, find v and u
+for i in range(len(variables)):
+  if (NPLAN > 1):
+    if (variables[i].find('VELOCITY U') > -1):
+      idx_vel_u = i
+    elif (variables[i].find('VELOCITY V') > -1):
+      idx_vel_v = i
+    elif (variables[i].find('VELOCITY W') > -1):
+      idx_vel_z = i
+  else:
+    if (variables[i].find('VELOCITY U') > -1):
+      idx_vel_u = i
+    elif (variables[i].find('VELOCITY V') > -1):
+      idx_vel_v = i
+    elif (variables[i].find('MEAN DIRECTION') > -1):
+      idx_mean_dir = i
+    elif (variables[i].find('WAVE HEIGHT HM0') > -1):
+      idx_wave_height = i
+    elif (variables[i].find('WAVE HEIGHT') > -1):
+      idx_art_wave_height = i
+    elif (variables[i].find('WAVE INCIDENCE') > -1):
+      idx_art_wave_inc = i
+
+# in case the variables are in french
+for i in range(len(variables)):
+  if (NPLAN > 1):
+    if (variables[i].find('VITESSE U') > -1):
+      idx_vel_u = i
+    elif (variables[i].find('VITESSE V') > -1):
+      idx_vel_v = i
+    elif (variables[i].find('VITESSE W') > -1):
+      idx_vel_z = i
+  else:
+    if (variables[i].find('VITESSE U') > -1):
+      idx_vel_u = i
+    elif (variables[i].find('VITESSE V') > -1):
+      idx_vel_v = i
+    elif (variables[i].find('DIRECTION MOY') > -1):
+      idx_mean_dir = i
+    elif (variables[i].find('HAUTEUR HM0') > -1):
+      idx_wave_height = i
+
+# the results are read from the memory map of the *.slf file; this is done
+# before the processes are created, so that they all share the map (and
+# the mesh) rather than reading the file again
+slf.mapResults()
+res = slf.getResults()
+nmapped = min(len(times), res.shape[0])
+
+# returns the results of all variables at time step index t, in the
+# precision of the *.slf file
+def getFrame(t):
+  if (t < nmapped):
+    return res[t]
+
+  # a truncated last time step is not in the memory map
+  slf.readVariables(t)
+  return slf.getVarValues()
+
+# writes the *.vtu file count (an index into the filenames list)
+def writeFrame(count):
+  print('Writting file: ' + filenames[count])
+
+  # these are the results for all variables, for time step count
+  master_results = getFrame(idx_list[count])
+  zero = np.zeros(len(x), dtype=master_results.dtype)
+
+  point_data = list()
+
+  if ( (idx_vel_u > -1000) and (idx_vel_v > -1000) ):
+    # velocity vectors data
+    if (NPLAN > 1):
+      point_data.append(('Velocity', np.column_stack((master_results[idx_vel_u],
+        master_results[idx_vel_v], master_results[idx_vel_z]))))
+    else:
+      point_data.append(('Velocity', np.column_stack((master_results[idx_vel_u],
+        master_results[idx_vel_v], zero))))
+
+  # the wave vectors are computed in double precision
+  results = np.asarray(master_results, dtype=np.float64)
+
+  if ( (idx_mean_dir > -1000) and (idx_wave_height > -1000) ):
+    # wave height vectors data
+    wave_x = np.sin(results[idx_mean_dir] * np.pi / 180.0) * results[idx_wave_height]
+    wave_y = np.cos(results[idx_mean_dir] * np.pi / 180.0) * results[idx_wave_height]
+    point_data.append(('Wavedir', np.column_stack((wave_x, wave_y, 
+      zero)).astype(zero.dtype)))
+
+  if ( (idx_art_wave_height > -1000) and (idx_art_wave_inc > -1000) ):
+    # wave height vectors data
+    wave_x = np.cos(results[idx_art_wave_inc] * np.pi / 180.0) * results[idx_art_wave_height]
+    wave_y = np.sin(results[idx_art_wave_inc] * np.pi / 180.0) * results[idx_art_wave_height]
+    point_data.append(('Wavedir', np.column_stack((wave_x, wave_y, 
+      zero)).astype(zero.dtype)))
+
+  # the rest of the variables
+  for i in range(len(variables)):
+    point_data.append((variables[i].replace(' ', '_'), master_results[i]))
+
+  # the points of a 3d file move with the elevation of the planes
+  if (NPLAN > 1):
+    frame_points = np.column_stack((x, y, master_results[el_idx]))
+  else:
+    frame_points = points
+
+  writeVTU(filenames[count], frame_points, cells, point_data)
+
+# writes a range of *.vtu files (a list of indices into the filenames list)
+def writeFrames(counts):
+  for count in counts:
+    writeFrame(count)
+  return len(counts)
+
+# the files of the time steps that are in the memory map can be written in
+# parallel (a single process is used where the processes can not be forked)
+counts = [count for count in range(len(filenames)) if idx_list[count] < nmapped]
+rest = [count for count in range(len(filenames)) if idx_list[count] >= nmapped]
+
+ctx = fork_context()
+
+if (processes > 1 and ctx is not None and len(counts) > 1):
+  # each process writes contiguous ranges of files
+  ranges = [list(r) for r in np.array_split(counts,
+    min(len(counts), 4*processes))]
+  pool = ctx.Pool(processes)
+  try:
+    pool.map(writeFrames, ranges, chunksize=1)
+  finally:
+    pool.terminate()
+    pool.join()
+else:
+  rest = counts + rest
+
+writeFrames(rest)
+
+# the collection file, with the *.vtu files listed relative to it
+pvd_file = output_file.rsplit('.',1)[0] + '.pvd'
+print('Writting file: ' + pvd_file)
+writePVD(pvd_file, [os.path.basename(f) for f in filenames],
+  [times[t] for t in idx_list])
+
+print('All done!')
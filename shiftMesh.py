@@ -35,6 +35,7 @@
 import os,sys                              # system parameters
 import numpy             as np             # numpy
 from ppmodules.readMesh import *           # to get all readMesh functions
+from ppmodules.writeMesh import *          # to get all writeMesh functions
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
@@ -57,19 +58,5 @@ output_file = sys.argv[8]
 # read the adcirc mesh file
 n,e,x,y,z,ikle = readAdcirc(input_file)
 
-fout = open(output_file, "w")
-
 # now to write the adcirc mesh file
-fout.write("ADCIRC" + "\n")
-# writes the number of elements and number of nodes in the header file
-fout.write(str(e) + " " + str(n) + "\n")
-
-# writes the nodes
-for i in range(n):
-	fout.write(str(i+1) + " " + str("{:.3f}".format(x[i] + x_shift)) + " " + 
-		str("{:.3f}".format(y[i]+y_shift)) + " " + str("{:.3f}".format(z[i]*z_mult)) + "\n")
-
-# writes the elements
-for i in range(e):
-	fout.write(str(i+1) + " 3 " + str(ikle[i,0]+1) + " " + str(ikle[i,1]+1) + " " + 
-		str(ikle[i,2]+1) + "\n")	
+writeAdcirc(n,e,x+x_shift,y+y_shift,z*z_mult,ikle,output_file)	
@@ -42,6 +42,16 @@
 # Revised: Jun 21, 2016
 # Added progress bar widget
 #
+# Revised: Oct 18, 2026
+# The interpolation from the result mesh to the mesh is now computed only
+# once, as a sparse matrix of weights (see interpMatrix() in the 
+# ppmodules/interpolation.py), and each time step is then a single sparse
+# matrix product for all of the variables. Mesh nodes outside of the result
+# mesh still get the value of the closest result node. If the environment
+# variable PPUTILS_MESH_CACHE is set to 1, the matrix is saved to the file
+# mesh.slf.interp.ppcache.npz (keyed by both meshes), and is re-used when
+# the same result mesh is transposed to the same mesh again.
+#
 # Uses: Python 2 or 3, Matplotlib, Numpy, Scipy
 #
 # Example:
@@ -56,16 +66,17 @@
 # Global Imports
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys
-import matplotlib.tri as mtri
 import numpy as np
-from scipy import spatial
 from ppmodules.selafin_io_pp import *
+from ppmodules.readMesh import *           # for useMeshCache()
+from ppmodules.interpolation import *      # for interpMatrix()
 from progressbar import ProgressBar, Bar, Percentage, ETA
 # 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # MAIN
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # converts cartesian vector to Tomawac nautical direction convention
+# (u and v are arrays)
 def toTomNautical(u,v):
   
   # quadrants are defined as follows
@@ -74,30 +85,19 @@ def toTomNautical(u,v):
   # III | II
   
   # error checking
-  if (abs(v) < 1.0E-6):
-    v = 1.0E-6
-  if (abs(u) < 1.0E-6):
-    u = 1.0E-6
+  u = np.array(u, dtype=np.float64)
+  v = np.array(v, dtype=np.float64)
+  v[np.abs(v) < 1.0E-6] = 1.0E-6
+  u[np.abs(u) < 1.0E-6] = 1.0E-6
     
   # compute the cartesian angle
-  theta_cart = np.arctan(abs(v)/abs(u)) * 360.0 / (2.0 * np.pi)
-  
-  # quadrant I
-  if (u >= 0.0 and v >= 0.0):
-    theta_naut = 90 - theta_cart 
-  # quadrant II
-  elif (u > 0.0 and v < 0.0):
-    theta_naut = 90 + theta_cart
-  # quadrant III
-  elif (u < 0.0 and v < 0.0):
-    theta_naut = 270 - theta_cart
-  # quadrant IV
-  elif (u < 0.0 and v > 0.0):
-    theta_naut = 270 + theta_cart
-  else:
-    theta_naut = 0.0
+  theta_cart = np.arctan(np.abs(v)/np.abs(u)) * 360.0 / (2.0 * np.pi)
   
-  dir = theta_naut
+  # quadrants I, II, III and IV (anything else is zero)
+  dir = np.select([(u >= 0.0) & (v >= 0.0), (u > 0.0) & (v < 0.0),
+    (u < 0.0) & (v < 0.0), (u < 0.0) & (v > 0.0)],
+    [90 - theta_cart, 90 + theta_cart, 270 - theta_cart, 270 + theta_cart],
+    0.0)
   
   return dir
 
@@ -154,12 +154,13 @@ mesh.readTimes()
 # subscript m is for the mesh file
 NELEM_m, NPOIN_m, NDP_m, IKLE_m, IPOBO_m, x_m, y_m = mesh.getMesh()
 
-# now interpolate results to the mesh object, for each variable
-triang = mtri.Triangulation(x_r,y_r,IKLE_r)
-
-# create a KDTree object
-source = np.column_stack((x_r,y_r))
-tree = spatial.KDTree(source)
+# the interpolation matrix from the result mesh to the mesh, so that the
+# transposed results are W.dot(results)
+if useMeshCache(None):
+  W = interpMatrixCached(x_r, y_r, IKLE_r, x_m, y_m, 
+    mesh_file + '.interp.ppcache.npz')
+else:
+  W = interpMatrix(x_r, y_r, IKLE_r, x_m, y_m)
 
 # now write the front matter of the results *.slf file
 mres = ppSELAFIN(output_file)
@@ -175,59 +176,28 @@ mres.writeHeader()
 w = [Percentage(), Bar(), ETA()]
 pbar = ProgressBar(widgets=w, maxval=len(times)).start()
 
-# to perform triangulation for each variable in the result file, 
-# for each time step
+# to transpose all variables in the result file, for each time step
 for t in range(len(times)):
   pbar.update(t+1)
   # print('Writing time step: ' + str(t))
-  # this is the master transposed array, for time step t
-  mesh_results = np.zeros((numvars, NPOIN_m))
-  
-  # reads the results for a particular variable, and stores it into results
+  # reads the results for all variables, and stores it into results
   res.readVariables(t)
   results = res.getVarValues()
   
-  # perform the interpolation and create mesh_results array
-  for i in range(numvars):
-    
-    # correction for direction variable
-    # +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
-    if (i == dir_idx):
-      wavex = np.sin(results[i,:]*np.pi/180.0)
-      wavey = np.cos(results[i,:]*np.pi/180.0)
-      
-      # interpolate the direction variable
-      interpolator = mtri.LinearTriInterpolator(triang, wavex)
-      wavex_int = interpolator(x_m, y_m)
-      
-      interpolator = mtri.LinearTriInterpolator(triang, wavey)
-      wavey_int = interpolator(x_m, y_m)
-      
-      for j in range(NPOIN_m):
-        if (np.isnan(wavex_int[j])):
-          # rather than assigning zero, assign a value from a closest non-nan node
-          d, idx = tree.query((x_m[j],y_m[j]), k = 1)
-          wavex_int[j] = wavex[idx]
-          
-        if (np.isnan(wavey_int[j])):
-          # rather than assigning zero, assign a value from a closest non-nan node
-          d, idx = tree.query((x_m[j],y_m[j]), k = 1)
-          wavey_int[j] = wavey[idx]
-          
-        # from wavex_int and wavey_int, re-create the direction variable
-        # direction is in tomawac's nautical convention
-        mesh_results[i,j] = toTomNautical(wavex_int[j],wavey_int[j])
-    # +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
-    else:
-      # this is for the rest of the variables
-      interpolator = mtri.LinearTriInterpolator(triang, results[i,:])
-      mesh_results[i,:] = interpolator(x_m, y_m)
+  # the master transposed array, for time step t (all variables at once)
+  mesh_results = W.dot(results.T).T
+  
+  # correction for direction variable
+  # +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
+  if (dir_idx >= 0):
+    wavex = np.sin(results[dir_idx,:]*np.pi/180.0)
+    wavey = np.cos(results[dir_idx,:]*np.pi/180.0)
     
-      for j in range(NPOIN_m):
-        if (np.isnan(mesh_results[i,j])):
-          # rather than assigning zero, assign a value from a closest non-nan node
-          d, idx = tree.query((x_m[j],y_m[j]), k = 1)
-          mesh_results[i,j] = results[i][idx]
+    # interpolate both components of the direction variable, and from 
+    # them re-create the direction variable (in tomawac's nautical 
+    # convention)
+    mesh_results[dir_idx,:] = toTomNautical(W.dot(wavex), W.dot(wavey))
+  # +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
 
   mres.writeVariables(times[t], mesh_results)
 pbar.finish()
@@ -20,6 +20,10 @@
 # Purpose: Script takes files generated by triangle mesh generator, and 
 # converts them to an ADCIRC mesh format
 #
+# Revised: Oct 18, 2026
+# The elements are oriented with the Mesh class from ppmodules/mesh.py,
+# for all elements at once.
+#
 # Uses: Python 2 or 3, Numpy
 #
 # Example:
@@ -35,10 +39,7 @@
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import os,sys
 import numpy as np
-
-# this works for python 2 and 3
-def CCW(x1,y1,x2,y2,x3,y3):
-  return (y3-y1)*(x2-x1) > (y2-y1)*(x3-x1)	
+from ppmodules.mesh import *               # for the Mesh class
 
 #
 curdir = os.getcwd()
@@ -87,21 +88,8 @@ e3 = e3.astype(np.int32)
 
 ikle = np.column_stack((e1,e2,e3))
 
-# go through each element, and make sure it is oriented in CCW fashion
-
-for i in range(len(ikle)):
-  
-  # if the element is not CCW then must change its orientation
-  if not CCW( x[ikle[i,0]-1], y[ikle[i,0]-1], x[ikle[i,1]-1], y[ikle[i,1]-1], 
-    x[ikle[i,2]-1], y[ikle[i,2]-1] ):
-    
-    t0 = ikle[i,0]
-    t1 = ikle[i,1]
-    t2 = ikle[i,2]
-    
-    # switch orientation
-    ikle[i,0] = t2
-    ikle[i,2] = t0
+# the elements that are not CCW have their first and last nodes switched
+ikle = Mesh(x,y,ikle-1).getOriented().ikle + 1
 # #######################
 
 # now to write the adcirc mesh file